@@ -0,0 +1,73 @@
+import argparse
+import sys
+
+from src.benchmark import (
+    BENCHMARK_SIZES,
+    PARALLEL_WORKERS,
+    STORAGE_MODES,
+    find_regressions,
+    load_baseline,
+    run_benchmarks,
+    save_baseline,
+    scaling_exponents,
+)
+from src.sweep import write_table
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark People and FriendshipGraph across population sizes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(BENCHMARK_SIZES), help="Population sizes.")
+    parser.add_argument("--storage", choices=STORAGE_MODES, nargs="+", default=list(STORAGE_MODES))
+    parser.add_argument("--cases", nargs="+", default=None, help="Only run these cases.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed calls per case.")
+    parser.add_argument("--workers", type=int, nargs="*", default=list(PARALLEL_WORKERS), help="Worker counts of the parallel step cases.")
+    parser.add_argument("--output", default=None, help="Write the results as a CSV table to this path.")
+    parser.add_argument("--baseline", default="benchmarks/baseline.json", help="Baseline to compare against.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Allowed slowdown factor before failing.")
+    parser.add_argument("--min-seconds", type=float, default=1.0e-3, help="Slowdowns below this are timer noise.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+
+    args = parse_args()
+
+    rows = run_benchmarks(sizes=args.sizes, storages=args.storage, cases=args.cases, repeat=args.repeat, workers=args.workers)
+
+    print(f"{'case':<27}{'storage':<8}{'people':>8}{'edges':>9}{'time (ms)':>12}{'peak (MiB)':>12}")
+    for row in rows:
+        if row["error"] is not None:
+            print(f"{row['case']:<27}{row['storage']:<8}{row['num_people']:>8}{row['num_friendships']:>9}  {row['error']}")
+        else:
+            print(
+                f"{row['case']:<27}{row['storage']:<8}{row['num_people']:>8}{row['num_friendships']:>9}"
+                f"{row['seconds'] * 1e3:>12.3f}{row['peak_bytes'] / 2 ** 20:>12.2f}"
+            )
+
+    print("\nScaling exponents (seconds ~ N^k):")
+    for (case, storage), exponent in sorted(scaling_exponents(rows).items()):
+        print(f"  {case:<27}{storage:<8}{exponent:>6.2f}")
+
+    if args.output is not None:
+        write_table(rows, args.output)
+
+    if args.save_baseline:
+        save_baseline(rows, args.baseline)
+        print(f"\nStored the baseline in {args.baseline}")
+        sys.exit(0)
+
+    try:
+        baseline = load_baseline(args.baseline)
+    except FileNotFoundError:
+        print(f"\nNo baseline at {args.baseline}, run with --save-baseline to create one")
+        sys.exit(0)
+
+    regressions = find_regressions(rows, baseline, tolerance=args.tolerance, min_seconds=args.min_seconds)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+    print(f"\nNo regressions against {args.baseline}")
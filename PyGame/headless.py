@@ -0,0 +1,89 @@
+import argparse
+import time
+
+import numpy as np
+
+from src.checkpoint import load_checkpoint, save_checkpoint
+from src.parallel import ParallelSimulation
+from src.simulation import create_simulation
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the wellbeing simulation without a display.")
+    parser.add_argument("--steps", type=int, default=1000, help="Number of steps to simulate.")
+    parser.add_argument("--num-people", type=int, default=200, help="Number of people in the simulation.")
+    parser.add_argument("--friend-attractiveness", type=float, default=1.0e-3)
+    parser.add_argument("--establishment-equ-prob-dist", type=float, default=0.01)
+    parser.add_argument("--break-equ-prob-dist", type=float, default=1.414 * 0.75)
+    parser.add_argument("--time-step", type=float, default=1.0e-2)
+    parser.add_argument("--storage", choices=("dense", "sparse", "packed"), default="dense")
+    parser.add_argument("--precision", choices=("double", "single"), default="double")
+    parser.add_argument("--cutoff-tolerance", type=float, default=None)
+    parser.add_argument("--tile-elements", type=int, default=None, help="Evaluate all pairs in row blocks of at most this many pairs.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for a reproducible run.")
+    parser.add_argument("--workers", type=int, default=None, help="Step on this many worker processes (needs sparse storage and a cutoff tolerance).")
+    parser.add_argument("--event-driven", action="store_true", help="Change friendships by sampled events instead of per-step passes.")
+    parser.add_argument("--statistics", action="store_true", help="Track and print friendship network statistics.")
+    parser.add_argument("--resume", default=None, help="Continue from this checkpoint file instead of a new simulation.")
+    parser.add_argument("--checkpoint", default=None, help="Write a checkpoint of the final state to this path.")
+    parser.add_argument("--profile", default=None, help="Write the per-phase profile as JSON to this path ('-' for stdout).")
+    args = parser.parse_args()
+
+    if args.workers is not None and args.event_driven:
+        parser.error("--workers cannot be combined with --event-driven, the workers run the per-step friendship passes")
+
+    return args
+
+
+if __name__ == "__main__":
+
+    args = parse_args()
+
+    if args.resume is not None:
+        simulation = load_checkpoint(args.resume)
+    else:
+        simulation = create_simulation(
+            num_people=args.num_people,
+            friend_attractiveness=args.friend_attractiveness,
+            establishment_equ_prob_dist=args.establishment_equ_prob_dist,
+            break_equ_prob_dist=args.break_equ_prob_dist,
+            time_step=args.time_step,
+            storage=args.storage,
+            cutoff_tolerance=args.cutoff_tolerance,
+            seed=args.seed,
+            track_statistics=args.statistics,
+            precision=args.precision,
+            event_driven=args.event_driven,
+            tile_elements=args.tile_elements,
+        )
+
+    num_people = simulation.people.num_people
+
+    start = time.perf_counter()
+    if args.workers is not None:
+        with ParallelSimulation(simulation, num_workers=args.workers, seed=args.seed) as engine:
+            engine.run(args.steps)
+    else:
+        simulation.run(args.steps)
+    elapsed = time.perf_counter() - start
+
+    if args.checkpoint is not None:
+        save_checkpoint(simulation, args.checkpoint)
+
+    num_friendships = simulation.friendship_graph.num_friendships
+    print(f"Simulated {args.steps} steps of {num_people} people in {elapsed:.2f}s ({args.steps / elapsed:.1f} steps/s)")
+    print(f"Friendships: {num_friendships}, mean degree: {2 * num_friendships / num_people:.3f}")
+    print(f"Wellbeing: mean {np.mean(simulation.people.wellbeing):.4f}, variance {np.var(simulation.people.wellbeing):.4f}")
+
+    statistics = simulation.friendship_graph.statistics
+    if statistics is not None:
+        num_components, _ = statistics.connected_components()
+        print(
+            f"Triangles: {statistics.num_triangles}, transitivity: {statistics.transitivity():.4f}, "
+            f"average clustering: {statistics.average_clustering():.4f}, components: {num_components}"
+        )
+
+    if args.profile == "-":
+        simulation.profiler.dump()
+    elif args.profile is not None:
+        simulation.profiler.dump(path=args.profile)
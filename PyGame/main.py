@@ -1,11 +1,16 @@
 import pygame
 
-from src.structures import FriendshipGraph, People
+from src.rendering import PerformanceOverlay, PygameRenderer
+from src.simulation import create_simulation
+from src.snapshots import SimulationThread, SnapshotBuffer
 
 # Game parameters
 WIDTH = 800
 HEIGHT = 600
 FPS = 60
+STEPS_PER_SECOND = 60  # None runs the simulation as fast as possible
+INTERPOLATE = True
+LOD_THRESHOLD = 5000  # Draw a heatmap and aggregated friendships above this many people
 
 # Colors
 BLACK = (0, 0, 0)
@@ -27,14 +32,29 @@ if __name__ == "__main__":
 
     ########################### SIMULATION SETUP ##############################
 
-    # Simulation time
-    t = 0
-    time_step = 1.0e-2  # Mainly used for simplex noise
-    N = 200
-
-    # Initialize people
-    people = People(N, friend_attractiveness=1.e-3)
-    friendship_graph = FriendshipGraph(N, establishment_equ_prob_dist=0.01, break_equ_prob_dist=1.414 * 0.75)
+    simulation = create_simulation(
+        num_people=200,
+        friend_attractiveness=1.e-3,
+        establishment_equ_prob_dist=0.01,
+        break_equ_prob_dist=1.414 * 0.75,
+        time_step=1.0e-2,  # Mainly used for simplex noise
+    )
+
+    # Draw the latest snapshot every frame, with a performance overlay that P toggles
+    overlay = PerformanceOverlay(color=BLUE)
+    renderer = PygameRenderer(
+        screen,
+        background_color=LIGHT_GRAY,
+        friendship_color=BLACK,
+        person_radius=3,
+        overlay=overlay,
+        lod_threshold=LOD_THRESHOLD,
+    )
+
+    # Step the simulation in the background at its own rate, SPACE pauses it
+    snapshots = SnapshotBuffer()
+    simulation_thread = SimulationThread(simulation, snapshots, steps_per_second=STEPS_PER_SECOND)
+    simulation_thread.start()
 
     ###########################################################################
 
@@ -46,37 +66,22 @@ if __name__ == "__main__":
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
-
-        # Fill the background with white
-        screen.fill(LIGHT_GRAY)
-
-        ########################### SIMULATION STEP ##############################
-
-        # Update the simulation
-        people.random_move(t)
-
-        friendship_graph.add_random_friendships(people)
-        friendship_graph.remove_random_friendships(people)
-
-        t += time_step
-
-        ###########################################################################
-
-        ########################### DRAWING STEP ##############################
-
-        # Draw graph
-        friendship_graph.draw_friendships(people, screen, BLACK, WIDTH, HEIGHT)
-
-        # Draw the people
-        people.draw_people(screen, WIDTH, HEIGHT, 3)
-
-        #######################################################################
-
-        # Flip the display
-        pygame.display.flip()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_p:
+                renderer.overlay = None if renderer.overlay is not None else overlay
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                simulation_thread.paused = not simulation_thread.paused
+
+        # Draw the newest snapshot, with positions interpolated from the one before, and flip the display
+        if INTERPOLATE:
+            snapshot, x, y = snapshots.blend()
+            renderer.draw_snapshot(snapshot, simulation.profiler, x, y)
+        else:
+            _, snapshot = snapshots.latest()
+            renderer.draw_snapshot(snapshot, simulation.profiler)
 
         # Ensure the program maintains a rate of FPS frames per second
         clock.tick(FPS)
 
     # Done! Time to quit.
+    simulation_thread.stop()
     pygame.quit()
@@ -0,0 +1,72 @@
+import argparse
+import sys
+
+import pygame
+
+from src.recording import TrajectoryReader
+from src.rendering import draw_discs, draw_segments, screen_coordinates
+
+# Game parameters
+WIDTH = 800
+HEIGHT = 600
+
+# Colors
+BLACK = (0, 0, 0)
+LIGHT_GRAY = (200, 200, 200)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay a recorded simulation run.")
+    parser.add_argument("path", help="Directory of the recording.")
+    parser.add_argument("--fps", type=int, default=60, help="Frames shown per second.")
+    parser.add_argument("--start", type=int, default=0, help="Frame to start from.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+
+    args = parse_args()
+    reader = TrajectoryReader(args.path)
+    if len(reader) == 0:
+        # A recorder that was never closed leaves metadata without any complete frame
+        sys.exit(f"The recording in {args.path} has no frames to replay")
+
+    pygame.init()
+    screen = pygame.display.set_mode([WIDTH, HEIGHT])
+    clock = pygame.time.Clock()
+
+    # Space pauses, the arrow keys step through the recording
+    frame = args.start
+    paused = False
+    running = True
+    while running:
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_RIGHT:
+                    frame += 1
+                elif event.key == pygame.K_LEFT:
+                    frame -= 1
+
+        frame = min(max(frame, 0), len(reader) - 1)
+        state = reader.frame(frame)
+
+        pygame.display.set_caption(f"Wellbeing Simulation - frame {frame + 1}/{len(reader)}")
+        screen.fill(LIGHT_GRAY)
+
+        px, py = screen_coordinates(state["x"], state["y"], WIDTH, HEIGHT)
+        idxs, jdxs = state["idxs"], state["jdxs"]
+        draw_segments(screen, px[idxs], py[idxs], px[jdxs], py[jdxs], BLACK)
+        draw_discs(screen, px, py, reader.colors, 3)
+
+        pygame.display.flip()
+        clock.tick(args.fps)
+
+        if not paused:
+            frame += 1
+
+    pygame.quit()
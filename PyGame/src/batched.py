@@ -0,0 +1,296 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.functions import friendship_breaking_probability, friendship_establishment_probability
+from src.noise import SimplexNoise
+from src.structures import MAX_RANDOM_SPEED, MIN_RANDOM_SPEED, friend_attraction
+from src.wellbeing import WellbeingDynamics, reach_edges
+
+
+class BatchedPeople:
+    """Many independent replicas of a population, stored with a leading replica axis.
+
+    Every replica has its own random state and noise generator, seeded like `People` would be,
+    so replica ``r`` starts out exactly as a `People` instance created with ``seeds[r]`` and moves
+    with the same noise.
+
+    Attributes:
+        num_replicas (int): The number of replicas (R).
+        num_people (int): The number of people in every replica (N).
+        x (np.ndarray): The (R, N) x-coordinates of the people (Range: [0, 1]).
+        y (np.ndarray): The (R, N) y-coordinates of the people (Range: [0, 1]).
+        speed_coefficient (np.ndarray): The (R, N) speed coefficients.
+        sfc (np.ndarray): The (R, N) selfishness coefficients.
+        wpc (np.ndarray): The (R, N) wellbeing production coefficients.
+        irc (np.ndarray): The (R, N) influence reach coefficients.
+        colors (np.ndarray): The (R, N, 3) colors representing each person.
+        wellbeing (np.ndarray): The (R, N) wellbeing values.
+    """
+
+    def __init__(self, num_people: int, seeds: Sequence[int], friend_attractiveness: float = 0.0):
+        """
+        Initialize the replicas.
+
+        Args:
+            num_people (int): The number of people in every replica.
+            seeds (Sequence[int]): One seed per replica.
+            friend_attractiveness (float): How strongly friends are pulled towards each other.
+        """
+        self.num_replicas = len(seeds)
+        self.num_people = num_people
+        self.friend_attractiveness = friend_attractiveness
+
+        self.rngs = [np.random.RandomState(seed) for seed in seeds]
+        self.noises = [SimplexNoise(seed) for seed in seeds]
+
+        # Draw in the same order as People so that every replica matches its single counterpart
+        attributes = []
+        for rng in self.rngs:
+            x = rng.rand(num_people)
+            y = rng.rand(num_people)
+            speed_coefficient = rng.rand(num_people) * (MAX_RANDOM_SPEED - MIN_RANDOM_SPEED) + MIN_RANDOM_SPEED
+            sfc = rng.rand(num_people)
+            wpc = rng.rand(num_people)
+            irc = rng.rand(num_people)
+            colors = rng.randint(20, 255, (num_people, 3))
+            attributes.append((x, y, speed_coefficient, sfc, wpc, irc, colors))
+
+        self.x, self.y, self.speed_coefficient, self.sfc, self.wpc, self.irc, self.colors = (
+            np.stack(values) for values in zip(*attributes)
+        )
+        self.wellbeing = np.zeros((self.num_replicas, num_people))
+
+    def random_move(self, t: float):
+        """
+        Move the people of every replica randomly using opensimplex noise.
+
+        Args:
+            t (float): Time parameter for noise generation.
+        """
+        ids = np.arange(self.num_people)
+        ts = np.array([t])
+
+        dx = np.stack([noise.noise2array(2 * ids, ts)[0] for noise in self.noises])
+        dy = np.stack([noise.noise2array(2 * ids + 1, ts)[0] for noise in self.noises])
+
+        self.x = np.clip(self.x + dx * self.speed_coefficient, 0, 1)
+        self.y = np.clip(self.y + dy * self.speed_coefficient, 0, 1)
+
+    def attract_to_friends(self, friendship_graph: "BatchedFriendshipGraph"):
+        """
+        Move the friends of every replica to each other, see `People.attract_to_friends`.
+
+        Args:
+            friendship_graph (BatchedFriendshipGraph): The friendships of all replicas.
+        """
+        if self.friend_attractiveness == 0:
+            return
+
+        # Flatten the replicas into one population of R * N people without friendships between replicas
+        replicas, idxs, jdxs = friendship_graph.get_friendships()
+        offset = replicas * self.num_people
+        dx, dy = friend_attraction(self.x.ravel(), self.y.ravel(), offset + idxs, offset + jdxs, self.friend_attractiveness)
+
+        self.x = np.clip(self.x + dx.reshape(self.x.shape), 0, 1)
+        self.y = np.clip(self.y + dy.reshape(self.y.shape), 0, 1)
+
+    def update_wellbeing(
+        self, friendship_graph: "BatchedFriendshipGraph", distance: np.ndarray, dynamics: WellbeingDynamics, time_step: float
+    ):
+        """
+        Advance the wellbeing of every replica by one step, see `WellbeingDynamics.update`.
+
+        Args:
+            friendship_graph (BatchedFriendshipGraph): The friendships of all replicas.
+            distance (np.ndarray): The (R, P) distances of all pairs at the current positions.
+            dynamics (WellbeingDynamics): The wellbeing stage to run.
+            time_step (float): Simulation time advanced by the step.
+        """
+        # Like the friend attraction, the replicas are one flat population without edges between replicas
+        replicas, idxs, jdxs = friendship_graph.get_friendships()
+        offset = replicas * self.num_people
+
+        near_replicas, pairs = np.nonzero(distance <= dynamics.influence_radius)
+        near_offset = near_replicas * self.num_people
+        sources, targets = reach_edges(
+            near_offset + friendship_graph.pair_idxs[pairs],
+            near_offset + friendship_graph.pair_jdxs[pairs],
+            distance[near_replicas, pairs],
+            (self.irc * dynamics.influence_radius).ravel(),
+        )
+
+        wellbeing = dynamics.advance(
+            self.wellbeing.ravel(), self.wpc.ravel(), self.sfc.ravel(), offset + idxs, offset + jdxs, sources, targets, time_step
+        )
+        self.wellbeing = wellbeing.reshape(self.wellbeing.shape)
+
+
+class BatchedFriendshipGraph:
+    """Friendship graphs of many replicas, stored as one (R, P) boolean array over the P = N(N-1)/2 pairs ``i < j``.
+
+    Both friendship passes advance all replicas with single vectorized operations. Only the
+    random draws are made per replica, from each replica's own random state: one per pair in the
+    establishment pass and one per friendship in the breaking pass. `FriendshipGraph` with dense
+    storage draws a full N x N matrix for establishment instead, so a replica follows the same
+    model as ``create_simulation(seed=seeds[r])`` but not the same random trajectory.
+    """
+
+    def __init__(self, people: BatchedPeople, establishment_equ_prob_dist: float, break_equ_prob_dist: float):
+        """
+        Initialize the friendship graphs.
+
+        Args:
+            people (BatchedPeople): The replicas whose friendships are tracked; their random states are shared.
+            establishment_equ_prob_dist (float): Parameter for the friendship establishment probability distribution.
+            break_equ_prob_dist (float): Parameter for the friendship breaking probability distribution.
+        """
+        self.num_replicas = people.num_replicas
+        self.num_people = people.num_people
+        self.rngs = people.rngs
+
+        # Pairs in row-major upper triangle order, the order np.where(np.triu(...)) produces
+        self.pair_idxs, self.pair_jdxs = np.triu_indices(self.num_people, k=1)
+        self.graph = np.zeros((self.num_replicas, len(self.pair_idxs)), dtype=bool)
+
+        self.establishment_equ_prob_dist = establishment_equ_prob_dist
+        self.break_equ_prob_dist = break_equ_prob_dist
+
+        self.establishment_prob = friendship_establishment_probability(establishment_equ_prob_dist)
+        self.breaking_prob = friendship_breaking_probability(break_equ_prob_dist)
+
+    def get_friendships(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the friendships of all replicas as one edge list.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Replica and indices ``(r, i, j)`` of every friendship, with
+                ``i < j``, ordered by replica.
+        """
+        replicas, pairs = np.nonzero(self.graph)
+        return replicas, self.pair_idxs[pairs], self.pair_jdxs[pairs]
+
+    @property
+    def num_friendships(self) -> np.ndarray:
+        """The number of friendships in every replica."""
+        return np.count_nonzero(self.graph, axis=1)
+
+    def update_friendships(self, people: BatchedPeople) -> np.ndarray:
+        """
+        Run the establishment and breaking passes of a step for every replica.
+
+        Args:
+            people (BatchedPeople): The replicas.
+
+        Returns:
+            np.ndarray: The (R, P) distances of all pairs, for the wellbeing stage of the step.
+        """
+        x_diff = people.x[:, self.pair_idxs]
+        x_diff -= people.x[:, self.pair_jdxs]
+        y_diff = people.y[:, self.pair_idxs]
+        y_diff -= people.y[:, self.pair_jdxs]
+
+        # Same operations as the single engine, done in place to avoid (R, P) temporaries
+        x_diff *= x_diff
+        y_diff *= y_diff
+        x_diff += y_diff
+        distance = np.sqrt(x_diff, out=x_diff)
+
+        # Establishment, one draw per pair
+        p = self.establishment_prob(distance)
+        rand = np.stack([rng.rand(len(self.pair_idxs)) for rng in self.rngs])
+
+        self.graph |= rand < p
+
+        # Breaking, one draw per existing friendship
+        replicas, pairs = np.nonzero(self.graph)
+        counts = np.bincount(replicas, minlength=self.num_replicas)
+
+        p = self.breaking_prob(distance[replicas, pairs])
+        rand = np.concatenate([rng.rand(count) for rng, count in zip(self.rngs, counts)])
+
+        broken = rand < p
+        self.graph[replicas[broken], pairs[broken]] = False
+
+        return distance
+
+
+class BatchedSimulation:
+    """A fixed-step engine that advances many replicas of the same configuration together.
+
+    A step runs the same stages as a `Simulation` from `create_simulation`: random movement,
+    friend attraction, the friendship passes and the wellbeing stage, the last one on the pair
+    distances the friendship passes already computed.
+
+    Attributes:
+        people (BatchedPeople): The people of all replicas.
+        friendship_graph (BatchedFriendshipGraph): The friendships of all replicas.
+        time_step (float): Simulation time advanced per step.
+        t (float): The current simulation time.
+        steps (int): The number of steps taken so far.
+        wellbeing_dynamics (WellbeingDynamics): The wellbeing stage of a step.
+    """
+
+    def __init__(
+        self,
+        seeds: Sequence[int],
+        num_people: int = 200,
+        friend_attractiveness: float = 1.0e-3,
+        establishment_equ_prob_dist: float = 0.01,
+        break_equ_prob_dist: float = 1.414 * 0.75,
+        time_step: float = 1.0e-2,
+        wellbeing_dynamics: Optional[WellbeingDynamics] = None,
+    ):
+        """
+        Initialize the replicas, see `create_simulation` for the parameters.
+
+        Args:
+            seeds (Sequence[int]): One seed per replica; replica ``r`` starts from the people of
+                ``create_simulation(seed=seeds[r])``.
+            num_people (int): The number of people in every replica.
+            friend_attractiveness (float): How strongly friends are pulled towards each other.
+            establishment_equ_prob_dist (float): Parameter for the friendship establishment probability distribution.
+            break_equ_prob_dist (float): Parameter for the friendship breaking probability distribution.
+            time_step (float): Simulation time advanced per step.
+            wellbeing_dynamics (Optional[WellbeingDynamics]): The wellbeing stage of a step. Defaults to
+                `WellbeingDynamics` with its default parameters, like `create_simulation`.
+        """
+        self.people = BatchedPeople(num_people, seeds, friend_attractiveness=friend_attractiveness)
+        self.friendship_graph = BatchedFriendshipGraph(self.people, establishment_equ_prob_dist, break_equ_prob_dist)
+        self.time_step = time_step
+        self.t = 0.0
+        self.steps = 0
+        self.wellbeing_dynamics = wellbeing_dynamics if wellbeing_dynamics is not None else WellbeingDynamics()
+
+    def step(self):
+        """Advance every replica by a single step."""
+        self.people.random_move(self.t)
+        self.people.attract_to_friends(self.friendship_graph)
+        distance = self.friendship_graph.update_friendships(self.people)
+        self.people.update_wellbeing(self.friendship_graph, distance, self.wellbeing_dynamics, self.time_step)
+
+        self.t += self.time_step
+        self.steps += 1
+
+    def run(self, num_steps: int):
+        """
+        Advance every replica by a number of steps.
+
+        Args:
+            num_steps (int): The number of steps to take.
+        """
+        for _ in range(num_steps):
+            self.step()
+
+    def replica_friendships(self, replica: int) -> List[np.ndarray]:
+        """
+        Get the friendships of a single replica.
+
+        Args:
+            replica (int): Index of the replica.
+
+        Returns:
+            List[np.ndarray]: Indices ``[i, j]`` of every friendship, with ``i < j``.
+        """
+        pairs = np.flatnonzero(self.friendship_graph.graph[replica])
+        return [self.friendship_graph.pair_idxs[pairs], self.friendship_graph.pair_jdxs[pairs]]
@@ -0,0 +1,382 @@
+import copy
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.parallel import ParallelSimulation
+from src.simulation import Simulation, create_simulation
+from src.wellbeing import WellbeingDynamics
+
+BENCHMARK_SIZES = (200, 1000, 10000, 100000)
+STORAGE_MODES = ("dense", "sparse")
+
+# Dense storage draws N x N random matrices, which do not fit in memory much beyond this size
+DENSE_MAX_PEOPLE = 5000
+
+# Worker counts of the parallel step cases, which only run with sparse storage
+PARALLEL_WORKERS = (2, 4)
+
+BENCHMARK_COLUMNS = ("case", "storage", "num_people", "num_friendships", "seconds", "median_seconds", "peak_bytes", "error")
+
+
+def benchmark_simulation(num_people: int, storage: str, seed: int = 0, warmup_steps: int = 5) -> Simulation:
+    """
+    Build the simulation a benchmark runs on.
+
+    The establishment distance and the influence radius are scaled with ``1 / sqrt(num_people)``
+    from their defaults at 200 people, so that every size has the same expected number of friends
+    per person and the timings measure how the code scales rather than how the model densifies.
+    Sparse storage uses the establishment cutoff.
+
+    Args:
+        num_people (int): The number of people.
+        storage (str): Storage mode of the friendship graph.
+        seed (int): Seed of the simulation. Default is 0.
+        warmup_steps (int): Steps taken before measuring, so that friendships exist. Default is 5.
+
+    Returns:
+        Simulation: The warmed up simulation.
+    """
+    density_scale = np.sqrt(200 / num_people)
+    simulation = create_simulation(
+        num_people=num_people,
+        establishment_equ_prob_dist=0.01 * density_scale,
+        storage=storage,
+        cutoff_tolerance=1.0e-3 if storage == "sparse" else None,
+        seed=seed,
+        wellbeing_dynamics=WellbeingDynamics(influence_radius=0.05 * density_scale),
+    )
+    simulation.run(warmup_steps)
+    return simulation
+
+
+def restore_point(simulation: Simulation) -> Callable[[], None]:
+    """
+    Remember the state of a simulation, so that it can be reset before every timed call.
+
+    The positions, wellbeing, friendships, time, step count, random states and buffered noise are
+    restored. Positions are written into the current arrays of the people, so a `ParallelSimulation`
+    that keeps them in shared memory is reset as well, once its workers are given the friendships
+    again with `ParallelSimulation.load_friendships`; they keep their own random states.
+
+    Args:
+        simulation (Simulation): The simulation whose current state is kept.
+
+    Returns:
+        Callable[[], None]: Puts the simulation back into the kept state.
+    """
+    people = simulation.people
+    graph = simulation.friendship_graph
+
+    x, y, wellbeing = people.x.copy(), people.y.copy(), people.wellbeing.copy()
+    friendships = tuple(np.array(indices) for indices in graph.get_friendships())
+    t, steps = simulation.t, simulation.steps
+    rng_states = [(rng, rng.get_state()) for rng in (people.rng, graph.rng)]
+    # Refilling replaces the buffers instead of writing into them, so a shallow copy keeps them
+    noise_provider = copy.copy(people.noise_provider)
+
+    def restore():
+        people.x[:] = x
+        people.y[:] = y
+        people.wellbeing[:] = wellbeing
+        graph.remove_friendships(*graph.get_friendships())
+        graph.add_friendships(*friendships)
+        simulation.t, simulation.steps = t, steps
+        for rng, state in rng_states:
+            rng.set_state(state)
+        people.noise_provider = copy.copy(noise_provider)
+
+    return restore
+
+
+def benchmark_cases(simulation: Simulation, width: int = 800, height: int = 800) -> Dict[str, Callable[[], Any]]:
+    """
+    Get the operations that are benchmarked, bound to a simulation.
+
+    Drawing happens on an off-screen surface, so no display is needed. Every case has a ``setup``
+    attribute that restores the state the simulation had when the cases were created (see
+    `restore_point`), so that every timed call of every case starts from the same state.
+
+    Args:
+        simulation (Simulation): The simulation to benchmark.
+        width (int): Width of the off-screen surface. Default is 800.
+        height (int): Height of the off-screen surface. Default is 800.
+
+    Returns:
+        Dict[str, Callable[[], Any]]: A callable per benchmark case.
+    """
+    import pygame
+
+    people = simulation.people
+    graph = simulation.friendship_graph
+    screen = pygame.Surface((width, height))
+
+    def random_move():
+        # Advance the time like a step does, so that buffered noise is served rather than refilled
+        people.random_move(simulation.t)
+        simulation.t += simulation.time_step
+
+    def attract_to_friends():
+        people.attract_to_friends(graph)
+
+    def add_random_friendships():
+        return graph.add_random_friendships(people)
+
+    def remove_random_friendships():
+        return graph.remove_random_friendships(people)
+
+    def get_friendships():
+        return graph.get_friendships()
+
+    def draw_friendships():
+        graph.draw_friendships(people, screen, (0, 0, 0), width, height)
+
+    def draw_people():
+        people.draw_people(screen, width, height, 3)
+
+    def step():
+        simulation.step()
+
+    cases = {
+        "random_move": random_move,
+        "attract_to_friends": attract_to_friends,
+        "add_random_friendships": add_random_friendships,
+        "remove_random_friendships": remove_random_friendships,
+        "get_friendships": get_friendships,
+        "draw_friendships": draw_friendships,
+        "draw_people": draw_people,
+        "step": step,
+    }
+
+    restore = restore_point(simulation)
+    for case in cases.values():
+        case.setup = restore
+
+    return cases
+
+
+def time_call(func: Callable[[], Any], repeat: int = 5, setup: Optional[Callable[[], Any]] = None) -> Tuple[float, float, int]:
+    """
+    Measure the run time and peak memory of a callable.
+
+    Args:
+        func (Callable[[], Any]): The callable to measure.
+        repeat (int): The number of timed calls. Default is 5.
+        setup (Optional[Callable[[], Any]]): Called before every call, outside of the measurement. Default is None.
+
+    Returns:
+        Tuple[float, float, int]: The fastest and the median run time in seconds, and the peak
+            memory in bytes allocated during a separate, traced call.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    # Traced separately, tracing slows allocations down
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return min(times), float(np.median(times)), peak_bytes
+
+
+def _measure(name: str, func: Callable[[], Any], storage: str, simulation: Simulation, repeat: int) -> Dict[str, Any]:
+    """Time a case into a benchmark row, recording the error instead if it raises."""
+    setup = getattr(func, "setup", None)
+    if setup is not None:
+        # The row describes the state the timed calls start from
+        setup()
+
+    row = {
+        "case": name,
+        "storage": storage,
+        "num_people": simulation.people.num_people,
+        "num_friendships": simulation.friendship_graph.num_friendships,
+        "seconds": None,
+        "median_seconds": None,
+        "peak_bytes": None,
+        "error": None,
+    }
+    try:
+        row["seconds"], row["median_seconds"], row["peak_bytes"] = time_call(func, repeat=repeat, setup=setup)
+    except Exception as error:
+        row["error"] = f"{type(error).__name__}: {error}"
+    return row
+
+
+def run_benchmarks(
+    sizes: Sequence[int] = BENCHMARK_SIZES,
+    storages: Sequence[str] = STORAGE_MODES,
+    cases: Optional[Sequence[str]] = None,
+    repeat: int = 5,
+    seed: int = 0,
+    workers: Sequence[int] = PARALLEL_WORKERS,
+) -> List[Dict[str, Any]]:
+    """
+    Benchmark every case for every population size and storage mode.
+
+    Dense storage is skipped above `DENSE_MAX_PEOPLE`. With sparse storage, a full step on a
+    `ParallelSimulation` is measured as ``parallel_step_<workers>`` for every worker count, next to
+    the single process ``step``. Every timed call of every case starts from the state the warmed up
+    simulation of its size had, see `restore_point`. A case that raises is recorded with its error instead of a time,
+    so one broken operation does not hide the others. The peak memory of a parallel step only
+    covers the parent process.
+
+    Args:
+        sizes (Sequence[int]): The population sizes.
+        storages (Sequence[str]): The storage modes of the friendship graph.
+        cases (Optional[Sequence[str]]): Names of the cases to run. Defaults to all of them.
+        repeat (int): The number of timed calls per case. Default is 5.
+        seed (int): Seed of the simulations. Default is 0.
+        workers (Sequence[int]): The worker counts of the parallel step cases. Default is `PARALLEL_WORKERS`.
+
+    Returns:
+        List[Dict[str, Any]]: One row with the `BENCHMARK_COLUMNS` per case, storage mode and size.
+    """
+    rows = []
+    for storage in storages:
+        for num_people in sizes:
+            if storage == "dense" and num_people > DENSE_MAX_PEOPLE:
+                continue
+
+            simulation = benchmark_simulation(num_people, storage, seed=seed)
+            restore = restore_point(simulation)
+            for name, func in benchmark_cases(simulation).items():
+                if cases is None or name in cases:
+                    rows.append(_measure(name, func, storage, simulation, repeat))
+
+            if storage != "sparse":
+                continue
+
+            for num_workers in workers:
+                name = f"parallel_step_{num_workers}"
+                if cases is not None and name not in cases:
+                    continue
+
+                # Starting and stopping the workers is not part of the measurement
+                restore()
+                with ParallelSimulation(simulation, num_workers=num_workers, seed=seed) as engine:
+
+                    def parallel_step():
+                        engine.step()
+
+                    def parallel_setup():
+                        restore()
+                        engine.load_friendships()
+
+                    parallel_step.setup = parallel_setup
+                    rows.append(_measure(name, parallel_step, storage, simulation, repeat))
+
+    return rows
+
+
+def scaling_exponents(rows: List[Dict[str, Any]]) -> Dict[Tuple[str, str], float]:
+    """
+    Fit how the run time of every case scales with the population size.
+
+    Args:
+        rows (List[Dict[str, Any]]): Benchmark rows, see `run_benchmarks`.
+
+    Returns:
+        Dict[Tuple[str, str], float]: The exponent ``k`` of ``seconds ~ num_people ** k`` per case and storage
+            mode, fitted in log-log space. Cases measured at fewer than two sizes are left out.
+    """
+    series: Dict[Tuple[str, str], List[Tuple[int, float]]] = {}
+    for row in rows:
+        if row["seconds"]:
+            series.setdefault((row["case"], row["storage"]), []).append((row["num_people"], row["seconds"]))
+
+    exponents = {}
+    for key, points in series.items():
+        if len(points) >= 2:
+            num_people, seconds = np.log(np.array(points)).T
+            exponents[key] = float(np.polyfit(num_people, seconds, 1)[0])
+
+    return exponents
+
+
+def _row_key(row: Dict[str, Any]) -> str:
+    return f"{row['case']}/{row['storage']}/{row['num_people']}"
+
+
+def save_baseline(rows: List[Dict[str, Any]], path: str):
+    """
+    Store benchmark results as the baseline later runs are compared against.
+
+    Args:
+        rows (List[Dict[str, Any]]): Benchmark rows, see `run_benchmarks`.
+        path (str): Path of the JSON file to write.
+    """
+    baseline = {
+        _row_key(row): {"seconds": row["seconds"], "peak_bytes": row["peak_bytes"]} for row in rows if row["error"] is None
+    }
+    with open(path, "w") as file:
+        json.dump(baseline, file, indent=2, sort_keys=True)
+
+
+def load_baseline(path: str) -> Dict[str, Dict[str, float]]:
+    """
+    Load a baseline written by `save_baseline`.
+
+    Args:
+        path (str): Path of the JSON file.
+
+    Returns:
+        Dict[str, Dict[str, float]]: The baseline seconds and peak bytes per case, storage mode and size.
+    """
+    with open(path) as file:
+        return json.load(file)
+
+
+def find_regressions(
+    rows: List[Dict[str, Any]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float = 1.5,
+    min_seconds: float = 1.0e-3,
+) -> List[str]:
+    """
+    Compare benchmark results against a baseline.
+
+    A case regresses when it takes more than ``tolerance`` times its baseline time (and at least
+    ``min_seconds`` longer, so that timer noise on tiny cases is ignored), when it needs more than
+    ``tolerance`` times its baseline peak memory, or when it fails although the baseline has it.
+
+    Args:
+        rows (List[Dict[str, Any]]): Benchmark rows, see `run_benchmarks`.
+        baseline (Dict[str, Dict[str, float]]): The baseline, see `load_baseline`.
+        tolerance (float): Allowed slowdown and memory growth factor. Default is 1.5.
+        min_seconds (float): Slowdowns smaller than this are never regressions. Default is 1e-3.
+
+    Returns:
+        List[str]: A description of every regression; empty if there are none.
+    """
+    regressions = []
+    for row in rows:
+        key = _row_key(row)
+        if key not in baseline:
+            continue
+
+        reference = baseline[key]
+        if row["error"] is not None:
+            regressions.append(f"{key}: failed with {row['error']}")
+            continue
+
+        if row["seconds"] > tolerance * reference["seconds"] and row["seconds"] - reference["seconds"] > min_seconds:
+            regressions.append(f"{key}: {row['seconds'] * 1e3:.3f} ms vs. {reference['seconds'] * 1e3:.3f} ms baseline")
+
+        if row["peak_bytes"] > tolerance * reference["peak_bytes"]:
+            regressions.append(f"{key}: {row['peak_bytes']} peak bytes vs. {reference['peak_bytes']} baseline")
+
+    return regressions
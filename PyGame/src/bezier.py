@@ -0,0 +1,215 @@
+from functools import lru_cache
+from typing import Tuple, Union
+
+import numpy as np
+
+# Default number of Gauss-Legendre nodes per integration interval
+GAUSS_LEGENDRE_ORDER = 8
+
+# Default number of intervals the parameter range of a curve is split into for its length
+LENGTH_SEGMENTS = 4
+
+
+@lru_cache(maxsize=None)
+def gauss_legendre(order: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the Gauss-Legendre nodes and weights of an order, mapped to the interval [0, 1].
+
+    Args:
+        order (int): The number of nodes.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The nodes and their weights.
+    """
+    nodes, weights = np.polynomial.legendre.leggauss(order)
+    return (nodes + 1) / 2, weights / 2
+
+
+def _expand(control_points: np.ndarray, t: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Broadcast the control points of M curves against parameters of shape (M, ...) or (K,)."""
+    control_points = np.asarray(control_points, dtype=float)
+    t = np.asarray(t, dtype=float)
+    if t.ndim <= 1:
+        t = np.broadcast_to(t, (len(control_points),) + t.shape)
+
+    # One axis for the coordinates, and one per extra parameter axis for the control points
+    extra_axes = (slice(None),) + (None,) * (t.ndim - 1)
+    p0, p1, p2, p3 = (control_points[(extra_axes[0], k) + extra_axes[1:]] for k in range(4))
+    return p0, p1, p2, p3, t[..., None]
+
+
+def bezier_points(control_points: np.ndarray, t: Union[float, np.ndarray]) -> np.ndarray:
+    """
+    Evaluate cubic Bezier curves.
+
+    Args:
+        control_points (np.ndarray): The control points of M curves, shape (M, 4, 2).
+        t (Union[float, np.ndarray]): The curve parameters, either shared by all curves (scalar or shape (K,))
+            or per curve (shape (M, K), a one-dimensional ``t`` is always shared).
+
+    Returns:
+        np.ndarray: The points, shape (M, 2) for a scalar ``t`` and (M, K, 2) otherwise.
+    """
+    p0, p1, p2, p3, t = _expand(control_points, t)
+    s = 1 - t
+    return s ** 3 * p0 + 3 * s ** 2 * t * p1 + 3 * s * t ** 2 * p2 + t ** 3 * p3
+
+
+def bezier_derivatives(control_points: np.ndarray, t: Union[float, np.ndarray]) -> np.ndarray:
+    """
+    Evaluate the derivatives of cubic Bezier curves with respect to their parameter.
+
+    Args:
+        control_points (np.ndarray): The control points of M curves, shape (M, 4, 2).
+        t (Union[float, np.ndarray]): The curve parameters, see `bezier_points`.
+
+    Returns:
+        np.ndarray: The derivatives, with the shape of `bezier_points`.
+    """
+    p0, p1, p2, p3, t = _expand(control_points, t)
+    s = 1 - t
+    return 3 * s ** 2 * (p1 - p0) + 6 * s * t * (p2 - p1) + 3 * t ** 2 * (p3 - p2)
+
+
+def _interval_lengths(control_points: np.ndarray, t0: np.ndarray, t1: np.ndarray, order: int) -> np.ndarray:
+    """Integrate the speed of every curve over intervals of shape (M, K) with Gauss-Legendre quadrature."""
+    nodes, weights = gauss_legendre(order)
+    width = t1 - t0
+
+    t = t0[..., None] + width[..., None] * nodes
+    # An explicit shape, -1 is ambiguous for an empty batch
+    speed = np.linalg.norm(bezier_derivatives(control_points, t.reshape(len(t), int(np.prod(t.shape[1:])))), axis=-1)
+
+    return width * (speed.reshape(t.shape) @ weights)
+
+
+def bezier_lengths(
+    control_points: np.ndarray,
+    t0: Union[float, np.ndarray] = 0.0,
+    t1: Union[float, np.ndarray] = 1.0,
+    order: int = GAUSS_LEGENDRE_ORDER,
+    segments: int = LENGTH_SEGMENTS,
+) -> np.ndarray:
+    """
+    Compute the arc lengths of many cubic Bezier curves at once.
+
+    The length is the integral of the speed ``|B'(t)|`` over ``[t0, t1]``, evaluated with
+    composite Gauss-Legendre quadrature for all curves in one vectorized call. With the defaults
+    the typical relative error is below 1e-8; curves with a sharp bend (close to a cusp, where the
+    speed has a kink) converge more slowly, at worst around 1e-3, and benefit from more segments.
+
+    Args:
+        control_points (np.ndarray): The control points of M curves, shape (M, 4, 2).
+        t0 (Union[float, np.ndarray]): Start parameter, shared or one per curve. Default is 0.
+        t1 (Union[float, np.ndarray]): End parameter, shared or one per curve. Default is 1.
+        order (int): The number of quadrature nodes per segment. Default is `GAUSS_LEGENDRE_ORDER`.
+        segments (int): The number of equal segments ``[t0, t1]`` is split into. Default is `LENGTH_SEGMENTS`.
+
+    Returns:
+        np.ndarray: The length of every curve, shape (M,).
+    """
+    num_curves = len(control_points)
+    if num_curves == 0:
+        return np.zeros(0)
+
+    t0 = np.broadcast_to(np.asarray(t0, dtype=float), (num_curves,))
+    t1 = np.broadcast_to(np.asarray(t1, dtype=float), (num_curves,))
+
+    edges = t0[:, None] + (t1 - t0)[:, None] * np.linspace(0.0, 1.0, segments + 1)
+    return _interval_lengths(control_points, edges[:, :-1], edges[:, 1:], order).sum(axis=1)
+
+
+class ArcLengthTable:
+    """Tables of the cumulative arc length of many cubic Bezier curves, for moving along them at constant speed.
+
+    The parameter range of every curve is split into ``num_samples - 1`` equal intervals whose
+    lengths are integrated with Gauss-Legendre quadrature. An arc length is mapped back to the
+    curve parameter by a binary search in the table of its curve, linear interpolation within the
+    interval and one Newton step, for all curves at once.
+
+    Attributes:
+        control_points (np.ndarray): The control points of the M curves, shape (M, 4, 2).
+        t (np.ndarray): The parameters the table is sampled at, shape (num_samples,).
+        lengths (np.ndarray): The arc length from the start of every curve to every sample, shape (M, num_samples).
+        total (np.ndarray): The length of every curve, shape (M,).
+        order (int): The number of quadrature nodes per table interval.
+    """
+
+    def __init__(self, control_points: np.ndarray, num_samples: int = 32, order: int = GAUSS_LEGENDRE_ORDER):
+        """
+        Build the tables.
+
+        Args:
+            control_points (np.ndarray): The control points of M curves, shape (M, 4, 2).
+            num_samples (int): The number of table entries per curve, at least 2. Default is 32.
+            order (int): The number of quadrature nodes per table interval. Default is `GAUSS_LEGENDRE_ORDER`.
+        """
+        self.control_points = np.asarray(control_points, dtype=float)
+        self.order = order
+        num_curves = len(self.control_points)
+
+        self.t = np.linspace(0.0, 1.0, num_samples)
+        t0 = np.broadcast_to(self.t[:-1], (num_curves, num_samples - 1))
+        t1 = np.broadcast_to(self.t[1:], (num_curves, num_samples - 1))
+
+        self.lengths = np.zeros((num_curves, num_samples))
+        np.cumsum(_interval_lengths(self.control_points, t0, t1, order), axis=1, out=self.lengths[:, 1:])
+        self.total = self.lengths[:, -1]
+
+    def parameters_at(self, distance: np.ndarray) -> np.ndarray:
+        """
+        Get the curve parameters at arc lengths along the curves.
+
+        Args:
+            distance (np.ndarray): Arc length from the start of every curve, shape (M,) or (M, K). Values outside
+                ``[0, total]`` are clipped to the ends of the curve.
+
+        Returns:
+            np.ndarray: The parameter ``t`` of every distance, with the shape of ``distance``.
+        """
+        distance = np.asarray(distance, dtype=float)
+        num_curves, num_samples = self.lengths.shape
+        queries = distance.reshape(num_curves, -1)
+
+        # Search all curves at once: the tables are normalized to [0, 1] and shifted apart by curve
+        has_length = self.total > 0
+        scale = np.where(has_length, self.total, 1.0)[:, None]
+        offsets = 2.0 * np.arange(num_curves)[:, None]
+
+        table = np.where(has_length[:, None], self.lengths / scale, self.t) + offsets
+        fraction = np.clip(queries / scale, 0.0, 1.0)
+        fraction = np.where(has_length[:, None], fraction, 0.0)
+
+        index = np.searchsorted(table.ravel(), (fraction + offsets).ravel(), side="right").reshape(queries.shape)
+        index = np.clip(index - offsets.astype(np.int64) // 2 * num_samples - 1, 0, num_samples - 2)
+
+        rows = np.arange(num_curves)[:, None]
+        start, end = self.lengths[rows, index], self.lengths[rows, index + 1]
+        width = end - start
+        within = np.divide(np.clip(queries, start, end) - start, width, out=np.zeros_like(width), where=width > 0)
+
+        t_start = self.t[index]
+        t_end = self.t[index + 1]
+        t = t_start + within * (t_end - t_start)
+
+        # One Newton step on the arc length within the interval removes most of the interpolation error
+        partial = start + _interval_lengths(self.control_points, t_start, t, self.order)
+        speed = np.linalg.norm(bezier_derivatives(self.control_points, t), axis=-1)
+        step = np.divide(np.clip(queries, start, end) - partial, speed, out=np.zeros_like(speed), where=speed > 0)
+        t = np.clip(t + step, t_start, t_end)
+
+        return t.reshape(distance.shape)
+
+    def points_at(self, distance: np.ndarray) -> np.ndarray:
+        """
+        Get the points at arc lengths along the curves.
+
+        Args:
+            distance (np.ndarray): Arc length from the start of every curve, shape (M,) or (M, K).
+
+        Returns:
+            np.ndarray: The points, shape (M, 2) or (M, K, 2).
+        """
+        distance = np.asarray(distance, dtype=float)
+        t = self.parameters_at(distance).reshape(len(self.control_points), -1)
+        return bezier_points(self.control_points, t).reshape(distance.shape + (2,))
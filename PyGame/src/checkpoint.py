@@ -0,0 +1,233 @@
+import json
+import random
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import opensimplex
+
+from src.events import FriendshipEvents
+from src.noise import SimplexNoise
+from src.simulation import Simulation
+from src.structures import FriendshipGraph, People
+from src.wellbeing import WellbeingDynamics
+
+CHECKPOINT_VERSION = 1
+
+PEOPLE_ARRAYS = ("x", "y", "speed_coefficient", "sfc", "wpc", "irc", "colors", "wellbeing")
+
+# Saved parameters that cannot be changed when a checkpoint is loaded
+FIXED_PARAMETERS = ("num_people", "noise_backend", "noise_seed")
+
+
+def _rng_state(rng) -> Tuple[Dict[str, Any], np.ndarray]:
+    """Split the state of a random state (or of the global NumPy one) into JSON metadata and its key array."""
+    name, keys, pos, has_gauss, cached_gaussian = rng.get_state()
+    meta = {"global": rng is np.random, "name": name, "pos": int(pos), "has_gauss": int(has_gauss), "cached_gaussian": float(cached_gaussian)}
+    return meta, keys
+
+
+def _restore_rng(meta: Dict[str, Any], keys: np.ndarray):
+    """Rebuild a random state, or reset the global NumPy one, from `_rng_state` output."""
+    rng = np.random if meta["global"] else np.random.RandomState()
+    rng.set_state((meta["name"], keys, meta["pos"], meta["has_gauss"], meta["cached_gaussian"]))
+    return rng
+
+
+def _noise_parameters(noise) -> Tuple[str, Optional[int]]:
+    """Get the backend and seed `People` needs to recreate a noise generator."""
+    if isinstance(noise, SimplexNoise):
+        return "vectorized", noise.get_seed()
+    if noise is opensimplex:
+        # The global generator, its seed is restored separately
+        return "opensimplex", None
+    return "opensimplex", noise.get_seed()
+
+
+def save_checkpoint(simulation: Simulation, path: str):
+    """
+    Write the full state of a simulation to a single binary file.
+
+    The file is an uncompressed ``.npz`` archive: the people arrays, the friendship edge keys
+    (``i * num_people + j``) and the key arrays of the random states are stored as they are, and
+    everything else (time, step count, model parameters, the remaining random state) as a JSON
+    header. The global `random`, NumPy and opensimplex states are included, so a simulation that
+    draws from them resumes exactly as well. Observers and the profiler are not saved, and event-driven
+    friendship dynamics restart from the saved friendships with fresh rates and waiting time, so they
+    continue statistically rather than bit-identically.
+
+    Args:
+        simulation (Simulation): The simulation to save.
+        path (str): Path of the file to write.
+    """
+    people = simulation.people
+    graph = simulation.friendship_graph
+
+    noise_backend, noise_seed = _noise_parameters(people.noise)
+    wellbeing_dynamics = simulation.wellbeing_dynamics
+
+    parameters = {
+        "num_people": people.num_people,
+        "friend_attractiveness": people.friend_attractiveness,
+        "establishment_equ_prob_dist": graph.establishment_equ_prob_dist,
+        "break_equ_prob_dist": graph.break_equ_prob_dist,
+        "time_step": simulation.time_step,
+        "storage": graph.storage,
+        "cutoff_tolerance": graph.cutoff_tolerance,
+        "probability_table_size": graph.probability_table_size,
+        "tile_elements": graph.tile_elements,
+        "track_statistics": graph.statistics is not None,
+        "precision": "single" if people.dtype == np.float32 else "double",
+        "noise_backend": noise_backend,
+        "noise_seed": noise_seed,
+        "noise_chunk_size": people.noise_provider.chunk_size if people.noise_provider is not None else None,
+        "wellbeing_dynamics": vars(wellbeing_dynamics).copy() if wellbeing_dynamics is not None else None,
+        "event_driven": simulation.friendship_events is not None,
+    }
+
+    people_rng, people_rng_keys = _rng_state(people.rng)
+    graph_rng, graph_rng_keys = _rng_state(graph.rng)
+    python_version, python_keys, python_gauss = random.getstate()
+
+    meta = {
+        "version": CHECKPOINT_VERSION,
+        "t": simulation.t,
+        "steps": simulation.steps,
+        "parameters": parameters,
+        "people_rng": people_rng,
+        "graph_rng": graph_rng,
+        "shared_rng": people.rng is graph.rng,
+        "python_random": {"version": python_version, "gauss_next": python_gauss},
+        "opensimplex_seed": opensimplex.get_seed(),
+    }
+
+    idxs, jdxs = graph.get_friendships()
+    arrays = {name: getattr(people, name) for name in PEOPLE_ARRAYS}
+
+    with open(path, "wb") as file:
+        np.savez(
+            file,
+            meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+            edge_keys=idxs.astype(np.int64) * people.num_people + jdxs,
+            people_rng_keys=people_rng_keys,
+            graph_rng_keys=graph_rng_keys,
+            python_random_keys=np.array(python_keys, dtype=np.uint64),
+            **arrays,
+        )
+
+
+def _read_checkpoint(path: str) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    with np.load(path, allow_pickle=False) as archive:
+        arrays = {name: archive[name] for name in archive.files}
+
+    meta = json.loads(arrays.pop("meta").tobytes().decode())
+    if meta["version"] != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version {meta['version']}, expected {CHECKPOINT_VERSION}")
+
+    return meta, arrays
+
+
+def _build_simulation(
+    meta: Dict[str, Any], arrays: Dict[str, np.ndarray], seed: Optional[int], overrides: Dict[str, Any]
+) -> Simulation:
+    """Recreate a simulation from the contents of a checkpoint file."""
+    parameters = dict(meta["parameters"])
+    for name, value in overrides.items():
+        if name not in parameters or name in FIXED_PARAMETERS:
+            raise ValueError(f"Parameter {name!r} cannot be overridden when loading a checkpoint")
+        parameters[name] = value
+
+    if seed is not None:
+        # A branch: same state, its own random future
+        people_rng = graph_rng = np.random.RandomState(seed)
+    else:
+        random.setstate((meta["python_random"]["version"], tuple(arrays["python_random_keys"].tolist()), meta["python_random"]["gauss_next"]))
+        opensimplex.seed(meta["opensimplex_seed"])
+        people_rng = _restore_rng(meta["people_rng"], arrays["people_rng_keys"])
+        graph_rng = people_rng if meta["shared_rng"] else _restore_rng(meta["graph_rng"], arrays["graph_rng_keys"])
+
+    num_people = parameters["num_people"]
+
+    # The initial draws of the people are overwritten right away, so they come from a throwaway random state
+    people = People(
+        num_people,
+        friend_attractiveness=parameters["friend_attractiveness"],
+        rng=np.random.RandomState(0),
+        noise_seed=parameters["noise_seed"],
+        noise_backend=parameters["noise_backend"],
+        precision=parameters["precision"],
+    )
+    for name in PEOPLE_ARRAYS:
+        setattr(people, name, arrays[name].astype(getattr(people, name).dtype, copy=False))
+    people.rng = people_rng
+    if parameters["noise_chunk_size"] is not None:
+        people.buffer_noise(parameters["time_step"], chunk_size=parameters["noise_chunk_size"])
+
+    friendship_graph = FriendshipGraph(
+        num_people,
+        establishment_equ_prob_dist=parameters["establishment_equ_prob_dist"],
+        break_equ_prob_dist=parameters["break_equ_prob_dist"],
+        storage=parameters["storage"],
+        cutoff_tolerance=parameters["cutoff_tolerance"],
+        rng=graph_rng,
+        probability_table_size=parameters["probability_table_size"],
+        track_statistics=parameters["track_statistics"],
+        precision=parameters["precision"],
+        tile_elements=parameters["tile_elements"],
+    )
+    friendship_graph.add_friendships(*np.divmod(arrays["edge_keys"], num_people))
+
+    wellbeing_dynamics = None
+    if parameters["wellbeing_dynamics"] is not None:
+        wellbeing_dynamics = WellbeingDynamics(**parameters["wellbeing_dynamics"])
+
+    friendship_events = FriendshipEvents(friendship_graph) if parameters["event_driven"] else None
+
+    simulation = Simulation(
+        people,
+        friendship_graph,
+        time_step=parameters["time_step"],
+        t=meta["t"],
+        wellbeing_dynamics=wellbeing_dynamics,
+        friendship_events=friendship_events,
+    )
+    simulation.steps = meta["steps"]
+
+    return simulation
+
+
+def load_checkpoint(path: str, seed: Optional[int] = None, **overrides) -> Simulation:
+    """
+    Restore a simulation from a checkpoint file written by `save_checkpoint`.
+
+    Without a seed or overrides, the restored simulation continues bit-identically to the one that
+    was saved. Loading restores the global `random`, NumPy and opensimplex states saved with it.
+
+    Args:
+        path (str): Path of the checkpoint file.
+        seed (Optional[int]): If given, the simulation draws from a new random state seeded with this value
+            instead of the saved one, and the global random states are left alone. Default is None.
+        **overrides: Model parameters to change, by their `create_simulation` name, e.g. ``break_equ_prob_dist``
+            or ``wellbeing_dynamics`` (a dict of `WellbeingDynamics` arguments).
+
+    Returns:
+        Simulation: The restored simulation.
+    """
+    meta, arrays = _read_checkpoint(path)
+    return _build_simulation(meta, arrays, seed, overrides)
+
+
+def fork_checkpoint(path: str, seeds: Sequence[int], **overrides) -> List[Simulation]:
+    """
+    Start several what-if branches from one checkpoint, reading the file only once.
+
+    Args:
+        path (str): Path of the checkpoint file.
+        seeds (Sequence[int]): Seed of the random state of every branch.
+        **overrides: Model parameters to change in all branches, see `load_checkpoint`.
+
+    Returns:
+        List[Simulation]: One independent simulation per seed.
+    """
+    meta, arrays = _read_checkpoint(path)
+    # Every branch gets its own copy of the arrays, so that no branch can change another one
+    return [_build_simulation(meta, {name: array.copy() for name, array in arrays.items()}, seed, overrides) for seed in seeds]
@@ -0,0 +1,253 @@
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+
+from src.spatial import neighbour_pairs
+from src.structures import FriendshipGraph, People
+
+
+def event_rates(establishment_prob: np.ndarray, breaking_prob: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert the per-step probabilities of the friendship passes into continuous-time rates.
+
+    In a step of the per-step model a pair that is not yet friends becomes friends with probability
+    ``p_e * (1 - p_b)`` (it can be broken up again in the same step), and friends stay friends with
+    probability ``1 - p_b``. This two-state chain is friends a share ``p_e (1 - p_b) / (1 - (1 - p_e)(1 - p_b))``
+    of the time and forgets its state by a factor ``(1 - p_e)(1 - p_b)`` per step. The rates ``a`` and ``b``
+    (per step) of the continuous-time chain with the same stationary share and relaxation are
+    ``a + b = -ln((1 - p_e)(1 - p_b))`` split in the ratio of that share.
+
+    Args:
+        establishment_prob (np.ndarray): Per-step probability that a pair becomes friends.
+        breaking_prob (np.ndarray): Per-step probability that friends break up.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The establishment and breaking rate of every pair, per step.
+    """
+    # A certain event would have an infinite rate
+    establishment_prob = np.clip(establishment_prob, 0.0, 1.0 - 1.0e-12)
+    breaking_prob = np.clip(breaking_prob, 0.0, 1.0 - 1.0e-12)
+
+    total = -(np.log1p(-establishment_prob) + np.log1p(-breaking_prob))
+    changing = -np.expm1(-total)
+    share = np.divide(establishment_prob * (1 - breaking_prob), changing, out=np.zeros_like(total), where=changing > 0)
+
+    return share * total, (1 - share) * total
+
+
+def _sorted_unique(values: np.ndarray) -> np.ndarray:
+    """The distinct values of a sorted array."""
+    if len(values) == 0:
+        return values
+    return values[np.concatenate(([True], values[1:] != values[:-1]))]
+
+
+class FriendshipEvents:
+    """An event-driven alternative to the per-step friendship passes of `FriendshipGraph`.
+
+    Instead of drawing a Bernoulli trial for every pair on every step, every candidate pair has an
+    establishment or breaking rate (see `event_rates`) and the time to the next event of the
+    whole graph is drawn from the total rate, Gillespie style. The exponential waiting time is
+    carried over from step to step, so a quiet stretch of many steps costs no random draws at all;
+    each event costs two (when it happens and which pair it is). The rates are kept in blocks of
+    about sqrt(pairs) with a running total per block, so an event costs O(sqrt(pairs)). Only the
+    rates of the pairs that changed are written: those of flipped pairs and of the pairs of people
+    who moved. A step without events and without movement beyond ``refresh_distance`` costs an
+    O(N) check of who moved and an O(sqrt(pairs)) sum of the block totals.
+
+    The candidate pairs are the pairs within the cutoff radius of the graph plus a skin, and its
+    friendships; without a cutoff radius, all pairs. They are only searched again once somebody
+    moved more than half the skin. Rates are only recomputed for the pairs of people who moved
+    more than ``refresh_distance`` since their rates were last computed; in between, the rates
+    are those of slightly older positions.
+
+    The engine assumes it is the only thing changing the friendships of its graph; call `reset`
+    after changing them otherwise.
+
+    Attributes:
+        friendship_graph (FriendshipGraph): The graph whose friendships are updated.
+        skin (float): Extra distance beyond the cutoff radius within which pairs are candidates.
+        refresh_distance (float): How far a person may move before the rates of their pairs are recomputed.
+        rng (np.random.RandomState): Random state to draw from.
+        num_events (int): The number of events so far.
+    """
+
+    def __init__(
+        self,
+        friendship_graph: FriendshipGraph,
+        skin: float = 0.05,
+        refresh_distance: float = 1.0e-3,
+        rng: Optional[np.random.RandomState] = None,
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            friendship_graph (FriendshipGraph): The graph whose friendships are updated, and whose probability
+                functions and cutoff radius are used.
+            skin (float): Extra distance beyond the cutoff radius within which pairs are candidates. Default is 0.05.
+            refresh_distance (float): How far a person may move before the rates of their pairs are recomputed.
+                Default is 1e-3.
+            rng (Optional[np.random.RandomState]): Random state to draw from. Defaults to the one of the graph.
+        """
+        self.friendship_graph = friendship_graph
+        self.skin = skin
+        self.refresh_distance = refresh_distance
+        self.rng = rng if rng is not None else friendship_graph.rng
+        self.num_events = 0
+
+        self._hazard: Optional[float] = None
+        self.reset()
+
+    def reset(self):
+        """Forget the candidate pairs and rates, so that they are rebuilt from the graph on the next step."""
+        self._keys: Optional[np.ndarray] = None
+
+    def _rebuild(self, people: People):
+        graph = self.friendship_graph
+        num_people = people.num_people
+
+        if graph.cutoff_radius is not None:
+            idxs, jdxs, _ = neighbour_pairs(people.x, people.y, graph.cutoff_radius + self.skin)
+        else:
+            idxs, jdxs = np.triu_indices(num_people, k=1)
+
+        friend_idxs, friend_jdxs = graph.get_friendships()
+        friend_keys = friend_idxs.astype(np.int64) * num_people + friend_jdxs
+
+        # Friends outside the search radius are candidates too, so that they can break up
+        keys = idxs.astype(np.int64) * num_people + jdxs
+        is_friend = np.isin(keys, friend_keys, assume_unique=True, kind="sort")
+        distant_friends = friend_keys[~np.isin(friend_keys, keys[is_friend], assume_unique=True, kind="sort")]
+
+        self._keys = np.concatenate((keys, distant_friends))
+        self._idxs, self._jdxs = np.divmod(self._keys, num_people)
+        self._is_friend = np.concatenate((is_friend, np.ones(len(distant_friends), dtype=bool)))
+        num_pairs = len(self._keys)
+
+        # The candidate pairs of every person, so that the pairs of the people who moved are found without a scan
+        owners = np.concatenate((self._idxs, self._jdxs))
+        order = np.argsort(owners, kind="stable")
+        self._person_pairs = order % max(num_pairs, 1)
+        self._person_begin = np.searchsorted(owners[order], np.arange(num_people + 1))
+
+        # The rate of the next event of every pair, in blocks of about sqrt(pairs) with their totals
+        self._block_size = max(1, math.isqrt(num_pairs))
+        self._rates = np.zeros(-(-num_pairs // self._block_size) * self._block_size)
+        self._blocks = self._rates.reshape(-1, self._block_size)
+        self._block_totals = np.zeros(len(self._blocks))
+
+        self._establishment_rate = np.zeros(num_pairs)
+        self._breaking_rate = np.zeros(num_pairs)
+        self._update_rates(people, np.arange(num_pairs))
+
+        self._built_x, self._built_y = people.x.copy(), people.y.copy()
+        self._rated_x, self._rated_y = people.x.copy(), people.y.copy()
+
+    def _update_rates(self, people: People, pairs: np.ndarray):
+        """Recompute the rates of some pairs, given as sorted unique indices."""
+        graph = self.friendship_graph
+        idxs, jdxs = self._idxs[pairs], self._jdxs[pairs]
+        distance = np.sqrt((people.x[idxs] - people.x[jdxs]) ** 2.0 + (people.y[idxs] - people.y[jdxs]) ** 2.0)
+
+        establishment_prob = graph.establishment_prob(distance)
+        if graph.cutoff_radius is not None:
+            # Like the per-step passes, pairs outside the cutoff radius never become friends
+            establishment_prob = np.where(distance <= graph.cutoff_radius, establishment_prob, 0.0)
+
+        self._establishment_rate[pairs], self._breaking_rate[pairs] = event_rates(establishment_prob, graph.breaking_prob(distance))
+
+        self._rates[pairs] = np.where(self._is_friend[pairs], self._breaking_rate[pairs], self._establishment_rate[pairs])
+        blocks = _sorted_unique(pairs // self._block_size)
+        self._block_totals[blocks] = self._blocks[blocks].sum(axis=1)
+
+    def _refresh(self, people: People):
+        """Bring the candidate pairs and the rates up to date with the positions of the people."""
+        if self._keys is None:
+            self._rebuild(people)
+            return
+
+        if self.friendship_graph.cutoff_radius is not None:
+            displacement = np.hypot(people.x - self._built_x, people.y - self._built_y)
+            if len(displacement) and displacement.max() > self.skin / 2:
+                # Somebody may have come within the cutoff radius of a pair that is not a candidate
+                self._rebuild(people)
+                return
+
+        is_moved = np.hypot(people.x - self._rated_x, people.y - self._rated_y) > self.refresh_distance
+        moved = np.flatnonzero(is_moved)
+        if len(moved) == 0:
+            return
+
+        begin, end = self._person_begin[moved], self._person_begin[moved + 1]
+        counts = end - begin
+        num_touched = int(counts.sum())
+        if num_touched > len(self._keys) // 8:
+            # Most pairs are touched, a scan is cheaper than collecting and deduplicating them
+            pairs = np.flatnonzero(is_moved[self._idxs] | is_moved[self._jdxs])
+        else:
+            offsets = np.arange(num_touched) - np.repeat(np.cumsum(counts) - counts, counts)
+            pairs = _sorted_unique(np.sort(self._person_pairs[np.repeat(begin, counts) + offsets]))
+        self._update_rates(people, pairs)
+
+        self._rated_x[moved] = people.x[moved]
+        self._rated_y[moved] = people.y[moved]
+
+    def step(self, people: People, duration: float = 1.0) -> Tuple[int, int]:
+        """
+        Advance the friendships by a stretch of time with the rates of the current positions.
+
+        Args:
+            people (People): The people.
+            duration (float): The time to advance, in steps of the per-step model. Default is 1.
+
+        Returns:
+            Tuple[int, int]: The number of friendships added and removed.
+        """
+        self._refresh(people)
+        if self._hazard is None:
+            self._hazard = self.rng.exponential()
+
+        blocks, block_totals, block_size = self._blocks, self._block_totals, self._block_size
+
+        flipped = []
+        remaining = duration
+        while True:
+            cumulative = np.cumsum(block_totals)
+            total = cumulative[-1] if len(cumulative) else 0.0
+            if total <= 0 or self._hazard > total * remaining:
+                break
+            remaining -= self._hazard / total
+
+            # Pick the pair of the event with probability proportional to its rate, block first
+            target = self.rng.rand() * total
+            block = min(int(np.searchsorted(cumulative, target, side="right")), len(cumulative) - 1)
+            target -= cumulative[block - 1] if block > 0 else 0.0
+            within = min(int(np.searchsorted(np.cumsum(blocks[block]), target, side="right")), block_size - 1)
+            if blocks[block, within] == 0:
+                # Rounding carried the target past the last pair with a rate
+                within = int(np.flatnonzero(blocks[block])[-1])
+            pair = block * block_size + within
+
+            self._is_friend[pair] = not self._is_friend[pair]
+            flipped.append(pair)
+
+            self._rates[pair] = self._breaking_rate[pair] if self._is_friend[pair] else self._establishment_rate[pair]
+            block_totals[block] = blocks[block].sum()
+
+            self._hazard = self.rng.exponential()
+
+        self._hazard -= total * remaining
+        self.num_events += len(flipped)
+
+        # Only pairs that flipped an odd number of times changed
+        pairs, counts = np.unique(np.array(flipped, dtype=np.int64), return_counts=True)
+        changed = pairs[counts % 2 == 1]
+        added, removed = changed[self._is_friend[changed]], changed[~self._is_friend[changed]]
+
+        graph = self.friendship_graph
+        num_added = graph.add_friendships(self._idxs[added], self._jdxs[added])
+        num_removed = graph.remove_friendships(self._idxs[removed], self._jdxs[removed])
+
+        return num_added, num_removed
@@ -1,62 +1,159 @@
 import math
-from typing import Callable, Union
+from functools import lru_cache
+from typing import Callable, Optional, Tuple, Union
 
 import numpy as np
-from scipy.optimize import root
 
 # Constants
 MAXIMUM_DISTANCE = math.sqrt(2)
 
 
+def tabulate_probability(
+    probability: Callable[[Union[float, np.ndarray]], Union[float, np.ndarray]],
+    table_size: int,
+    second_derivative_bound: float,
+) -> Callable[[Union[float, np.ndarray]], Union[float, np.ndarray]]:
+    """
+    Returns a lookup-table version of a probability function of the distance.
+
+    The function is sampled once at ``table_size`` evenly spaced distances over [0, MAXIMUM_DISTANCE]
+    and evaluated by linear interpolation between the samples. Distances outside of that range are
+    clamped to it. The returned function has an ``error_bound`` attribute, the largest possible
+    absolute difference to the analytic function, ``h ** 2 / 8 * max|f''|`` for a sample spacing ``h``.
+
+    Args:
+        probability: The function to tabulate.
+        table_size: The number of samples, at least 2.
+        second_derivative_bound: An upper bound of the absolute second derivative of the function.
+
+    Returns:
+        A function that interpolates the tabulated probability.
+    """
+    spacing = MAXIMUM_DISTANCE / (table_size - 1)
+    table = np.asarray(probability(np.linspace(0, MAXIMUM_DISTANCE, table_size)), dtype=np.float64)
+    slopes = np.diff(table)
+
+    def tabulated_probability(
+        distance: Union[float, np.ndarray]
+    ) -> Union[float, np.ndarray]:
+        position = np.clip(distance, 0, MAXIMUM_DISTANCE) / spacing
+        index = np.minimum(position.astype(np.intp), table_size - 2)
+        probability = table[index] + (position - index) * slopes[index]
+        if isinstance(distance, np.ndarray) and distance.dtype == np.float32:
+            # Keep single precision distances in single precision, anything else gets the double precision table
+            return probability.astype(np.float32)
+        return probability
+
+    tabulated_probability.error_bound = spacing**2 / 8 * second_derivative_bound
+
+    return tabulated_probability
+
+
 def friendship_establishment_probability(
     equ_prob_dist: float,
+    table_size: Optional[int] = None,
 ) -> Callable[[Union[float, np.ndarray]], Union[float, np.ndarray]]:
     """
     Returns a function that calculates the probability of friendship establishment based on the distance between two nodes.
 
     Args:
         equ_prob_dist: The distance at which the probability of friendship establishment is 0.5.
+        table_size: If given, the function is evaluated from a lookup table of this size, see `tabulate_probability`.
 
     Returns:
         A function that calculates the probability of friendship establishment based on the distance between two nodes.
     """
-    lam = -np.log(0.5) / equ_prob_dist
+    # A Python float, so that single precision distances give single precision probabilities
+    lam = -math.log(0.5) / equ_prob_dist
 
     def establishment_probability(
         distance: Union[float, np.ndarray]
     ) -> Union[float, np.ndarray]:
         return np.exp(-lam * distance)
 
+    if table_size is not None:
+        # The second derivative lam^2 * exp(-lam * d) is largest at d = 0
+        return tabulate_probability(establishment_probability, table_size, lam**2)
+
     return establishment_probability
 
 
+def _log1p_exp(s: float) -> float:
+    """``log(1 + exp(s))`` without overflow for large ``s``."""
+    return s + math.log1p(math.exp(-s)) if s > 0 else math.log1p(math.exp(s))
+
+
+@lru_cache(maxsize=None)
+def breaking_curve_constants(equ_prob_dist: float) -> Tuple[float, float]:
+    """
+    Solves for the constants of the friendship breaking curve ``c1 * (exp(lam * d) - 1)``.
+
+    The curve reaches 1 at MAXIMUM_DISTANCE, so ``lam = log(1 + 1 / c1) / MAXIMUM_DISTANCE``, and
+    ``c1`` is the root of ``K * log(1 + 1 / c1) - log(1 + 1 / (2 * c1))`` for
+    ``K = equ_prob_dist / MAXIMUM_DISTANCE``. The root is bisected for in ``s = -log(c1)``, where
+    the equation is positive for small ``s`` and crosses zero once when ``1/2 < K < 1``. Outside of that
+    range there is no root and the curve closest to it within the bracket is returned: for ``K <= 1/2``
+    the nearly straight line ``d / MAXIMUM_DISTANCE``.
+
+    The result is memoized, so building many breaking functions with the same parameter solves
+    the root only once.
+
+    Args:
+        equ_prob_dist: The distance at which the probability of friendship breaking is 0.5.
+
+    Returns:
+        The constants ``(c1, lam)``.
+    """
+    K = equ_prob_dist / MAXIMUM_DISTANCE
+
+    def equation(s: float) -> float:
+        return K * _log1p_exp(s) - _log1p_exp(s - math.log(2))
+
+    # c1 from 1e6 (an almost straight line with little cancellation in exp(lam * d) - 1) down to exp(-700)
+    low, high = -math.log(1.0e6), 700.0
+    if equation(low) <= 0:
+        high = low
+    elif equation(high) >= 0:
+        low = high
+
+    for _ in range(100):
+        middle = (low + high) / 2
+        if middle in (low, high):
+            break
+        if equation(middle) > 0:
+            low = middle
+        else:
+            high = middle
+
+    s = (low + high) / 2
+    return math.exp(-s), _log1p_exp(s) / MAXIMUM_DISTANCE
+
+
 def friendship_breaking_probability(
     equ_prob_dist: float,
+    table_size: Optional[int] = None,
 ) -> Callable[[Union[float, np.ndarray]], Union[float, np.ndarray]]:
     """
     Returns a function that calculates the probability of friendship breaking based on the distance between two nodes.
 
     Args:
         equ_prob_dist: The distance at which the probability of friendship breaking is 0.5.
+        table_size: If given, the function is evaluated from a lookup table of this size, see `tabulate_probability`.
 
     Returns:
         A function that calculates the probability of friendship breaking based on the distance between two nodes.
     """
-    K = equ_prob_dist / MAXIMUM_DISTANCE
-
-    def equation(c1: float) -> float:
-        return K * np.log(1 + 1 / c1) - np.log(1 + 1 / (2 * c1))
-
-    # Using the hybrid method to find the root for better stability
-    c1_solution = root(equation, 1.0e-6, method="hybr")
-    c1 = float(c1_solution.x[0])
-    lam = (1 / MAXIMUM_DISTANCE) * np.log(1 + 1 / c1)
+    c1, lam = breaking_curve_constants(equ_prob_dist)
 
     def breaking_probability(
         distance: Union[float, np.ndarray]
     ) -> Union[float, np.ndarray]:
         return np.minimum(c1 * (np.exp(lam * distance) - 1), 1)
 
+    if table_size is not None:
+        # The second derivative c1 * lam^2 * exp(lam * d) is largest at the maximum distance
+        return tabulate_probability(breaking_probability, table_size, c1 * lam**2 * math.exp(lam * MAXIMUM_DISTANCE))
+
     return breaking_probability
 
 
@@ -81,3 +178,40 @@ def alternative_friendship_breaking_probability(
         return establishment_prob(np.maximum(0, MAXIMUM_DISTANCE - distance))
 
     return sym_breaking_probability
+
+
+def establishment_cutoff_distance(equ_prob_dist: float, num_people: int, tolerance: float) -> float:
+    """
+    Returns the distance beyond which friendship establishment can be ignored.
+
+    For people spread uniformly over the unit square, the expected number of friendships a
+    person would have established with people further away than ``R`` in a single step is
+    ``num_people * 2 * pi * exp(-lam * R) * (R / lam + 1 / lam ** 2)``. The cutoff is the
+    smallest ``R`` for which this missed probability mass does not exceed ``tolerance``.
+
+    Args:
+        equ_prob_dist: The distance at which the probability of friendship establishment is 0.5.
+        num_people: The number of people in the simulation.
+        tolerance: The tolerated expected number of missed friendships per person and step.
+
+    Returns:
+        The cutoff distance, at most MAXIMUM_DISTANCE.
+    """
+    lam = -math.log(0.5) / equ_prob_dist
+
+    def missed_mass(radius: float) -> float:
+        return num_people * 2 * math.pi * math.exp(-lam * radius) * (radius / lam + 1 / lam**2)
+
+    if missed_mass(MAXIMUM_DISTANCE) > tolerance:
+        return MAXIMUM_DISTANCE
+
+    # The missed mass decreases monotonically with the radius, so bisect for it
+    low, high = 0.0, MAXIMUM_DISTANCE
+    for _ in range(60):
+        middle = (low + high) / 2
+        if missed_mass(middle) > tolerance:
+            low = middle
+        else:
+            high = middle
+
+    return high
@@ -0,0 +1,144 @@
+from collections import defaultdict
+from typing import Dict, Optional, Set, Tuple
+
+import numpy as np
+
+
+class GraphStatistics:
+    """Statistics of a friendship graph, maintained incrementally from its edge changes.
+
+    Degrees, the edge count, the degree histogram and the triangle counts are updated for every
+    added or removed friendship, so keeping them costs O(changes) per step rather than a rescan of
+    the whole graph. Triangles are counted from the common friends of the two ends of a changed
+    edge, which are found through per-person sets of friends. Connected components are only
+    recomputed when asked for after the graph has changed.
+
+    Attributes:
+        num_people (int): The number of people in the graph.
+        degree (np.ndarray): The number of friends of every person.
+        num_edges (int): The number of friendships.
+        degree_histogram (np.ndarray): The number of people with each degree, indexed by degree.
+        triangles (np.ndarray): The number of triangles every person is part of.
+        num_triangles (int): The number of triangles in the graph.
+    """
+
+    def __init__(self, num_people: int):
+        """
+        Initialize the statistics of an empty graph.
+
+        Args:
+            num_people (int): The number of people in the graph.
+        """
+        self.num_people = num_people
+        self.degree = np.zeros(num_people, dtype=np.int64)
+        self.num_edges = 0
+        self.degree_histogram = np.zeros(max(num_people, 1), dtype=np.int64)
+        self.degree_histogram[0] = num_people
+        self.triangles = np.zeros(num_people, dtype=np.int64)
+        self.num_triangles = 0
+
+        self._friends: Dict[int, Set[int]] = defaultdict(set)
+        self._components: Optional[Tuple[int, np.ndarray]] = None
+
+    def _update_degrees(self, idxs: np.ndarray, jdxs: np.ndarray, sign: int):
+        people = np.concatenate((idxs, jdxs))
+        changed, counts = np.unique(people, return_counts=True)
+
+        np.subtract.at(self.degree_histogram, self.degree[changed], 1)
+        self.degree[changed] += sign * counts
+        np.add.at(self.degree_histogram, self.degree[changed], 1)
+
+        self.num_edges += sign * len(idxs)
+
+    def add_edges(self, idxs: np.ndarray, jdxs: np.ndarray):
+        """
+        Account for newly added friendships.
+
+        Args:
+            idxs (np.ndarray): Indices of the first friend of every added friendship.
+            jdxs (np.ndarray): Indices of the second friend of every added friendship; no friendship may exist yet.
+        """
+        if len(idxs) == 0:
+            return
+
+        common_friends = []
+        for i, j in zip(idxs.tolist(), jdxs.tolist()):
+            common = self._friends[i] & self._friends[j]
+            common_friends.append((i, j, common))
+            self._friends[i].add(j)
+            self._friends[j].add(i)
+
+        self._update_triangles(common_friends, 1)
+        self._update_degrees(idxs, jdxs, 1)
+        self._components = None
+
+    def remove_edges(self, idxs: np.ndarray, jdxs: np.ndarray):
+        """
+        Account for removed friendships.
+
+        Args:
+            idxs (np.ndarray): Indices of the first friend of every removed friendship.
+            jdxs (np.ndarray): Indices of the second friend of every removed friendship; all of them must exist.
+        """
+        if len(idxs) == 0:
+            return
+
+        common_friends = []
+        for i, j in zip(idxs.tolist(), jdxs.tolist()):
+            self._friends[i].discard(j)
+            self._friends[j].discard(i)
+            common_friends.append((i, j, self._friends[i] & self._friends[j]))
+
+        self._update_triangles(common_friends, -1)
+        self._update_degrees(idxs, jdxs, -1)
+        self._components = None
+
+    def _update_triangles(self, common_friends: list, sign: int):
+        people = []
+        for i, j, common in common_friends:
+            # Every common friend closes (or opens) one triangle with the edge
+            people.extend([i, j] * len(common))
+            people.extend(common)
+            self.num_triangles += sign * len(common)
+
+        if people:
+            self.triangles += sign * np.bincount(people, minlength=self.num_people)
+
+    def clustering_coefficients(self) -> np.ndarray:
+        """
+        Get the local clustering coefficient of every person.
+
+        Returns:
+            np.ndarray: The share of pairs of friends of every person that are friends themselves, 0 for
+                people with fewer than two friends.
+        """
+        pairs = self.degree * (self.degree - 1) / 2
+        return np.divide(self.triangles, pairs, out=np.zeros(self.num_people), where=pairs > 0)
+
+    def average_clustering(self) -> float:
+        """The mean local clustering coefficient over all people."""
+        return float(np.mean(self.clustering_coefficients())) if self.num_people else 0.0
+
+    def transitivity(self) -> float:
+        """The global clustering coefficient: three times the triangles per connected triple."""
+        triples = int(np.sum(self.degree * (self.degree - 1))) // 2
+        return 3 * self.num_triangles / triples if triples else 0.0
+
+    def connected_components(self) -> Tuple[int, np.ndarray]:
+        """
+        Get the connected components of the graph, recomputed only if the graph changed since the last call.
+
+        Returns:
+            Tuple[int, np.ndarray]: The number of components and the component label of every person.
+        """
+        if self._components is None:
+            from scipy.sparse import coo_matrix
+            from scipy.sparse.csgraph import connected_components
+
+            idxs = np.fromiter((i for i, friends in self._friends.items() for _ in friends), dtype=np.int64)
+            jdxs = np.fromiter((j for friends in self._friends.values() for j in friends), dtype=np.int64)
+
+            adjacency = coo_matrix((np.ones(len(idxs)), (idxs, jdxs)), shape=(self.num_people, self.num_people))
+            self._components = connected_components(adjacency, directed=False)
+
+        return self._components
@@ -0,0 +1,243 @@
+from typing import Optional, Tuple
+
+import numpy as np
+import opensimplex
+
+# Constants of the 2D OpenSimplex algorithm, identical to the ones used by the opensimplex package
+STRETCH_CONSTANT2 = -0.211324865405187  # (1/Math.sqrt(2+1)-1)/2
+SQUISH_CONSTANT2 = 0.366025403784439  # (Math.sqrt(2+1)-1)/2
+NORM_CONSTANT2 = 47
+GRADIENTS2 = np.array([5, 2, 2, 5, -5, 2, -2, 5, 5, -2, 2, -5, -5, -2, -2, -5], dtype=np.int64)
+
+# Upper bound on the number of noise values a NoiseProvider buffers at once
+MAX_BUFFER_ELEMENTS = 1 << 21
+
+
+def _overflow(value: int) -> int:
+    """Wrap an integer to a signed 64-bit integer."""
+    return (value + (1 << 63)) % (1 << 64) - (1 << 63)
+
+
+def simplex_permutation(seed: int) -> np.ndarray:
+    """
+    Build the permutation table of the opensimplex package for a given seed.
+
+    Args:
+        seed (int): The noise seed.
+
+    Returns:
+        np.ndarray: The 256 entry permutation table.
+    """
+    perm = np.zeros(256, dtype=np.int64)
+    source = np.arange(256)
+
+    seed = _overflow(seed * 6364136223846793005 + 1442695040888963407)
+    seed = _overflow(seed * 6364136223846793005 + 1442695040888963407)
+    seed = _overflow(seed * 6364136223846793005 + 1442695040888963407)
+    for i in range(255, -1, -1):
+        seed = _overflow(seed * 6364136223846793005 + 1442695040888963407)
+        r = int((seed + 31) % (i + 1))
+        perm[i] = source[r]
+        source[r] = source[i]
+
+    return perm
+
+
+def _extrapolate2(perm: np.ndarray, xsb: np.ndarray, ysb: np.ndarray, dx: np.ndarray, dy: np.ndarray) -> np.ndarray:
+    index = perm[(perm[xsb & 0xFF] + ysb) & 0xFF] & 0x0E
+    return GRADIENTS2[index] * dx + GRADIENTS2[index + 1] * dy
+
+
+def _contribution(attn: np.ndarray, extrapolation: np.ndarray) -> np.ndarray:
+    squared = attn * attn
+    return np.where(attn > 0, squared * squared * extrapolation, 0.0)
+
+
+def vectorized_noise2(x: np.ndarray, y: np.ndarray, perm: np.ndarray) -> np.ndarray:
+    """
+    Evaluate 2D OpenSimplex noise for whole arrays of coordinates at once.
+
+    This is a branch-free NumPy port of the scalar algorithm of the opensimplex package. Every
+    arithmetic operation is carried out in the same order, so the results are bit-identical.
+
+    Args:
+        x (np.ndarray): The x-coordinates.
+        y (np.ndarray): The y-coordinates, broadcastable against ``x``.
+        perm (np.ndarray): The permutation table, see `simplex_permutation`.
+
+    Returns:
+        np.ndarray: The noise values, between -1 and 1.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Place input coordinates onto grid.
+    stretch_offset = (x + y) * STRETCH_CONSTANT2
+    xs = x + stretch_offset
+    ys = y + stretch_offset
+
+    # Floor to get grid coordinates of rhombus (stretched square) super-cell origin.
+    xsb = np.floor(xs).astype(np.int64)
+    ysb = np.floor(ys).astype(np.int64)
+
+    # Skew out to get actual coordinates of rhombus origin.
+    squish_offset = (xsb + ysb) * SQUISH_CONSTANT2
+    xb = xsb + squish_offset
+    yb = ysb + squish_offset
+
+    # Compute grid coordinates relative to rhombus origin.
+    xins = xs - xsb
+    yins = ys - ysb
+    in_sum = xins + yins
+
+    # Positions relative to origin point.
+    dx0 = x - xb
+    dy0 = y - yb
+
+    # Contribution (1,0)
+    dx1 = dx0 - 1 - SQUISH_CONSTANT2
+    dy1 = dy0 - 0 - SQUISH_CONSTANT2
+    value = _contribution(2 - dx1 * dx1 - dy1 * dy1, _extrapolate2(perm, xsb + 1, ysb + 0, dx1, dy1))
+
+    # Contribution (0,1)
+    dx2 = dx0 - 0 - SQUISH_CONSTANT2
+    dy2 = dy0 - 1 - SQUISH_CONSTANT2
+    value = value + _contribution(2 - dx2 * dx2 - dy2 * dy2, _extrapolate2(perm, xsb + 0, ysb + 1, dx2, dy2))
+
+    inside_origin = in_sum <= 1
+    x_larger = xins > yins
+
+    # Inside the triangle (2-Simplex) at (0,0)
+    zins = 1 - in_sum
+    origin_closest = (zins > xins) | (zins > yins)
+    low_xsv = np.where(origin_closest, np.where(x_larger, xsb + 1, xsb - 1), xsb + 1)
+    low_ysv = np.where(origin_closest, np.where(x_larger, ysb - 1, ysb + 1), ysb + 1)
+    low_dx = np.where(origin_closest, np.where(x_larger, dx0 - 1, dx0 + 1), dx0 - 1 - 2 * SQUISH_CONSTANT2)
+    low_dy = np.where(origin_closest, np.where(x_larger, dy0 + 1, dy0 - 1), dy0 - 1 - 2 * SQUISH_CONSTANT2)
+
+    # Inside the triangle (2-Simplex) at (1,1)
+    zins = 2 - in_sum
+    origin_closest = (zins < xins) | (zins < yins)
+    high_xsv = np.where(origin_closest, np.where(x_larger, xsb + 2, xsb + 0), xsb)
+    high_ysv = np.where(origin_closest, np.where(x_larger, ysb + 0, ysb + 2), ysb)
+    high_dx = np.where(
+        origin_closest, np.where(x_larger, dx0 - 2 - 2 * SQUISH_CONSTANT2, dx0 + 0 - 2 * SQUISH_CONSTANT2), dx0
+    )
+    high_dy = np.where(
+        origin_closest, np.where(x_larger, dy0 + 0 - 2 * SQUISH_CONSTANT2, dy0 - 2 - 2 * SQUISH_CONSTANT2), dy0
+    )
+
+    xsv_ext = np.where(inside_origin, low_xsv, high_xsv)
+    ysv_ext = np.where(inside_origin, low_ysv, high_ysv)
+    dx_ext = np.where(inside_origin, low_dx, high_dx)
+    dy_ext = np.where(inside_origin, low_dy, high_dy)
+
+    xsb = np.where(inside_origin, xsb, xsb + 1)
+    ysb = np.where(inside_origin, ysb, ysb + 1)
+    dx0 = np.where(inside_origin, dx0, dx0 - 1 - 2 * SQUISH_CONSTANT2)
+    dy0 = np.where(inside_origin, dy0, dy0 - 1 - 2 * SQUISH_CONSTANT2)
+
+    # Contribution (0,0) or (1,1)
+    value = value + _contribution(2 - dx0 * dx0 - dy0 * dy0, _extrapolate2(perm, xsb, ysb, dx0, dy0))
+
+    # Extra Vertex
+    value = value + _contribution(
+        2 - dx_ext * dx_ext - dy_ext * dy_ext, _extrapolate2(perm, xsv_ext, ysv_ext, dx_ext, dy_ext)
+    )
+
+    return value / NORM_CONSTANT2
+
+
+class SimplexNoise:
+    """An in-house, vectorized 2D OpenSimplex noise generator.
+
+    It is a drop-in replacement for `opensimplex.OpenSimplex` in the simulation and produces
+    bit-identical values for the same seed, without requiring numba to be fast.
+    """
+
+    def __init__(self, seed: int = opensimplex.DEFAULT_SEED):
+        """
+        Initialize the generator.
+
+        Args:
+            seed (int): The noise seed. Defaults to the seed of the opensimplex package.
+        """
+        self.seed = seed
+        self.perm = simplex_permutation(seed)
+
+    def get_seed(self) -> int:
+        return self.seed
+
+    def noise2array(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Generate 2D noise on the grid spanned by two coordinate arrays.
+
+        Args:
+            x (np.ndarray): The x-coordinates.
+            y (np.ndarray): The y-coordinates.
+
+        Returns:
+            np.ndarray: Noise of shape (y.size, x.size), like `opensimplex.noise2array`.
+        """
+        return vectorized_noise2(np.ravel(x)[None, :], np.ravel(y)[:, None], self.perm)
+
+
+class NoiseProvider:
+    """Serves the per-step movement noise of `People` from a buffer of precomputed timesteps.
+
+    Instead of evaluating the noise for one time value per step, the provider evaluates it for
+    the next ``chunk_size`` time values ``t, t + time_step, t + 2 * time_step, ...`` in one call
+    and hands the rows out one step at a time. The time values are accumulated exactly like the
+    simulation accumulates ``t``, so the served values are the ones a per-step evaluation gives.
+    If a step asks for an unexpected ``t``, the buffer is refilled starting from it.
+    """
+
+    def __init__(self, num_people: int, time_step: float, noise=None, chunk_size: int = 64):
+        """
+        Initialize the provider.
+
+        Args:
+            num_people (int): The number of people to provide noise for.
+            time_step (float): Simulation time advanced per step.
+            noise: Generator with a ``noise2array`` method. Defaults to the global opensimplex generator.
+            chunk_size (int): The number of timesteps evaluated at once. It is reduced for large populations
+                to bound the size of the buffer. Default is 64.
+        """
+        self.num_people = num_people
+        self.time_step = time_step
+        self.noise = noise if noise is not None else opensimplex
+        self.chunk_size = max(1, min(chunk_size, MAX_BUFFER_ELEMENTS // max(num_people, 1)))
+
+        self._ids = np.arange(num_people)
+        self._ts: Optional[np.ndarray] = None
+        self._dx: Optional[np.ndarray] = None
+        self._dy: Optional[np.ndarray] = None
+        self._row = 0
+
+    def _fill(self, t: float):
+        ts = [t]
+        for _ in range(self.chunk_size - 1):
+            ts.append(ts[-1] + self.time_step)
+
+        self._ts = np.array(ts)
+        self._dx = self.noise.noise2array(2 * self._ids, self._ts)
+        self._dy = self.noise.noise2array(2 * self._ids + 1, self._ts)
+        self._row = 0
+
+    def displacements(self, t: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the noise of every person at a time.
+
+        Args:
+            t (float): Time parameter for noise generation.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The x and y noise of every person.
+        """
+        if self._ts is None or self._row >= len(self._ts) or self._ts[self._row] != t:
+            self._fill(t)
+
+        row = self._row
+        self._row += 1
+
+        return self._dx[row], self._dy[row]
@@ -0,0 +1,430 @@
+import multiprocessing
+import traceback
+from contextlib import ExitStack
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from src.functions import friendship_breaking_probability, friendship_establishment_probability
+from src.noise import SimplexNoise
+from src.simulation import Simulation
+from src.spatial import neighbour_pairs
+from src.structures import friend_attraction
+
+# Seconds a worker is given to stop before it is terminated
+WORKER_STOP_TIMEOUT = 5.0
+
+
+class SharedArray:
+    """A NumPy array backed by a `multiprocessing.shared_memory` block.
+
+    Attributes:
+        name (str): Name of the shared memory block, used to attach to it from another process.
+        array (np.ndarray): View of the shared memory.
+    """
+
+    def __init__(self, shape: Tuple[int, ...], dtype: Any, name: Optional[str] = None):
+        """
+        Create a new shared array, or attach to an existing one.
+
+        Args:
+            shape (Tuple[int, ...]): Shape of the array.
+            dtype (Any): Data type of the array.
+            name (Optional[str]): Name of an existing block to attach to. If None, a new block is created.
+        """
+        size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        self._owner = name is None
+        self._memory = shared_memory.SharedMemory(name=name, create=self._owner, size=size)
+        self.name = self._memory.name
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self._memory.buf)
+
+    def spec(self) -> Tuple[str, Tuple[int, ...], str]:
+        """The name, shape and dtype needed to attach to the array from another process."""
+        return self.name, self.array.shape, self.array.dtype.str
+
+    def close(self):
+        """Release the view, and free the block if this process created it."""
+        del self.array
+        try:
+            self._memory.close()
+        finally:
+            if self._owner:
+                self._memory.unlink()
+
+
+def _attach(spec: Tuple[str, Tuple[int, ...], str]) -> SharedArray:
+    name, shape, dtype = spec
+    return SharedArray(shape, np.dtype(dtype), name=name)
+
+
+def _merge_keys(keys: np.ndarray, new_keys: np.ndarray) -> np.ndarray:
+    """Insert keys into a sorted array of unique edge keys, skipping the ones it has already."""
+    new_keys = np.unique(new_keys)
+    new_keys = new_keys[~np.isin(new_keys, keys, assume_unique=True)]
+    return np.insert(keys, np.searchsorted(keys, new_keys), new_keys)
+
+
+def _worker_main(connection, worker: int, num_workers: int, config: Dict[str, Any]):
+    """
+    Serve the phases of parallel steps for one tile until told to stop.
+
+    The worker keeps the edge keys of the friendships its tile owns, see `ParallelSimulation`.
+    Every command is answered with ``("ok", result)``, or with ``("error", traceback)`` if it raised.
+
+    Args:
+        connection: End of the pipe to the parent process.
+        worker (int): Index of the worker, which is also the index of its tile.
+        num_workers (int): The number of workers and tiles.
+        config (Dict[str, Any]): Specs of the shared arrays and the model parameters.
+    """
+    shared = {name: _attach(spec) for name, spec in config["arrays"].items()}
+    x, y = shared["x"].array, shared["y"].array
+    speed_coefficient, tile = shared["speed_coefficient"].array, shared["tile"].array
+    attraction = shared["attraction"].array
+    edge_keys = np.empty(0, dtype=np.int64)
+
+    num_people = len(x)
+    radius = config["cutoff_radius"]
+    tile_right = (worker + 1) / num_workers
+
+    rng = np.random.RandomState(config["seed"])
+    noise = SimplexNoise(config["noise_seed"])
+    establishment_prob = friendship_establishment_probability(
+        config["establishment_equ_prob_dist"], table_size=config["probability_table_size"]
+    )
+    breaking_prob = friendship_breaking_probability(config["break_equ_prob_dist"], table_size=config["probability_table_size"])
+
+    def owned(keys: np.ndarray) -> np.ndarray:
+        # A friendship belongs to the leftmost tile of its two people, like the establishment of the pair
+        idxs, jdxs = np.divmod(keys, num_people)
+        return np.minimum(tile[idxs], tile[jdxs]) == worker
+
+    try:
+        while True:
+            command, argument = connection.recv()
+
+            if command == "stop":
+                break
+
+            try:
+                own = np.flatnonzero(tile == worker)
+                reply = None
+
+                if command == "load":
+                    edges = _attach(argument["edges"])
+                    try:
+                        keys = edges.array[:argument["num_edges"]]
+                        edge_keys = keys[owned(keys)].copy()
+                    finally:
+                        edges.close()
+
+                elif command == "move":
+                    # Noise only depends on the id and the time, so every tile moves its people independently
+                    dx = noise.noise2array(2 * own, np.array([argument]))[0].astype(x.dtype, copy=False)
+                    dy = noise.noise2array(2 * own + 1, np.array([argument]))[0].astype(y.dtype, copy=False)
+                    x[own] = np.clip(x[own] + dx * speed_coefficient[own], 0, 1)
+                    y[own] = np.clip(y[own] + dy * speed_coefficient[own], 0, 1)
+
+                elif command == "attract":
+                    # Every worker accumulates the pulls of its own friendships, the owners of the people sum them
+                    idxs, jdxs = np.divmod(edge_keys, num_people)
+                    attraction[worker, 0], attraction[worker, 1] = friend_attraction(x, y, idxs, jdxs, argument)
+
+                elif command == "apply_attraction":
+                    x[own] = np.clip(x[own] + attraction[:, 0, own].sum(axis=0), 0, 1)
+                    y[own] = np.clip(y[own] + attraction[:, 1, own].sum(axis=0), 0, 1)
+
+                elif command == "establish":
+                    # The halo: people of the tiles to the right that are within the cutoff radius of this tile.
+                    # Every pair is handled by the leftmost tile of its two people, so no pair is drawn twice.
+                    halo = np.flatnonzero((tile > worker) & (x < tile_right + radius))
+                    members = np.concatenate((own, halo))
+
+                    local_idxs, local_jdxs, distance = neighbour_pairs(x[members], y[members], radius)
+                    with_own = local_idxs < len(own)
+                    idxs, jdxs, distance = members[local_idxs[with_own]], members[local_jdxs[with_own]], distance[with_own]
+
+                    selected = rng.rand(len(distance)) < establishment_prob(distance)
+                    low = np.minimum(idxs[selected], jdxs[selected])
+                    high = np.maximum(idxs[selected], jdxs[selected])
+
+                    # The tiles were reassigned, friendships whose people left this tile go to their new owner
+                    staying = owned(edge_keys)
+                    reply = (low * num_people + high, edge_keys[~staying])
+                    edge_keys = edge_keys[staying]
+
+                elif command == "break":
+                    # The new friendships and the moved ones, of which this worker keeps its own
+                    edge_keys = _merge_keys(edge_keys, argument[owned(argument)])
+
+                    idxs, jdxs = np.divmod(edge_keys, num_people)
+                    distance = np.sqrt((x[idxs] - x[jdxs]) ** 2 + (y[idxs] - y[jdxs]) ** 2)
+                    broken = rng.rand(len(edge_keys)) < breaking_prob(distance)
+                    reply = edge_keys[broken]
+                    edge_keys = edge_keys[~broken]
+
+                elif command == "friendships":
+                    reply = edge_keys
+
+                else:
+                    raise ValueError(f"Unknown command {command!r}")
+
+            except Exception:
+                # Reported to the parent, which stops all workers
+                connection.send(("error", traceback.format_exc()))
+            else:
+                connection.send(("ok", reply))
+    finally:
+        for array in shared.values():
+            array.close()
+
+
+class ParallelSimulation:
+    """Steps a `Simulation` on several worker processes, one per vertical strip of the world.
+
+    Positions live in shared memory. Every step, each worker moves the people in its strip and
+    establishes friendships between them and the people in the halo, the part of the strips to
+    its right within the establishment cutoff radius. A friendship belongs to the leftmost strip
+    of its two people, and the worker of that strip keeps its edge key, runs its breaking draw and
+    accumulates its pull on both friends; the owners of the people sum the pulls. Friendships whose
+    owner changed because people moved are handed to the new owner within the step.
+
+    The parent process only exchanges the changes of a step with the workers. It reassigns people
+    to strips after they moved, which is O(N), and applies the reported changes to the friendship
+    graph, which with sparse storage moves the O(E) sorted edge keys of the graph in memory once
+    per pass. The wellbeing stage, if any, also runs in the parent process and is O(N + E). These
+    serial parts bound the speedup; ``parallel_step_<workers>`` in `src.benchmark` measures the
+    whole step. The workers only learn about friendships changed by the engine, so call
+    `load_friendships` after changing the graph in any other way.
+
+    Every worker draws from its own random state, so a run is not identical to a single process
+    run with the same seed, but it follows the same model, including the probability table size
+    of the graph.
+
+    Use it as a context manager, or call `close` to stop the workers and free the shared memory.
+    If a worker raises or dies during a step, the step closes the engine and raises a
+    `RuntimeError`; the shared memory is freed in any case.
+
+    Attributes:
+        simulation (Simulation): The wrapped simulation, whose people and friendships are updated in place.
+        num_workers (int): The number of worker processes and strips.
+    """
+
+    def __init__(self, simulation: Simulation, num_workers: int = 2, seed: Optional[int] = None):
+        """
+        Start the workers.
+
+        Args:
+            simulation (Simulation): The simulation to step. Its friendship graph must use "sparse" storage and a
+                cutoff tolerance, the cutoff radius is the width of the halos. Event-driven friendship dynamics are
+                not supported.
+            num_workers (int): The number of worker processes. Default is 2.
+            seed (Optional[int]): Seed from which the random states of the workers are derived. Default is None.
+        """
+        graph = simulation.friendship_graph
+        if graph.cutoff_radius is None or graph.storage != "sparse":
+            raise ValueError("Parallel stepping requires a friendship graph with sparse storage and a cutoff tolerance")
+        if simulation.friendship_events is not None:
+            raise ValueError("Parallel stepping runs the per-step friendship passes and does not support event-driven friendships")
+
+        self.simulation = simulation
+        self.num_workers = num_workers
+
+        people = simulation.people
+        num_people = people.num_people
+
+        self._arrays = {
+            "x": SharedArray((num_people,), people.dtype),
+            "y": SharedArray((num_people,), people.dtype),
+            "speed_coefficient": SharedArray((num_people,), people.dtype),
+            "tile": SharedArray((num_people,), np.int32),
+            "attraction": SharedArray((num_workers, 2, num_people), np.float64),
+        }
+        for name in ("x", "y", "speed_coefficient"):
+            self._arrays[name].array[:] = getattr(people, name)
+            # The people read their state straight from shared memory from now on
+            setattr(people, name, self._arrays[name].array)
+        self._assign_tiles()
+
+        self._closed = False
+
+        seeds = [int(sequence.generate_state(1)[0]) for sequence in np.random.SeedSequence(seed).spawn(num_workers)]
+        config = {
+            "arrays": {name: array.spec() for name, array in self._arrays.items()},
+            "cutoff_radius": graph.cutoff_radius,
+            "noise_seed": people.noise.get_seed(),
+            "establishment_equ_prob_dist": graph.establishment_equ_prob_dist,
+            "break_equ_prob_dist": graph.break_equ_prob_dist,
+            "probability_table_size": graph.probability_table_size,
+        }
+
+        self._connections = []
+        self._processes = []
+        try:
+            for worker in range(num_workers):
+                parent_end, worker_end = multiprocessing.Pipe()
+                process = multiprocessing.Process(
+                    target=_worker_main, args=(worker_end, worker, num_workers, {**config, "seed": seeds[worker]}), daemon=True
+                )
+                process.start()
+                self._connections.append(parent_end)
+                self._processes.append(process)
+            self.load_friendships()
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self) -> "ParallelSimulation":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _assign_tiles(self):
+        x = self._arrays["x"].array
+        self._arrays["tile"].array[:] = np.minimum((x * self.num_workers).astype(np.int32), self.num_workers - 1)
+
+    def _broadcast(self, command: str, argument: Any = None) -> list:
+        """Send a command to every worker and collect their results, raising a `RuntimeError` if any of them failed."""
+        if self._closed:
+            raise RuntimeError("The parallel simulation has been closed")
+
+        sent = []
+        failures = []
+        for worker, connection in enumerate(self._connections):
+            try:
+                connection.send((command, argument))
+                sent.append(worker)
+            except OSError:
+                failures.append(f"worker {worker} is not running (exit code {self._processes[worker].exitcode})")
+
+        # Every worker that got the command is waited for, so that none is left answering it
+        results = []
+        for worker in sent:
+            try:
+                status, result = self._connections[worker].recv()
+            except (EOFError, OSError):
+                self._processes[worker].join(timeout=WORKER_STOP_TIMEOUT)
+                failures.append(f"worker {worker} exited unexpectedly (exit code {self._processes[worker].exitcode})")
+                continue
+
+            if status == "error":
+                failures.append(f"worker {worker} failed in {command!r}:\n{result}")
+            results.append(result)
+
+        if failures:
+            raise RuntimeError("Parallel step failed: " + "; ".join(failures))
+        return results
+
+    def load_friendships(self):
+        """
+        Hand the current friendships of the graph to the workers that own them.
+
+        This happens when the engine starts. Call it again after changing the friendship graph other
+        than through `step`, e.g. after restoring an earlier state.
+        """
+        idxs, jdxs = self.simulation.friendship_graph.get_friendships()
+        keys = idxs * self.simulation.people.num_people + jdxs
+
+        edges = SharedArray((len(keys),), np.int64)
+        try:
+            edges.array[:] = keys
+            self._broadcast("load", {"edges": edges.spec(), "num_edges": len(keys)})
+        finally:
+            edges.close()
+
+    def step(self):
+        """
+        Advance the simulation by a single step.
+
+        Raises:
+            RuntimeError: If a worker failed. The engine is closed by then.
+        """
+        try:
+            self._step()
+        except BaseException:
+            # A half finished exchange leaves the workers out of step, they are stopped and the memory freed
+            self.close()
+            raise
+
+        for observer in self.simulation.observers:
+            observer(self.simulation)
+
+    def _step(self):
+        simulation = self.simulation
+        profiler = simulation.profiler
+        graph = simulation.friendship_graph
+        people = simulation.people
+
+        with profiler.phase("random_move"):
+            self._broadcast("move", simulation.t)
+
+        with profiler.phase("attract_to_friends"):
+            if people.friend_attractiveness != 0:
+                self._broadcast("attract", people.friend_attractiveness)
+                self._broadcast("apply_attraction")
+            self._assign_tiles()
+
+        with profiler.phase("add_random_friendships"):
+            new_keys, moved_keys = zip(*self._broadcast("establish"))
+            new_keys = np.concatenate(new_keys)
+            num_added = graph.add_friendships(*np.divmod(new_keys, people.num_people))
+
+        with profiler.phase("remove_random_friendships"):
+            keys = np.concatenate(self._broadcast("break", np.concatenate((new_keys, *moved_keys))))
+            num_removed = graph.remove_friendships(*np.divmod(keys, people.num_people))
+
+        profiler.count("friendships_added", num_added)
+        profiler.count("friendships_removed", num_removed)
+
+        if simulation.wellbeing_dynamics is not None:
+            with profiler.phase("update_wellbeing"):
+                simulation.wellbeing_dynamics.update(people, graph, simulation.time_step)
+
+        simulation.t += simulation.time_step
+        simulation.steps += 1
+
+    def run(self, num_steps: int):
+        """
+        Advance the simulation by a number of steps, as fast as possible.
+
+        Args:
+            num_steps (int): The number of steps to take.
+        """
+        for _ in range(num_steps):
+            self.step()
+
+    def close(self):
+        """
+        Stop the workers and free the shared memory, leaving the people with private copies of their state.
+
+        Workers that do not stop within `WORKER_STOP_TIMEOUT` seconds are terminated. Calling it again does nothing.
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        try:
+            for connection in self._connections:
+                try:
+                    connection.send(("stop", None))
+                except OSError:
+                    # The worker is gone already
+                    pass
+            for process in self._processes:
+                process.join(timeout=WORKER_STOP_TIMEOUT)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+            for connection in self._connections:
+                connection.close()
+        finally:
+            people = self.simulation.people
+            for name in ("x", "y", "speed_coefficient"):
+                setattr(people, name, self._arrays[name].array.copy())
+
+            # Every block is freed even if freeing another one fails
+            with ExitStack() as stack:
+                for array in self._arrays.values():
+                    stack.callback(array.close)
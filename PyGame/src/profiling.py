@@ -0,0 +1,221 @@
+import json
+import sys
+import threading
+import time
+from typing import Dict, Optional, TextIO
+
+import numpy as np
+
+
+class RollingSeries:
+    """A fixed-size ring buffer of the most recent samples of a quantity.
+
+    Attributes:
+        window (int): The number of samples kept.
+        total (int): The number of samples recorded so far.
+    """
+
+    def __init__(self, window: int):
+        """
+        Initialize the series.
+
+        Args:
+            window (int): The number of samples kept.
+        """
+        self.window = window
+        self.total = 0
+        self._samples = np.zeros(window)
+
+    def add(self, value: float):
+        """
+        Record a sample, overwriting the oldest one once the window is full.
+
+        Args:
+            value (float): The sample.
+        """
+        self._samples[self.total % self.window] = value
+        self.total += 1
+
+    @property
+    def samples(self) -> np.ndarray:
+        """The samples in the window, oldest first."""
+        if self.total <= self.window:
+            return self._samples[:self.total]
+
+        start = self.total % self.window
+        return np.concatenate((self._samples[start:], self._samples[:start]))
+
+    @property
+    def last(self) -> float:
+        """The most recent sample."""
+        return float(self._samples[(self.total - 1) % self.window]) if self.total else 0.0
+
+    def histogram(self, bins: int = 20):
+        """
+        Get the histogram of the samples in the window.
+
+        Args:
+            bins (int): The number of bins. Default is 20.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The counts and bin edges, as returned by `np.histogram`.
+        """
+        return np.histogram(self.samples, bins=bins)
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Summarize the samples in the window.
+
+        Returns:
+            Dict[str, float]: The last, mean, median, 95th percentile and maximum sample.
+        """
+        samples = self.samples
+        if len(samples) == 0:
+            return {"last": 0.0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+
+        p50, p95 = np.percentile(samples, (50, 95))
+        return {
+            "last": self.last,
+            "mean": float(np.mean(samples)),
+            "p50": float(p50),
+            "p95": float(p95),
+            "max": float(np.max(samples)),
+        }
+
+
+class _Phase:
+    """Context manager that times one execution of a phase.
+
+    A new one is made for every use, so that threads and nested uses of the same phase name each
+    keep their own start time.
+    """
+
+    __slots__ = ("profiler", "name", "start", "blocks")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.blocks = sys.getallocatedblocks()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        self.profiler.record(self.name, elapsed, sys.getallocatedblocks() - self.blocks)
+        return False
+
+
+class Profiler:
+    """Per-phase instrumentation of the simulation loop.
+
+    Each phase records its wall time and the net number of memory blocks the Python allocator
+    handed out while it ran, into rolling windows of recent samples. Counters (such as the number
+    of friendships added per step) are recorded the same way. Recording a sample costs a couple of
+    microseconds, so the profiler can stay enabled in production runs.
+
+    Several threads may record into the same profiler, as the simulation and render threads do.
+    The block count is process wide, though: a phase's allocation delta also includes whatever
+    other threads allocated or freed while it ran.
+
+    Attributes:
+        window (int): The number of recent samples kept per phase and counter.
+        enabled (bool): Whether anything is recorded.
+        timings (Dict[str, RollingSeries]): Wall time in seconds per phase.
+        allocations (Dict[str, RollingSeries]): Net allocated blocks per phase.
+        counters (Dict[str, RollingSeries]): Recorded counter values.
+    """
+
+    def __init__(self, window: int = 600, enabled: bool = True):
+        """
+        Initialize the profiler.
+
+        Args:
+            window (int): The number of recent samples kept per phase and counter. Default is 600.
+            enabled (bool): Whether anything is recorded. Default is True.
+        """
+        self.window = window
+        self.enabled = enabled
+        self.timings: Dict[str, RollingSeries] = {}
+        self.allocations: Dict[str, RollingSeries] = {}
+        self.counters: Dict[str, RollingSeries] = {}
+        self._lock = threading.Lock()
+
+    def phase(self, name: str) -> _Phase:
+        """
+        Get a context manager that times one execution of a phase.
+
+        Args:
+            name (str): The name of the phase.
+
+        Returns:
+            _Phase: The context manager.
+        """
+        return _Phase(self, name)
+
+    def record(self, name: str, elapsed: float, allocated_blocks: int = 0):
+        """
+        Record one execution of a phase.
+
+        Args:
+            name (str): The name of the phase.
+            elapsed (float): Wall time in seconds.
+            allocated_blocks (int): Net number of allocated memory blocks.
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            if name not in self.timings:
+                self.timings[name] = RollingSeries(self.window)
+                self.allocations[name] = RollingSeries(self.window)
+
+            self.timings[name].add(elapsed)
+            self.allocations[name].add(allocated_blocks)
+
+    def count(self, name: str, value: float):
+        """
+        Record a counter value.
+
+        Args:
+            name (str): The name of the counter.
+            value (float): The value.
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            if name not in self.counters:
+                self.counters[name] = RollingSeries(self.window)
+
+            self.counters[name].add(value)
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Summarize everything recorded in the current windows.
+
+        Returns:
+            Dict[str, Dict[str, Dict[str, float]]]: Summaries of the ``timings``, ``allocations`` and ``counters``.
+        """
+        with self._lock:
+            return {
+                "timings": {name: series.summary() for name, series in self.timings.items()},
+                "allocations": {name: series.summary() for name, series in self.allocations.items()},
+                "counters": {name: series.summary() for name, series in self.counters.items()},
+            }
+
+    def dump(self, file: Optional[TextIO] = None, path: Optional[str] = None):
+        """
+        Write the summary as JSON, to a file object or a path.
+
+        Args:
+            file (Optional[TextIO]): File object to write to. Defaults to standard output.
+            path (Optional[str]): Path of a file to write to instead.
+        """
+        if path is not None:
+            with open(path, "w") as output:
+                json.dump(self.summary(), output, indent=2)
+            return
+
+        json.dump(self.summary(), file if file is not None else sys.stdout, indent=2)
@@ -0,0 +1,281 @@
+import json
+import os
+from typing import Dict, Tuple
+
+import numpy as np
+
+from src.simulation import Simulation
+
+STATE_ARRAYS = ("x", "y", "wellbeing")
+
+
+def _chunk_path(path: str, name: str, chunk: int) -> str:
+    return os.path.join(path, f"{name}_{chunk:05d}.npy")
+
+
+class TrajectoryRecorder:
+    """Streams a simulation run to disk, one frame per step.
+
+    ``x``, ``y`` and ``wellbeing`` are written into chunked, memory-mapped ``.npy`` files of
+    ``chunk_size`` frames each, in the floating point type of the simulation state. Friendships are stored as per-frame deltas (added and removed
+    edge keys ``i * num_people + j``) appended to flat binary files, plus the full edge set at the
+    first frame of every chunk so that a reader can seek without replaying the whole run.
+
+    Attach an instance to a `Simulation` with `Simulation.add_observer` and call `close` when done.
+    """
+
+    def __init__(self, path: str, simulation: Simulation, chunk_size: int = 256):
+        """
+        Initialize the recorder and record the current state of the simulation as frame 0.
+
+        Args:
+            path (str): Directory to write the recording to. It is created if needed.
+            simulation (Simulation): The simulation to record.
+            chunk_size (int): The number of frames per chunk file. Default is 256.
+        """
+        os.makedirs(path, exist_ok=True)
+
+        self.path = path
+        self.chunk_size = chunk_size
+        self.num_people = simulation.people.num_people
+        self.num_frames = 0
+        self._dtypes = {name: getattr(simulation.people, name).dtype for name in STATE_ARRAYS}
+
+        np.save(os.path.join(path, "colors.npy"), simulation.people.colors)
+
+        self._chunks: Dict[str, np.memmap] = {}
+        self._edge_keys = np.empty(0, dtype=np.int64)
+        self._added = open(os.path.join(path, "edges_added.bin"), "wb")
+        self._removed = open(os.path.join(path, "edges_removed.bin"), "wb")
+        self._index = open(os.path.join(path, "edges_index.bin"), "wb")
+        self._added_count = 0
+        self._removed_count = 0
+
+        self.record(simulation)
+
+    def __call__(self, simulation: Simulation):
+        """Record a frame, so that the recorder can be used as an observer."""
+        self.record(simulation)
+
+    def _write_meta(self):
+        meta = {"num_people": self.num_people, "chunk_size": self.chunk_size, "num_frames": self.num_frames}
+        with open(os.path.join(self.path, "meta.json"), "w") as file:
+            json.dump(meta, file)
+
+    def _flush_chunks(self):
+        for array in self._chunks.values():
+            array.flush()
+        self._chunks = {}
+
+        for file in (self._added, self._removed, self._index):
+            file.flush()
+        self._write_meta()
+
+    def record(self, simulation: Simulation):
+        """
+        Append the current state of a simulation as the next frame.
+
+        Args:
+            simulation (Simulation): The simulation to record.
+        """
+        chunk, row = divmod(self.num_frames, self.chunk_size)
+
+        if row == 0:
+            self._flush_chunks()
+            for name in STATE_ARRAYS:
+                self._chunks[name] = np.lib.format.open_memmap(
+                    _chunk_path(self.path, name, chunk), mode="w+", dtype=self._dtypes[name], shape=(self.chunk_size, self.num_people)
+                )
+
+        self._chunks["x"][row] = simulation.people.x
+        self._chunks["y"][row] = simulation.people.y
+        self._chunks["wellbeing"][row] = simulation.people.wellbeing
+
+        idxs, jdxs = simulation.friendship_graph.get_friendships()
+        edge_keys = np.sort(np.asarray(idxs, dtype=np.int64) * self.num_people + jdxs)
+
+        added = np.setdiff1d(edge_keys, self._edge_keys, assume_unique=True)
+        removed = np.setdiff1d(self._edge_keys, edge_keys, assume_unique=True)
+        self._edge_keys = edge_keys
+
+        self._added.write(added.tobytes())
+        self._removed.write(removed.tobytes())
+        self._added_count += len(added)
+        self._removed_count += len(removed)
+        self._index.write(np.array([self._added_count, self._removed_count], dtype=np.int64).tobytes())
+
+        if row == 0:
+            np.save(_chunk_path(self.path, "edges", chunk), edge_keys)
+
+        self.num_frames += 1
+
+    def close(self):
+        """Flush everything to disk and close the recording."""
+        self._flush_chunks()
+        for file in (self._added, self._removed, self._index):
+            file.close()
+
+
+class TrajectoryReader:
+    """Random access to a recording written by `TrajectoryRecorder`.
+
+    Only the chunk files of the requested frame are mapped into memory, so any frame of a long
+    run can be read without loading the rest of it. The friendships of the last frame read are
+    kept, so that stepping forward through a chunk only applies the deltas of the new frames.
+
+    Attributes:
+        num_people (int): The number of people in the recording.
+        chunk_size (int): The number of frames per chunk file.
+        colors (np.ndarray): Colors representing each person.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a recording.
+
+        Args:
+            path (str): Directory the recording was written to.
+        """
+        self.path = path
+
+        with open(os.path.join(path, "meta.json")) as file:
+            meta = json.load(file)
+        self.num_people = meta["num_people"]
+        self.chunk_size = meta["chunk_size"]
+        self._num_frames = meta["num_frames"]
+
+        self.colors = np.load(os.path.join(path, "colors.npy"))
+
+        self._added = self._map_keys("edges_added.bin")
+        self._removed = self._map_keys("edges_removed.bin")
+        self._index = self._map_keys("edges_index.bin").reshape(-1, 2)
+
+        self._cached_frame = -1
+        self._cached_keys = np.empty(0, dtype=np.int64)
+
+    def _map_keys(self, name: str) -> np.ndarray:
+        file_path = os.path.join(self.path, name)
+        if os.path.getsize(file_path) == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.memmap(file_path, dtype=np.int64, mode="r")
+
+    def __len__(self) -> int:
+        return min(self._num_frames, len(self._index))
+
+    def _state(self, name: str, frame: int) -> np.ndarray:
+        if not 0 <= frame < len(self):
+            raise IndexError(f"Frame {frame} is out of range for a recording of {len(self)} frames")
+
+        chunk, row = divmod(frame, self.chunk_size)
+        return np.array(np.load(_chunk_path(self.path, name, chunk), mmap_mode="r")[row])
+
+    def positions(self, frame: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the positions of the people at a frame.
+
+        Args:
+            frame (int): Index of the frame.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The x- and y-coordinates.
+        """
+        return self._state("x", frame), self._state("y", frame)
+
+    def wellbeing(self, frame: int) -> np.ndarray:
+        """
+        Get the wellbeing of the people at a frame.
+
+        Args:
+            frame (int): Index of the frame.
+
+        Returns:
+            np.ndarray: The wellbeing values.
+        """
+        return self._state("wellbeing", frame)
+
+    def _delta(self, keys: np.ndarray, column: int, frame: int) -> np.ndarray:
+        begin = self._index[frame - 1, column] if frame > 0 else 0
+        return keys[begin:self._index[frame, column]]
+
+    def edge_delta(self, frame: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the friendship changes between the previous frame and a frame.
+
+        Args:
+            frame (int): Index of the frame.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The added and the removed edge keys.
+        """
+        return self._delta(self._added, 0, frame), self._delta(self._removed, 1, frame)
+
+    def friendships(self, frame: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the friendships at a frame, replayed from the closest preceding keyframe.
+
+        Reading the frames of a chunk in increasing order replays every delta once; only seeking
+        backwards or into another chunk starts again from the keyframe.
+
+        Args:
+            frame (int): Index of the frame.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Indices ``(i, j)`` of every friendship, with ``i < j``.
+        """
+        if not 0 <= frame < len(self):
+            raise IndexError(f"Frame {frame} is out of range for a recording of {len(self)} frames")
+
+        chunk = frame // self.chunk_size
+        keyframe = chunk * self.chunk_size
+
+        if keyframe <= self._cached_frame <= frame:
+            # Continue from the last frame read
+            edge_keys, replay_from = self._cached_keys, self._cached_frame + 1
+        else:
+            edge_keys, replay_from = np.load(_chunk_path(self.path, "edges", chunk)), keyframe + 1
+
+        for replayed in range(replay_from, frame + 1):
+            added, removed = self.edge_delta(replayed)
+            edge_keys = np.union1d(np.setdiff1d(edge_keys, removed, assume_unique=True), added)
+
+        self._cached_frame, self._cached_keys = frame, edge_keys
+
+        return np.divmod(edge_keys, self.num_people)
+
+    def frame(self, frame: int) -> Dict[str, np.ndarray]:
+        """
+        Get the full state at a frame.
+
+        Args:
+            frame (int): Index of the frame.
+
+        Returns:
+            Dict[str, np.ndarray]: ``x``, ``y``, ``wellbeing``, ``idxs`` and ``jdxs``.
+        """
+        x, y = self.positions(frame)
+        idxs, jdxs = self.friendships(frame)
+        return {"x": x, "y": y, "wellbeing": self.wellbeing(frame), "idxs": idxs, "jdxs": jdxs}
+
+
+def record_run(path: str, simulation: Simulation, num_steps: int, chunk_size: int = 256) -> "TrajectoryReader":
+    """
+    Run a simulation for a number of steps while recording it.
+
+    Args:
+        path (str): Directory to write the recording to.
+        simulation (Simulation): The simulation to run.
+        num_steps (int): The number of steps to take.
+        chunk_size (int): The number of frames per chunk file. Default is 256.
+
+    Returns:
+        TrajectoryReader: A reader over the finished recording.
+    """
+    recorder = TrajectoryRecorder(path, simulation, chunk_size=chunk_size)
+    simulation.add_observer(recorder)
+    try:
+        simulation.run(num_steps)
+    finally:
+        simulation.remove_observer(recorder)
+        recorder.close()
+
+    return TrajectoryReader(path)
@@ -0,0 +1,511 @@
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pygame
+
+from src.profiling import Profiler
+from src.simulation import Simulation
+from src.snapshots import Snapshot
+
+
+def screen_coordinates(x: np.ndarray, y: np.ndarray, width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert positions in the unit square into pixel coordinates.
+
+    Args:
+        x (np.ndarray): The x-coordinates (Range: [0, 1]).
+        y (np.ndarray): The y-coordinates (Range: [0, 1]).
+        width (int): Width of the screen.
+        height (int): Height of the screen.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The integer pixel coordinates.
+    """
+    return (x * width).astype(np.int64), (y * height).astype(np.int64)
+
+
+def map_colors(screen: pygame.Surface, colors: np.ndarray) -> np.ndarray:
+    """
+    Map RGB colors to the pixel values of a surface, the vectorized equivalent of `pygame.Surface.map_rgb`.
+
+    Args:
+        screen (pygame.Surface): Pygame surface whose pixel format is used.
+        colors (np.ndarray): RGB colors, of shape (3,) or (M, 3).
+
+    Returns:
+        np.ndarray: The mapped pixel values.
+    """
+    colors = np.asarray(colors, dtype=np.int64)
+    shifts = screen.get_shifts()
+    losses = screen.get_losses()
+    masks = screen.get_masks()
+
+    mapped = np.zeros(colors.shape[:-1], dtype=np.int64)
+    for channel in range(3):
+        mapped |= ((colors[..., channel] >> losses[channel]) << shifts[channel]) & masks[channel]
+
+    # Opaque alpha, if the surface has an alpha channel
+    return mapped | masks[3]
+
+
+def _write_pixels(screen: pygame.Surface, px: np.ndarray, py: np.ndarray, values):
+    """
+    Write mapped pixel values to a surface in a single batched assignment, skipping pixels off the surface.
+
+    The surface must have 16 or 32 bits per pixel, which is what Pygame creates by default.
+
+    Args:
+        screen (pygame.Surface): Pygame surface to write to.
+        px (np.ndarray): The x pixel coordinates.
+        py (np.ndarray): The y pixel coordinates.
+        values: A mapped pixel value per pixel, or a single one for all of them.
+    """
+    width, height = screen.get_size()
+    inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+
+    if not inside.all():
+        px, py = px[inside], py[inside]
+        if np.ndim(values) == 1:
+            values = values[inside]
+
+    pixels = pygame.surfarray.pixels2d(screen)
+    pixels[px, py] = values
+    del pixels
+
+
+def draw_segments(
+    screen: pygame.Surface,
+    x1: np.ndarray,
+    y1: np.ndarray,
+    x2: np.ndarray,
+    y2: np.ndarray,
+    color: tuple,
+    linewidth: int = 1,
+):
+    """
+    Draw many line segments at once.
+
+    One pixel wide segments are rasterized together with NumPy and written through
+    `pygame.surfarray`. Wider segments fall back to one `pygame.draw.line` call per segment.
+
+    Args:
+        screen (pygame.Surface): Pygame screen to draw on.
+        x1 (np.ndarray): The x pixel coordinates of the segment starts.
+        y1 (np.ndarray): The y pixel coordinates of the segment starts.
+        x2 (np.ndarray): The x pixel coordinates of the segment ends.
+        y2 (np.ndarray): The y pixel coordinates of the segment ends.
+        color (tuple): Color of the segments.
+        linewidth (int): Width of the segments. Default is 1.
+    """
+    if len(x1) == 0:
+        return
+
+    if linewidth != 1:
+        for start_x, start_y, end_x, end_y in zip(x1.tolist(), y1.tolist(), x2.tolist(), y2.tolist()):
+            pygame.draw.line(screen, color, (start_x, start_y), (end_x, end_y), linewidth)
+        return
+
+    # Sample every segment once per pixel along its longest axis
+    lengths = np.maximum(np.abs(x2 - x1), np.abs(y2 - y1))
+    counts = lengths + 1
+    segments = np.repeat(np.arange(len(x1)), counts)
+    steps = np.arange(len(segments)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    fraction = steps / np.maximum(lengths, 1)[segments]
+    px = np.rint(x1[segments] + fraction * (x2 - x1)[segments]).astype(np.int64)
+    py = np.rint(y1[segments] + fraction * (y2 - y1)[segments]).astype(np.int64)
+
+    _write_pixels(screen, px, py, map_colors(screen, color[:3]))
+
+
+def disc_offsets(radius: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the pixel offsets covered by a filled disc.
+
+    Args:
+        radius (int): Radius of the disc.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The x and y offsets from the disc center.
+    """
+    offsets = np.arange(-radius, radius + 1)
+    offset_x, offset_y = np.meshgrid(offsets, offsets, indexing="ij")
+    inside = offset_x ** 2 + offset_y ** 2 <= radius * radius
+
+    return offset_x[inside], offset_y[inside]
+
+
+def draw_discs(screen: pygame.Surface, px: np.ndarray, py: np.ndarray, colors: np.ndarray, radius: int):
+    """
+    Draw many filled discs at once by stamping a precomputed disc footprint through `pygame.surfarray`.
+
+    Args:
+        screen (pygame.Surface): Pygame screen to draw on.
+        px (np.ndarray): The x pixel coordinates of the disc centers.
+        py (np.ndarray): The y pixel coordinates of the disc centers.
+        colors (np.ndarray): An RGB color per disc.
+        radius (int): Radius of the discs.
+    """
+    offset_x, offset_y = disc_offsets(radius)
+
+    disc_px = (px[:, None] + offset_x[None, :]).ravel()
+    disc_py = (py[:, None] + offset_y[None, :]).ravel()
+    disc_values = np.repeat(map_colors(screen, colors), len(offset_x))
+
+    _write_pixels(screen, disc_px, disc_py, disc_values)
+
+
+def _grid_cells(px: np.ndarray, py: np.ndarray, width: int, height: int, cell_size: int) -> Tuple[np.ndarray, int, int]:
+    """
+    Bucket pixel coordinates into square grid cells.
+
+    Args:
+        px (np.ndarray): The x pixel coordinates.
+        py (np.ndarray): The y pixel coordinates.
+        width (int): Width of the screen.
+        height (int): Height of the screen.
+        cell_size (int): Side of a cell in pixels.
+
+    Returns:
+        Tuple[np.ndarray, int, int]: The flat cell index ``cell_x * cells_y + cell_y`` of every point, and the number
+            of cells along x and y.
+    """
+    cells_x, cells_y = -(-width // cell_size), -(-height // cell_size)
+    cell_x = np.clip(px // cell_size, 0, cells_x - 1)
+    cell_y = np.clip(py // cell_size, 0, cells_y - 1)
+
+    return cell_x * cells_y + cell_y, cells_x, cells_y
+
+
+def density_heatmap(
+    px: np.ndarray,
+    py: np.ndarray,
+    colors: np.ndarray,
+    width: int,
+    height: int,
+    cell_size: int,
+    background_color: tuple,
+    saturation: float = 4.0,
+) -> np.ndarray:
+    """
+    Render people as a heatmap of their mean color per grid cell.
+
+    Every cell shows the mean color of the people in it, blended with the background by how
+    crowded it is: empty cells are background, cells with ``saturation`` or more people show
+    the pure mean color. The cost is O(N + cells).
+
+    Args:
+        px (np.ndarray): The x pixel coordinates of the people.
+        py (np.ndarray): The y pixel coordinates of the people.
+        colors (np.ndarray): An RGB color per person.
+        width (int): Width of the screen.
+        height (int): Height of the screen.
+        cell_size (int): Side of a cell in pixels.
+        background_color (tuple): Color of empty cells.
+        saturation (float): The number of people at which a cell shows their full color. Default is 4.
+
+    Returns:
+        np.ndarray: RGB colors of the cells, shape (cells_x, cells_y, 3) and dtype uint8, as used by `pygame.surfarray`.
+    """
+    cells, cells_x, cells_y = _grid_cells(px, py, width, height, cell_size)
+    num_cells = cells_x * cells_y
+
+    counts = np.bincount(cells, minlength=num_cells)
+    sums = np.stack([np.bincount(cells, weights=colors[:, channel], minlength=num_cells) for channel in range(3)], axis=1)
+
+    mean_colors = sums / np.maximum(counts, 1)[:, None]
+    background = np.asarray(background_color[:3], dtype=float)
+    weight = np.minimum(counts / saturation, 1.0)[:, None]
+
+    heatmap = background + weight * (mean_colors - background)
+    return np.rint(heatmap).astype(np.uint8).reshape(cells_x, cells_y, 3)
+
+
+def cell_flows(
+    px: np.ndarray, py: np.ndarray, idxs: np.ndarray, jdxs: np.ndarray, width: int, height: int, cell_size: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Aggregate friendships into flows between grid cells.
+
+    Args:
+        px (np.ndarray): The x pixel coordinates of the people.
+        py (np.ndarray): The y pixel coordinates of the people.
+        idxs (np.ndarray): Indices of the first friend of each friendship.
+        jdxs (np.ndarray): Indices of the second friend of each friendship.
+        width (int): Width of the screen.
+        height (int): Height of the screen.
+        cell_size (int): Side of a cell in pixels.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The two cells and the number of friendships of every flow.
+            Friendships within a cell are left out.
+    """
+    cells, cells_x, cells_y = _grid_cells(px, py, width, height, cell_size)
+    num_cells = cells_x * cells_y
+
+    cells1, cells2 = cells[idxs], cells[jdxs]
+    between = cells1 != cells2
+    low, high = np.minimum(cells1, cells2)[between], np.maximum(cells1, cells2)[between]
+
+    keys, counts = np.unique(low * num_cells + high, return_counts=True)
+    cells1, cells2 = np.divmod(keys, num_cells)
+
+    return cells1, cells2, counts
+
+
+def draw_flows(
+    screen: pygame.Surface,
+    cells1: np.ndarray,
+    cells2: np.ndarray,
+    counts: np.ndarray,
+    cell_size: int,
+    color: tuple,
+    background_color: tuple,
+    levels: int = 4,
+):
+    """
+    Draw flows between grid cells as lines between the cell centers, darker for more friendships.
+
+    The flows are split into ``levels`` intensity levels of the flow count relative to the largest flow,
+    and each level is drawn with a single `draw_segments` call.
+
+    Args:
+        screen (pygame.Surface): Pygame screen to draw on.
+        cells1 (np.ndarray): The first cell of every flow, see `cell_flows`.
+        cells2 (np.ndarray): The second cell of every flow.
+        counts (np.ndarray): The number of friendships of every flow.
+        cell_size (int): Side of a cell in pixels.
+        color (tuple): Color of the strongest flows.
+        background_color (tuple): Color the weakest flows fade towards.
+        levels (int): The number of intensity levels. Default is 4.
+    """
+    if len(counts) == 0:
+        return
+
+    cells_y = -(-screen.get_height() // cell_size)
+    x1, y1 = np.divmod(cells1, cells_y)
+    x2, y2 = np.divmod(cells2, cells_y)
+    x1, y1, x2, y2 = (coordinate * cell_size + cell_size // 2 for coordinate in (x1, y1, x2, y2))
+
+    level = np.minimum((counts / counts.max() * levels).astype(np.int64), levels - 1)
+    color, background = np.asarray(color[:3], dtype=float), np.asarray(background_color[:3], dtype=float)
+
+    for value in range(levels):
+        selected = level == value
+        if selected.any():
+            shade = background + (value + 1) / levels * (color - background)
+            draw_segments(screen, x1[selected], y1[selected], x2[selected], y2[selected], tuple(np.rint(shade).astype(int)))
+
+
+class PerformanceOverlay:
+    """An on-screen table of the per-phase timings and counters of a `Profiler`.
+
+    The text is only re-rendered every ``refresh_every`` frames, so drawing the overlay costs a
+    single blit in most frames.
+    """
+
+    def __init__(self, refresh_every: int = 15, color: tuple = (0, 0, 0), font_size: int = 18):
+        """
+        Initialize the overlay.
+
+        Args:
+            refresh_every (int): Re-render the text every this many frames. Default is 15.
+            color (tuple): Color of the text.
+            font_size (int): Size of the font.
+        """
+        self.refresh_every = refresh_every
+        self.color = color
+        self.font_size = font_size
+        self._font: Optional[pygame.font.Font] = None
+        self._lines: List[pygame.Surface] = []
+        self._frames = 0
+
+    def lines(self, profiler: Profiler) -> List[str]:
+        """
+        Format the current profiler summary.
+
+        Args:
+            profiler (Profiler): The profiler to show.
+
+        Returns:
+            List[str]: One line of text per phase and counter.
+        """
+        lines = []
+
+        # The simulation may record from another thread, the summary is taken under the profiler's lock
+        summary = profiler.summary()
+        counters = summary["counters"]
+
+        if "frame_time" in counters:
+            frame_time = counters["frame_time"]["mean"]
+            lines.append(f"{1 / frame_time if frame_time > 0 else 0:.1f} FPS")
+
+        for name, timing in summary["timings"].items():
+            blocks = summary["allocations"][name]["mean"]
+            lines.append(f"{name}: {timing['mean'] * 1e3:.2f} ms (p95 {timing['p95'] * 1e3:.2f}, {blocks:+.0f} blocks)")
+
+        for name, counter in counters.items():
+            if name != "frame_time":
+                lines.append(f"{name}: {counter['last']:.0f} (mean {counter['mean']:.1f})")
+
+        return lines
+
+    def draw(self, screen: pygame.Surface, profiler: Profiler):
+        """
+        Draw the overlay in the top left corner of a screen.
+
+        Args:
+            screen (pygame.Surface): Pygame screen to draw on.
+            profiler (Profiler): The profiler to show.
+        """
+        if self._frames % self.refresh_every == 0:
+            if self._font is None:
+                pygame.font.init()
+                self._font = pygame.font.Font(None, self.font_size)
+            self._lines = [self._font.render(line, True, self.color) for line in self.lines(profiler)]
+        self._frames += 1
+
+        screen.blits([(line, (5, 5 + i * self.font_size)) for i, line in enumerate(self._lines)], doreturn=False)
+
+
+class PygameRenderer:
+    """Draws the simulation onto a Pygame surface after every step.
+
+    Attach an instance to a `Simulation` with `Simulation.add_observer`, or draw `Snapshot`s
+    published by a simulation running in another thread with `draw_snapshot`. Drawing is timed in
+    the simulation's profiler, next to the phases of the step.
+
+    Above ``lod_threshold`` people, individual people and friendships are no longer drawn: the
+    people become a `density_heatmap` and the friendships `cell_flows` between coarser cells, so
+    the cost of a frame follows the number of pixels and cells rather than of people and edges.
+    """
+
+    def __init__(
+        self,
+        screen: pygame.Surface,
+        background_color: tuple = (200, 200, 200),
+        friendship_color: tuple = (0, 0, 0),
+        person_radius: int = 3,
+        flip: bool = True,
+        overlay: Optional[PerformanceOverlay] = None,
+        lod_threshold: Optional[int] = None,
+        lod_cell_size: int = 4,
+        lod_flow_cell_size: int = 40,
+    ):
+        """
+        Initialize the renderer.
+
+        Args:
+            screen (pygame.Surface): Pygame screen to draw on.
+            background_color (tuple): Color the screen is cleared with.
+            friendship_color (tuple): Color of the lines representing friendships.
+            person_radius (int): Radius of the circles representing people.
+            flip (bool): Whether to flip the display after drawing. Disable for off-screen surfaces.
+            overlay (Optional[PerformanceOverlay]): Performance overlay to draw on top, if any.
+            lod_threshold (Optional[int]): Draw the level of detail view for more people than this. Default is None
+                (never).
+            lod_cell_size (int): Side in pixels of the heatmap cells of the level of detail view. Default is 4.
+            lod_flow_cell_size (int): Side in pixels of the cells friendships are aggregated between. Default is 40.
+        """
+        self.screen = screen
+        self.background_color = background_color
+        self.friendship_color = friendship_color
+        self.person_radius = person_radius
+        self.flip = flip
+        self.overlay = overlay
+        self.lod_threshold = lod_threshold
+        self.lod_cell_size = lod_cell_size
+        self.lod_flow_cell_size = lod_flow_cell_size
+        self._last_frame: Optional[float] = None
+
+    def __call__(self, simulation: Simulation):
+        """
+        Draw the current state of the simulation.
+
+        Args:
+            simulation (Simulation): The simulation to draw.
+        """
+        profiler = simulation.profiler
+        width, height = self.screen.get_size()
+        people = simulation.people
+
+        if self._level_of_detail(people.num_people):
+            px, py = screen_coordinates(people.x, people.y, width, height)
+            idxs, jdxs = simulation.friendship_graph.get_friendships()
+            self._draw_level_of_detail(px, py, people.colors, idxs, jdxs, profiler)
+            return
+
+        self.screen.fill(self.background_color)
+
+        with profiler.phase("draw_friendships"):
+            simulation.friendship_graph.draw_friendships(simulation.people, self.screen, self.friendship_color, width, height)
+
+        with profiler.phase("draw_people"):
+            simulation.people.draw_people(self.screen, width, height, self.person_radius)
+
+        self._finish_frame(profiler)
+
+    def draw_snapshot(
+        self, snapshot: Snapshot, profiler: Profiler, x: Optional[np.ndarray] = None, y: Optional[np.ndarray] = None
+    ):
+        """
+        Draw a snapshot of a simulation.
+
+        Args:
+            snapshot (Snapshot): The snapshot to draw.
+            profiler (Profiler): Profiler to record the drawing phases into.
+            x (Optional[np.ndarray]): x-coordinates to draw the people at instead of the snapshot's, e.g. interpolated.
+            y (Optional[np.ndarray]): y-coordinates to draw the people at instead of the snapshot's.
+        """
+        width, height = self.screen.get_size()
+        px, py = screen_coordinates(snapshot.x if x is None else x, snapshot.y if y is None else y, width, height)
+
+        if self._level_of_detail(len(px)):
+            self._draw_level_of_detail(px, py, snapshot.colors, snapshot.idxs, snapshot.jdxs, profiler)
+            return
+
+        self.screen.fill(self.background_color)
+
+        with profiler.phase("draw_friendships"):
+            draw_segments(
+                self.screen, px[snapshot.idxs], py[snapshot.idxs], px[snapshot.jdxs], py[snapshot.jdxs], self.friendship_color
+            )
+
+        with profiler.phase("draw_people"):
+            draw_discs(self.screen, px, py, snapshot.colors, self.person_radius)
+
+        self._finish_frame(profiler)
+
+    def _level_of_detail(self, num_people: int) -> bool:
+        return self.lod_threshold is not None and num_people > self.lod_threshold
+
+    def _draw_level_of_detail(
+        self, px: np.ndarray, py: np.ndarray, colors: np.ndarray, idxs: np.ndarray, jdxs: np.ndarray, profiler: Profiler
+    ):
+        width, height = self.screen.get_size()
+
+        with profiler.phase("draw_people"):
+            heatmap = density_heatmap(px, py, colors, width, height, self.lod_cell_size, self.background_color)
+            cells = pygame.surfarray.make_surface(heatmap)
+            # The heatmap covers the whole screen, so there is nothing to clear
+            self.screen.blit(pygame.transform.scale(cells, (heatmap.shape[0] * self.lod_cell_size, heatmap.shape[1] * self.lod_cell_size)), (0, 0))
+
+        with profiler.phase("draw_friendships"):
+            cells1, cells2, counts = cell_flows(px, py, idxs, jdxs, width, height, self.lod_flow_cell_size)
+            draw_flows(self.screen, cells1, cells2, counts, self.lod_flow_cell_size, self.friendship_color, self.background_color)
+
+        self._finish_frame(profiler)
+
+    def _finish_frame(self, profiler: Profiler):
+        if self.overlay is not None:
+            self.overlay.draw(self.screen, profiler)
+
+        if self.flip:
+            with profiler.phase("flip"):
+                pygame.display.flip()
+
+        now = time.perf_counter()
+        if self._last_frame is not None:
+            profiler.count("frame_time", now - self._last_frame)
+        self._last_frame = now
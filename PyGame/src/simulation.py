@@ -0,0 +1,217 @@
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from src.events import FriendshipEvents
+from src.profiling import Profiler
+from src.spatial import PairGeometry
+from src.structures import FriendshipGraph, People
+from src.wellbeing import WellbeingDynamics
+
+Observer = Callable[["Simulation"], None]
+
+
+class Simulation:
+    """A fixed-step simulation engine that is independent of any display.
+
+    Each step moves the people randomly and towards their friends, runs the friendship passes, updates the wellbeing of the people
+    and advances the simulation time.
+    Anything that wants to follow the simulation, such as a renderer, is attached as an observer
+    and called after every step.
+
+    Attributes:
+        people (People): The people in the simulation.
+        friendship_graph (FriendshipGraph): The friendships between the people.
+        time_step (float): Simulation time advanced per step (mainly used for simplex noise).
+        t (float): The current simulation time.
+        steps (int): The number of steps taken so far.
+        observers (List[Observer]): Callables invoked with the simulation after every step.
+        profiler (Profiler): Records the time spent in every phase of a step and the friendships added and removed.
+        wellbeing_dynamics (Optional[WellbeingDynamics]): The wellbeing stage of a step, if any.
+        friendship_events (Optional[FriendshipEvents]): If set, it changes the friendships instead of the per-step passes.
+    """
+
+    def __init__(
+        self,
+        people: People,
+        friendship_graph: FriendshipGraph,
+        time_step: float = 1.0e-2,
+        t: float = 0.0,
+        profiler: Optional[Profiler] = None,
+        wellbeing_dynamics: Optional[WellbeingDynamics] = None,
+        friendship_events: Optional[FriendshipEvents] = None,
+    ):
+        """
+        Initialize the simulation.
+
+        Args:
+            people (People): The people in the simulation.
+            friendship_graph (FriendshipGraph): The friendships between the people.
+            time_step (float): Simulation time advanced per step. Default is 1e-2.
+            t (float): Initial simulation time. Default is 0.
+            profiler (Optional[Profiler]): Profiler to record into. Defaults to a new, enabled one.
+            wellbeing_dynamics (Optional[WellbeingDynamics]): The wellbeing stage of a step. If None, wellbeing is
+                left unchanged.
+            friendship_events (Optional[FriendshipEvents]): Event-driven friendship dynamics to use instead of the
+                per-step establishment and breaking passes. Default is None.
+        """
+        self.people = people
+        self.friendship_graph = friendship_graph
+        self.time_step = time_step
+        self.t = t
+        self.steps = 0
+        self.observers: List[Observer] = []
+        self.profiler = profiler if profiler is not None else Profiler()
+        self.wellbeing_dynamics = wellbeing_dynamics
+        self.friendship_events = friendship_events
+
+    def add_observer(self, observer: Observer):
+        """
+        Attach an observer that is called after every step.
+
+        Args:
+            observer (Observer): Callable taking the simulation as its only argument.
+        """
+        self.observers.append(observer)
+
+    def remove_observer(self, observer: Observer):
+        """
+        Detach a previously attached observer.
+
+        Args:
+            observer (Observer): The observer to detach.
+        """
+        self.observers.remove(observer)
+
+    def step(self):
+        """Advance the simulation by a single step."""
+        profiler = self.profiler
+
+        with profiler.phase("random_move"):
+            self.people.random_move(self.t)
+
+        with profiler.phase("attract_to_friends"):
+            self.people.attract_to_friends(self.friendship_graph)
+
+        # The friendship passes and the wellbeing stage share the geometry of the step
+        geometry = PairGeometry(self.people.x, self.people.y)
+
+        if self.friendship_events is not None:
+            with profiler.phase("friendship_events"):
+                num_added, num_removed = self.friendship_events.step(self.people)
+        else:
+            with profiler.phase("add_random_friendships"):
+                num_added = self.friendship_graph.add_random_friendships(self.people, geometry)
+
+            with profiler.phase("remove_random_friendships"):
+                num_removed = self.friendship_graph.remove_random_friendships(self.people, geometry)
+
+        profiler.count("friendships_added", num_added)
+        profiler.count("friendships_removed", num_removed)
+
+        if self.wellbeing_dynamics is not None:
+            with profiler.phase("update_wellbeing"):
+                self.wellbeing_dynamics.update(self.people, self.friendship_graph, self.time_step, geometry)
+
+        self.t += self.time_step
+        self.steps += 1
+
+        for observer in self.observers:
+            observer(self)
+
+    def run(self, num_steps: int):
+        """
+        Advance the simulation by a number of steps, as fast as possible.
+
+        Args:
+            num_steps (int): The number of steps to take.
+        """
+        for _ in range(num_steps):
+            self.step()
+
+
+def create_simulation(
+    num_people: int = 200,
+    friend_attractiveness: float = 1.0e-3,
+    establishment_equ_prob_dist: float = 0.01,
+    break_equ_prob_dist: float = 1.414 * 0.75,
+    time_step: float = 1.0e-2,
+    storage: str = "dense",
+    cutoff_tolerance: Optional[float] = None,
+    seed: Optional[int] = None,
+    noise_backend: str = "vectorized",
+    noise_chunk_size: Optional[int] = 16,
+    probability_table_size: Optional[int] = None,
+    track_statistics: bool = False,
+    precision: str = "double",
+    wellbeing_dynamics: Optional[WellbeingDynamics] = None,
+    event_driven: bool = False,
+    tile_elements: Optional[int] = None,
+) -> Simulation:
+    """
+    Build a simulation with freshly initialized people and an empty friendship graph.
+
+    Args:
+        num_people (int): The number of people in the simulation.
+        friend_attractiveness (float): How strongly friends are pulled towards each other.
+        establishment_equ_prob_dist (float): Parameter for the friendship establishment probability distribution.
+        break_equ_prob_dist (float): Parameter for the friendship breaking probability distribution.
+        time_step (float): Simulation time advanced per step.
+        storage (str): Storage mode of the friendship graph, see `FriendshipGraph`.
+        cutoff_tolerance (Optional[float]): Establishment cutoff tolerance, see `FriendshipGraph`.
+        seed (Optional[int]): If given, the simulation draws from its own random state and noise generator
+            seeded with this value, which makes it reproducible. Otherwise the global generators are used.
+        noise_backend (str): Movement noise backend, see `People`. Default is "vectorized".
+        noise_chunk_size (Optional[int]): If given, the movement noise is precomputed this many steps ahead,
+            see `People.buffer_noise`. Default is 16.
+        probability_table_size (Optional[int]): Lookup table size of the probability functions, see `FriendshipGraph`.
+        track_statistics (bool): Whether the friendship graph maintains its statistics incrementally, see
+            `FriendshipGraph`. Default is False.
+        precision (str): Either "double" or "single" floating point state, see `People`. Default is "double".
+        wellbeing_dynamics (Optional[WellbeingDynamics]): The wellbeing stage of a step. Defaults to `WellbeingDynamics`
+            with its default parameters.
+        event_driven (bool): Whether friendships change by `FriendshipEvents` instead of the per-step passes.
+            Default is False.
+        tile_elements (Optional[int]): Tile size of the all-pairs establishment pass, see `FriendshipGraph`.
+
+    Returns:
+        Simulation: The new simulation.
+    """
+    rng = np.random.RandomState(seed) if seed is not None else None
+
+    people = People(
+        num_people,
+        friend_attractiveness=friend_attractiveness,
+        rng=rng,
+        noise_seed=seed,
+        noise_backend=noise_backend,
+        precision=precision,
+    )
+    if noise_chunk_size is not None:
+        people.buffer_noise(time_step, chunk_size=noise_chunk_size)
+
+    friendship_graph = FriendshipGraph(
+        num_people,
+        establishment_equ_prob_dist=establishment_equ_prob_dist,
+        break_equ_prob_dist=break_equ_prob_dist,
+        storage=storage,
+        cutoff_tolerance=cutoff_tolerance,
+        rng=rng,
+        probability_table_size=probability_table_size,
+        track_statistics=track_statistics,
+        precision=precision,
+        tile_elements=tile_elements,
+    )
+
+    if wellbeing_dynamics is None:
+        wellbeing_dynamics = WellbeingDynamics()
+
+    friendship_events = FriendshipEvents(friendship_graph) if event_driven else None
+
+    return Simulation(
+        people,
+        friendship_graph,
+        time_step=time_step,
+        wellbeing_dynamics=wellbeing_dynamics,
+        friendship_events=friendship_events,
+    )
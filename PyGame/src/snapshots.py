@@ -0,0 +1,203 @@
+import threading
+import time
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from src.simulation import Simulation
+
+
+class Snapshot(NamedTuple):
+    """An immutable copy of everything needed to draw one step of a simulation.
+
+    The arrays are read-only copies, so a snapshot can be drawn by one thread while another one
+    keeps stepping the simulation.
+    """
+
+    step: int
+    t: float
+    wall_time: float
+    x: np.ndarray
+    y: np.ndarray
+    colors: np.ndarray
+    idxs: np.ndarray
+    jdxs: np.ndarray
+
+
+def _frozen(array: np.ndarray) -> np.ndarray:
+    array = np.array(array)
+    array.flags.writeable = False
+    return array
+
+
+def take_snapshot(simulation: Simulation) -> Snapshot:
+    """
+    Copy the current state of a simulation into a snapshot.
+
+    Args:
+        simulation (Simulation): The simulation.
+
+    Returns:
+        Snapshot: The snapshot.
+    """
+    people = simulation.people
+    idxs, jdxs = simulation.friendship_graph.get_friendships()
+
+    return Snapshot(
+        step=simulation.steps,
+        t=simulation.t,
+        wall_time=time.perf_counter(),
+        x=_frozen(people.x),
+        y=_frozen(people.y),
+        colors=_frozen(people.colors),
+        idxs=_frozen(idxs),
+        jdxs=_frozen(jdxs),
+    )
+
+
+def interpolate_positions(previous: Snapshot, current: Snapshot, alpha: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Blend the positions of two consecutive snapshots.
+
+    Args:
+        previous (Snapshot): The older snapshot.
+        current (Snapshot): The newer snapshot.
+        alpha (float): Blend factor, 0 gives the older and 1 the newer positions.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The interpolated x- and y-coordinates.
+    """
+    return previous.x + alpha * (current.x - previous.x), previous.y + alpha * (current.y - previous.y)
+
+
+class SnapshotBuffer:
+    """A double buffer of the two most recently published snapshots.
+
+    The simulation thread publishes into the back slot and swaps it to the front under a lock;
+    readers always get a consistent pair of the newest snapshot and its predecessor.
+    """
+
+    def __init__(self):
+        """Initialize an empty buffer."""
+        self._lock = threading.Lock()
+        self._front: Optional[Snapshot] = None
+        self._back: Optional[Snapshot] = None
+
+    def publish(self, snapshot: Snapshot):
+        """
+        Make a snapshot the newest one.
+
+        Args:
+            snapshot (Snapshot): The snapshot.
+        """
+        with self._lock:
+            self._front, self._back = snapshot, self._front
+
+    def latest(self) -> Tuple[Optional[Snapshot], Optional[Snapshot]]:
+        """
+        Get the two newest snapshots.
+
+        Returns:
+            Tuple[Optional[Snapshot], Optional[Snapshot]]: The previous and the newest snapshot, None until published.
+        """
+        with self._lock:
+            return self._back, self._front
+
+    def blend(self, now: Optional[float] = None) -> Optional[Tuple[Snapshot, np.ndarray, np.ndarray]]:
+        """
+        Get the newest snapshot with positions interpolated for display at a given time.
+
+        The display runs one publishing interval behind the simulation: at the moment the newest
+        snapshot is published the positions of its predecessor are shown, and they move towards the
+        newest ones over the following interval.
+
+        Args:
+            now (Optional[float]): The time of display, in `time.perf_counter` seconds. Defaults to the current time.
+
+        Returns:
+            Optional[Tuple[Snapshot, np.ndarray, np.ndarray]]: The newest snapshot and the interpolated x- and
+                y-coordinates, or None if nothing has been published yet.
+        """
+        previous, current = self.latest()
+        if current is None:
+            return None
+        if previous is None or current.wall_time <= previous.wall_time:
+            return current, current.x, current.y
+
+        now = time.perf_counter() if now is None else now
+        alpha = min(max((now - current.wall_time) / (current.wall_time - previous.wall_time), 0.0), 1.0)
+        x, y = interpolate_positions(previous, current, alpha)
+
+        return current, x, y
+
+
+class SimulationThread(threading.Thread):
+    """Steps a simulation in the background and publishes snapshots of it.
+
+    The simulation runs at its own rate, independently of how fast (or slowly) the snapshots are
+    drawn. NumPy releases the GIL in its heavy operations, so stepping and drawing overlap.
+
+    Attributes:
+        simulation (Simulation): The simulation to step. Only this thread may touch it while it runs.
+        buffer (SnapshotBuffer): The buffer the snapshots are published to.
+        steps_per_second (Optional[float]): Target step rate, None for as fast as possible.
+        publish_every (int): Publish a snapshot every this many steps.
+        paused (bool): Whether stepping is paused.
+    """
+
+    def __init__(
+        self,
+        simulation: Simulation,
+        buffer: SnapshotBuffer,
+        steps_per_second: Optional[float] = None,
+        publish_every: int = 1,
+    ):
+        """
+        Initialize the thread and publish the initial state.
+
+        Args:
+            simulation (Simulation): The simulation to step.
+            buffer (SnapshotBuffer): The buffer the snapshots are published to.
+            steps_per_second (Optional[float]): Target step rate, None for as fast as possible. Default is None.
+            publish_every (int): Publish a snapshot every this many steps. Default is 1.
+        """
+        super().__init__(daemon=True)
+        self.simulation = simulation
+        self.buffer = buffer
+        self.steps_per_second = steps_per_second
+        self.publish_every = publish_every
+        self.paused = False
+        self._stop_event = threading.Event()
+
+        buffer.publish(take_snapshot(simulation))
+
+    def run(self):
+        next_step = time.perf_counter()
+        while not self._stop_event.is_set():
+            if self.paused:
+                self._stop_event.wait(0.01)
+                next_step = time.perf_counter()
+                continue
+
+            self.simulation.step()
+            if self.simulation.steps % self.publish_every == 0:
+                self.buffer.publish(take_snapshot(self.simulation))
+
+            if self.steps_per_second is not None:
+                next_step += 1 / self.steps_per_second
+                # Sleep until the next step is due, without trying to catch up after falling behind
+                delay = next_step - time.perf_counter()
+                if delay > 0:
+                    self._stop_event.wait(delay)
+                else:
+                    next_step = time.perf_counter()
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop stepping and wait for the thread to finish.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait at most. Default is None (no limit).
+        """
+        self._stop_event.set()
+        self.join(timeout)
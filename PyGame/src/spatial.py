@@ -0,0 +1,184 @@
+import math
+from typing import Tuple
+
+import numpy as np
+
+# Half of the 3x3 cell neighbourhood, so that every pair of cells is visited once
+HALF_NEIGHBOURHOOD = ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1))
+
+# Upper bound on the number of candidate pairs held in memory at once
+MAX_CHUNK_CANDIDATES = 1 << 22
+
+
+def _expand_ranges(begin: np.ndarray, end: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Expand a set of half-open ranges into flat (owner, index) arrays.
+
+    Args:
+        begin (np.ndarray): Start of each range.
+        end (np.ndarray): End of each range (exclusive).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The range each element came from and the element itself.
+    """
+    counts = np.maximum(end - begin, 0)
+    owners = np.repeat(np.arange(len(begin)), counts)
+    offsets = np.arange(len(owners)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    return owners, begin[owners] + offsets
+
+
+def neighbour_pairs(x: np.ndarray, y: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find every pair of points in the unit square that lie within a given radius of each other.
+
+    Points are bucketed into a uniform grid whose cells are at least ``radius`` wide, so only
+    pairs in the same or adjacent cells are ever compared. The cost is O(N + candidates)
+    instead of the O(N^2) of a full distance matrix.
+
+    Args:
+        x (np.ndarray): The x-coordinates of the points (Range: [0, 1]).
+        y (np.ndarray): The y-coordinates of the points (Range: [0, 1]).
+        radius (float): The maximum distance between the points of a pair.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Indices ``(i, j)`` with ``i < j`` and the distance of each pair.
+    """
+    num_points = len(x)
+
+    # Cells must not be narrower than the radius, and there is no point in having many more cells than points
+    cells_per_side = max(1, min(int(1 / radius) if radius > 0 else num_points, math.isqrt(num_points) + 1))
+
+    cell_x = np.minimum((x * cells_per_side).astype(np.int64), cells_per_side - 1)
+    cell_y = np.minimum((y * cells_per_side).astype(np.int64), cells_per_side - 1)
+    cells = cell_x * cells_per_side + cell_y
+
+    order = np.argsort(cells, kind="stable")
+    sorted_cells = cells[order]
+    all_cells = np.arange(cells_per_side * cells_per_side)
+    cell_begin = np.searchsorted(sorted_cells, all_cells, side="left")
+    cell_end = np.searchsorted(sorted_cells, all_cells, side="right")
+
+    # Work on coordinates in cell order, so that the points of a cell are contiguous in memory
+    sorted_x = x[order]
+    sorted_y = y[order]
+    sorted_cell_x = cell_x[order]
+    sorted_cell_y = cell_y[order]
+    positions = np.arange(num_points)
+
+    idxs, jdxs, distances = [], [], []
+    for offset_x, offset_y in HALF_NEIGHBOURHOOD:
+        neighbour_x = sorted_cell_x + offset_x
+        neighbour_y = sorted_cell_y + offset_y
+        valid = (neighbour_x < cells_per_side) & (neighbour_y >= 0) & (neighbour_y < cells_per_side)
+
+        neighbour_cells = neighbour_x[valid] * cells_per_side + neighbour_y[valid]
+        begin = cell_begin[neighbour_cells]
+        end = cell_end[neighbour_cells]
+
+        valid_positions = positions[valid]
+        if offset_x == 0 and offset_y == 0:
+            # Within a cell only look forward so that each pair is produced once
+            begin = valid_positions + 1
+
+        # Expand the candidates in chunks and filter them right away to keep peak memory bounded
+        candidate_counts = np.cumsum(np.maximum(end - begin, 0))
+        num_candidates = candidate_counts[-1] if len(candidate_counts) else 0
+        chunk_bounds = np.searchsorted(candidate_counts, np.arange(0, num_candidates, MAX_CHUNK_CANDIDATES), side="right")
+        chunk_bounds = np.append(chunk_bounds, len(begin))
+
+        for chunk_begin, chunk_end in zip(chunk_bounds[:-1], chunk_bounds[1:]):
+            owners, others = _expand_ranges(begin[chunk_begin:chunk_end], end[chunk_begin:chunk_end])
+            owners = valid_positions[chunk_begin:chunk_end][owners]
+
+            distance = np.sqrt((sorted_x[owners] - sorted_x[others]) ** 2 + (sorted_y[owners] - sorted_y[others]) ** 2)
+            close = distance <= radius
+
+            idxs.append(order[owners[close]])
+            jdxs.append(order[others[close]])
+            distances.append(distance[close])
+
+    if not idxs:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+
+    idxs = np.concatenate(idxs)
+    jdxs = np.concatenate(jdxs)
+
+    return np.minimum(idxs, jdxs), np.maximum(idxs, jdxs), np.concatenate(distances)
+
+
+class PairGeometry:
+    """Pairwise distances between people, computed at most once per simulation step.
+
+    The establishment and breaking passes of a step look at the same positions, so they share
+    one instance: whatever one pass computes (a full distance matrix or the pairs within a cutoff
+    radius) is reused by the other instead of being computed twice.
+
+    Attributes:
+        x (np.ndarray): The x-coordinates of the people at this step.
+        y (np.ndarray): The y-coordinates of the people at this step.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray):
+        """
+        Initialize the geometry of a step.
+
+        Args:
+            x (np.ndarray): The x-coordinates of the people.
+            y (np.ndarray): The y-coordinates of the people.
+        """
+        self.x = x
+        self.y = y
+        self._distance_matrix = None
+        self._neighbour_pairs = {}
+
+    def distance_matrix(self) -> np.ndarray:
+        """
+        Get the full matrix of distances between every pair of people.
+
+        Returns:
+            np.ndarray: The (N, N) distance matrix.
+        """
+        if self._distance_matrix is None:
+            x_diff = self.x.reshape(-1, 1) - self.x.reshape(1, -1)
+            y_diff = self.y.reshape(-1, 1) - self.y.reshape(1, -1)
+
+            self._distance_matrix = np.sqrt(x_diff ** 2 + y_diff ** 2)
+
+        return self._distance_matrix
+
+    def neighbour_pairs(self, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get every pair of people within a given radius of each other, see `neighbour_pairs`.
+
+        Args:
+            radius (float): The maximum distance between the people of a pair.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Indices ``(i, j)`` with ``i < j`` and the distance of each pair.
+        """
+        if radius not in self._neighbour_pairs:
+            # Always found through the grid, scanning a full matrix for them would cost O(N^2)
+            idxs, jdxs, distance = neighbour_pairs(self.x, self.y, radius)
+            if self._distance_matrix is not None:
+                # Same values as `pair_distances` gives for these pairs
+                distance = self._distance_matrix[idxs, jdxs]
+            self._neighbour_pairs[radius] = idxs, jdxs, distance
+
+        return self._neighbour_pairs[radius]
+
+    def pair_distances(self, idxs: np.ndarray, jdxs: np.ndarray) -> np.ndarray:
+        """
+        Get the distances of a given list of pairs.
+
+        Args:
+            idxs (np.ndarray): Indices of the first person of each pair.
+            jdxs (np.ndarray): Indices of the second person of each pair.
+
+        Returns:
+            np.ndarray: The distance of each pair.
+        """
+        if self._distance_matrix is not None:
+            return self._distance_matrix[idxs, jdxs]
+
+        return np.sqrt((self.x[idxs] - self.x[jdxs]) ** 2 + (self.y[idxs] - self.y[jdxs]) ** 2)
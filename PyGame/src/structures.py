@@ -1,23 +1,93 @@
 import random
-from typing import List, Tuple, Optional
+from typing import TYPE_CHECKING, List, Tuple, Optional
 import numpy as np
 import opensimplex
-import pygame
+
+if TYPE_CHECKING:
+    import pygame
 
 from src.functions import (
     MAXIMUM_DISTANCE,
+    establishment_cutoff_distance,
     friendship_breaking_probability,
     friendship_establishment_probability,
 )
+from src.graph_statistics import GraphStatistics
+from src.noise import NoiseProvider, SimplexNoise
+from src.spatial import PairGeometry
 
 SEED = None
 MAX_RANDOM_SPEED = 3.0e-3
 MIN_RANDOM_SPEED = 3.0e-4
 
+# Floating point type of the simulation state per precision mode
+PRECISION_DTYPES = {"double": np.float64, "single": np.float32}
+
+# Upper bound on the number of adjacency entries unpacked at once from bit-packed storage
+MAX_UNPACKED_ELEMENTS = 1 << 24
+
+# Default upper bound on the number of pairs evaluated at once by the tiled establishment pass
+MAX_TILE_ELEMENTS = 1 << 20
+
+# Upper bound on the number of bytes of bit-packed storage whose set bits are counted at once
+MAX_COUNTED_BYTES = 1 << 20
+
+# Number of set bits of every byte value, for NumPy versions without np.bitwise_count
+POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
 if SEED is not None:
     opensimplex.seed(SEED)
     random.seed(SEED)
 
+def count_set_bits(bits: np.ndarray) -> int:
+    """
+    Count the set bits of a uint8 array.
+
+    Args:
+        bits (np.ndarray): The bytes to count.
+
+    Returns:
+        int: The number of set bits.
+    """
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(bits).sum(dtype=np.int64))
+    return int(POPCOUNT[bits].sum(dtype=np.int64))
+
+
+def friend_attraction(
+    x: np.ndarray, y: np.ndarray, idxs: np.ndarray, jdxs: np.ndarray, attractiveness: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sum the attraction of every friendship into per-person displacements.
+
+    Args:
+        x (np.ndarray): The x-coordinates of the people.
+        y (np.ndarray): The y-coordinates of the people.
+        idxs (np.ndarray): Indices of the first friend of each friendship.
+        jdxs (np.ndarray): Indices of the second friend of each friendship.
+        attractiveness (float): The distance every friendship pulls each of its friends.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The x and y displacement of every person.
+    """
+    x_diff = x[jdxs] - x[idxs]
+    y_diff = y[jdxs] - y[idxs]
+
+    distance = np.sqrt(x_diff ** 2 + y_diff ** 2)
+    coincident = distance == 0
+
+    # Unit vectors from i to j, zero for friends at the same position
+    x_pull = attractiveness * np.divide(x_diff, distance, out=np.zeros_like(x_diff), where=~coincident)
+    y_pull = attractiveness * np.divide(y_diff, distance, out=np.zeros_like(y_diff), where=~coincident)
+
+    # Scatter-add the pull onto i and the opposite pull onto j
+    people = np.concatenate((idxs, jdxs))
+    dx = np.bincount(people, weights=np.concatenate((x_pull, -x_pull)), minlength=len(x))
+    dy = np.bincount(people, weights=np.concatenate((y_pull, -y_pull)), minlength=len(y))
+
+    return dx, dy
+
+
 class People:
     """A collection of people in the simulation.
 
@@ -31,27 +101,63 @@ class People:
         irc (np.ndarray): Influence reach coefficient for each person - A number between 0 and 1 that determines how far the person's influence reaches.
         colors (np.ndarray): Colors representing each person.
         wellbeing (np.ndarray): Wellbeing values for each person.
+        dtype (np.dtype): Floating point type of the per-person state.
     """
     
-    def __init__(self, num_people: int, friend_attractiveness: float = 0.0):
+    def __init__(
+        self,
+        num_people: int,
+        friend_attractiveness: float = 0.0,
+        rng: Optional[np.random.RandomState] = None,
+        noise_seed: Optional[int] = None,
+        noise_backend: str = "opensimplex",
+        precision: str = "double",
+    ):
         """
         Initialize a collection of people.
 
         Args:
             num_people (int): The number of people in the simulation.
+            friend_attractiveness (float): How strongly friends are pulled towards each other.
+            rng (Optional[np.random.RandomState]): Random state to draw from. Defaults to the global NumPy random state.
+            noise_seed (Optional[int]): Seed of a private noise generator for the movement. Defaults to the global
+                opensimplex generator.
+            noise_backend (str): Either "opensimplex" or "vectorized" (the in-house `SimplexNoise`, which gives
+                identical values). Default is "opensimplex".
+            precision (str): Either "double" or "single". Single precision stores the state as float32 and the
+                colors as uint8, which halves the memory and bandwidth of every per-person array. The random draws
+                are the same in both modes. Default is "double".
         """
+        if precision not in PRECISION_DTYPES:
+            raise ValueError(f"Unknown precision {precision!r}, expected one of {tuple(PRECISION_DTYPES)}")
+
         self.num_people = num_people
         self.friend_attractiveness = friend_attractiveness
 
-        self.x = np.random.rand(num_people)
-        self.y = np.random.rand(num_people)
-        self.speed_coefficient = np.random.rand(num_people) * (MAX_RANDOM_SPEED - MIN_RANDOM_SPEED) + MIN_RANDOM_SPEED
-        self.sfc = np.random.rand(num_people)
-        self.wpc = np.random.rand(num_people)
-        self.irc = np.random.rand(num_people)
-        self.colors = np.random.randint(20, 255, (num_people, 3))
+        self.rng = rng if rng is not None else np.random
+        if noise_backend == "vectorized":
+            self.noise = SimplexNoise(noise_seed if noise_seed is not None else opensimplex.get_seed())
+        elif noise_backend == "opensimplex":
+            self.noise = opensimplex.OpenSimplex(noise_seed) if noise_seed is not None else opensimplex
+        else:
+            raise ValueError(f"Unknown noise backend {noise_backend!r}, expected 'opensimplex' or 'vectorized'")
+        self.noise_provider: Optional[NoiseProvider] = None
+
+        self.x = self.rng.rand(num_people)
+        self.y = self.rng.rand(num_people)
+        self.speed_coefficient = self.rng.rand(num_people) * (MAX_RANDOM_SPEED - MIN_RANDOM_SPEED) + MIN_RANDOM_SPEED
+        self.sfc = self.rng.rand(num_people)
+        self.wpc = self.rng.rand(num_people)
+        self.irc = self.rng.rand(num_people)
+        self.colors = self.rng.randint(20, 255, (num_people, 3))
         self.wellbeing = np.zeros(num_people)
 
+        self.dtype = np.dtype(PRECISION_DTYPES[precision])
+        if precision == "single":
+            for name in ("x", "y", "speed_coefficient", "sfc", "wpc", "irc", "wellbeing"):
+                setattr(self, name, getattr(self, name).astype(self.dtype))
+            self.colors = self.colors.astype(np.uint8)
+
     def move(self, dx: np.ndarray, dy: np.ndarray):
         """
         Move the people by a given delta in x and y directions.
@@ -60,8 +166,18 @@ class People:
             dx (np.ndarray): Change in x-coordinate.
             dy (np.ndarray): Change in y-coordinate.
         """
-        self.x = np.clip(self.x + dx, 0, 1)
-        self.y = np.clip(self.y + dy, 0, 1)
+        self.x = np.clip(self.x + np.asarray(dx, dtype=self.dtype), 0, 1)
+        self.y = np.clip(self.y + np.asarray(dy, dtype=self.dtype), 0, 1)
+
+    def buffer_noise(self, time_step: float, chunk_size: int = 64):
+        """
+        Serve the movement noise from a buffer of precomputed timesteps, see `NoiseProvider`.
+
+        Args:
+            time_step (float): Simulation time advanced per step.
+            chunk_size (int): The number of timesteps evaluated at once. Default is 64.
+        """
+        self.noise_provider = NoiseProvider(self.num_people, time_step, noise=self.noise, chunk_size=chunk_size)
 
     def random_move(self, t: float):
         """
@@ -70,32 +186,42 @@ class People:
         Args:
             t (float): Time parameter for noise generation.
         """
-        ids = np.arange(self.num_people)
-        ts = np.array([t])
+        if self.noise_provider is not None:
+            dx, dy = self.noise_provider.displacements(t)
+        else:
+            ids = np.arange(self.num_people)
+            ts = np.array([t])
 
-        dx = opensimplex.noise2array(2 * ids, ts).flatten()
-        dy = opensimplex.noise2array(2 * ids + 1, ts).flatten()
+            dx = self.noise.noise2array(2 * ids, ts).flatten()
+            dy = self.noise.noise2array(2 * ids + 1, ts).flatten()
+
+        # Noise is always evaluated in double precision
+        dx = dx.astype(self.dtype, copy=False)
+        dy = dy.astype(self.dtype, copy=False)
 
         self.x = np.clip(self.x + dx * self.speed_coefficient, 0, 1)
         self.y = np.clip(self.y + dy * self.speed_coefficient, 0, 1)
 
     def attract_to_friends(self, friendship_graph: "FriendshipGraph"):
-        """Move the friends to each other based on the friendship graph."""
-
-        idxs, jdxs = friendship_graph.get_friendships()
+        """
+        Move the friends to each other based on the friendship graph.
 
-        x_diff = self.x[jdxs] - self.x[idxs]
-        y_diff = self.y[jdxs] - self.y[idxs]
+        Every friendship pulls both friends a distance of ``friend_attractiveness`` towards each other.
+        The pulls are summed per person with a scatter-add over the edge list, so a call costs O(N + E).
+        Friends at the same position do not pull each other.
 
-        distance = np.sqrt(x_diff ** 2 + y_diff ** 2)
+        Args:
+            friendship_graph (FriendshipGraph): The friendships between the people.
+        """
+        if self.friend_attractiveness == 0:
+            return
 
-        dx = self.friend_attractiveness * x_diff / distance
-        dy = self.friend_attractiveness * y_diff / distance
+        idxs, jdxs = friendship_graph.get_friendships()
+        dx, dy = friend_attraction(self.x, self.y, idxs, jdxs, self.friend_attractiveness)
 
         self.move(dx, dy)
 
-
-    def draw_people(self, screen: pygame.Surface, width: int, height: int, radius: int):
+    def draw_people(self, screen: "pygame.Surface", width: int, height: int, radius: int):
         """
         Draw the people on a Pygame screen.
 
@@ -105,15 +231,40 @@ class People:
             height (int): Height of the screen.
             radius (int): Radius of the circles representing people.
         """
-        for i in range(self.num_people):
-            point = int(self.x[i] * width), int(self.y[i] * height)
-            pygame.draw.circle(screen, self.colors[i], point, radius)
+        from src.rendering import draw_discs, screen_coordinates
+
+        px, py = screen_coordinates(self.x, self.y, width, height)
+        draw_discs(screen, px, py, self.colors, radius)
 
 
 class FriendshipGraph:
-    """A graph representing friendships between people."""
-    
-    def __init__(self, num_people: int, establishment_equ_prob_dist: float, break_equ_prob_dist: float):
+    """A graph representing friendships between people.
+
+    Friendships can be stored either as a dense ``num_people x num_people``
+    adjacency matrix, as a bit-packed upper triangle of it (one bit per pair,
+    64 times smaller than a float64 matrix) or, for large populations, as a
+    sorted array of edge keys (``i * num_people + j`` with ``i < j``), i.e. a
+    symmetric COO edge list.
+
+    With ``track_statistics``, degrees, triangle counts and components are kept up to date in a
+    `GraphStatistics` instance from the friendships every call adds and removes.
+    """
+
+    STORAGE_MODES = ("dense", "sparse", "packed")
+
+    def __init__(
+        self,
+        num_people: int,
+        establishment_equ_prob_dist: float,
+        break_equ_prob_dist: float,
+        storage: str = "dense",
+        cutoff_tolerance: Optional[float] = None,
+        rng: Optional[np.random.RandomState] = None,
+        probability_table_size: Optional[int] = None,
+        track_statistics: bool = False,
+        precision: str = "double",
+        tile_elements: Optional[int] = None,
+    ):
         """
         Initialize the friendship graph.
 
@@ -121,13 +272,90 @@ class FriendshipGraph:
             num_people (int): Number of people in the simulation.
             establishment_equ_prob_dist (float): Parameter for the friendship establishment probability distribution.
             break_equ_prob_dist (float): Parameter for the friendship breaking probability distribution.
+            storage (str): Either "dense" (adjacency matrix), "packed" (bit-packed adjacency matrix) or "sparse"
+                (edge list). Default is "dense".
+            cutoff_tolerance (Optional[float]): If given, friendship establishment only considers pairs within a
+                cutoff radius, chosen so that the expected number of missed friendships per person and step does
+                not exceed this value. If None, every pair is considered. Default is None.
+            rng (Optional[np.random.RandomState]): Random state to draw from. Defaults to the global NumPy random state.
+            probability_table_size (Optional[int]): If given, both probability functions are evaluated from lookup
+                tables of this size instead of analytically. Default is None.
+            track_statistics (bool): Whether to maintain `statistics` incrementally. Default is False.
+            precision (str): Either "double" or "single", see `People`. In single precision the dense adjacency
+                matrix is boolean rather than float64. Default is "double".
+            tile_elements (Optional[int]): If given, the establishment pass without a cutoff radius evaluates the
+                upper triangle of the pairs in blocks of rows of at most this many pairs, instead of building
+                N x N matrices, see `add_random_friendships`. Default is None.
         """
-        self.graph = np.zeros((num_people, num_people))
+        if storage not in self.STORAGE_MODES:
+            raise ValueError(f"Unknown storage mode {storage!r}, expected one of {self.STORAGE_MODES}")
+        if precision not in PRECISION_DTYPES:
+            raise ValueError(f"Unknown precision {precision!r}, expected one of {tuple(PRECISION_DTYPES)}")
+
+        self.num_people = num_people
+        self.storage = storage
+        self.rng = rng if rng is not None else np.random
+
+        self.graph = None
+        if storage == "dense":
+            self.graph = np.zeros((num_people, num_people), dtype=bool if precision == "single" else np.float64)
+            # Edge list of the matrix, rebuilt on the first read after a change
+            self._dense_edges = None
+        elif storage == "packed":
+            self._bits = np.zeros((num_people, (num_people + 7) // 8), dtype=np.uint8)
+        else:
+            self._edge_keys = np.empty(0, dtype=np.int64)
+
         self.establishment_equ_prob_dist = establishment_equ_prob_dist
         self.break_equ_prob_dist = break_equ_prob_dist
+        self.probability_table_size = probability_table_size
+        self.tile_elements = tile_elements
+
+        self.establishment_prob = friendship_establishment_probability(
+            establishment_equ_prob_dist, table_size=probability_table_size
+        )
+        self.breaking_prob = friendship_breaking_probability(break_equ_prob_dist, table_size=probability_table_size)
+
+        self.statistics = GraphStatistics(num_people) if track_statistics else None
+
+        self.cutoff_tolerance = cutoff_tolerance
+        self.cutoff_radius = None
+        if cutoff_tolerance is not None:
+            self.cutoff_radius = establishment_cutoff_distance(establishment_equ_prob_dist, num_people, cutoff_tolerance)
+
+    def _to_edge_keys(self, people1: np.ndarray, people2: np.ndarray) -> np.ndarray:
+        """
+        Convert pairs of people into sorted, unique edge keys.
 
-        self.establishment_prob = friendship_establishment_probability(establishment_equ_prob_dist)
-        self.breaking_prob = friendship_breaking_probability(break_equ_prob_dist)
+        Args:
+            people1 (np.ndarray): Indices of the first set of people.
+            people2 (np.ndarray): Indices of the second set of people.
+
+        Returns:
+            np.ndarray: Sorted unique keys ``min * num_people + max``, self-pairs dropped.
+        """
+        people1 = np.asarray(people1, dtype=np.int64).ravel()
+        people2 = np.asarray(people2, dtype=np.int64).ravel()
+
+        low = np.minimum(people1, people2)
+        high = np.maximum(people1, people2)
+        distinct = low != high
+
+        return np.unique(low[distinct] * self.num_people + high[distinct])
+
+    def _bit_positions(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Locate the bits of edge keys in bit-packed storage.
+
+        Args:
+            keys (np.ndarray): Edge keys ``i * num_people + j`` with ``i < j``.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: The row, the byte column and the bit mask of every key.
+        """
+        idxs, jdxs = np.divmod(keys, self.num_people)
+        # np.packbits stores the first column of every byte in its most significant bit
+        return idxs, jdxs >> 3, np.left_shift(1, 7 - (jdxs & 7)).astype(np.uint8)
 
     def add_friendship(self, person1: int, person2: int):
         """
@@ -137,19 +365,41 @@ class FriendshipGraph:
             person1 (int): Index of the first person.
             person2 (int): Index of the second person.
         """
-        self.graph[person1, person2] = 1
-        self.graph[person2, person1] = 1
+        self.add_friendships(np.array([person1]), np.array([person2]))
 
-    def add_friendships(self, people1: np.ndarray, people2: np.ndarray):
+    def add_friendships(self, people1: np.ndarray, people2: np.ndarray) -> int:
         """
         Add friendships between two sets of people.
 
         Args:
             people1 (np.ndarray): Indices of the first set of people.
             people2 (np.ndarray): Indices of the second set of people.
+
+        Returns:
+            int: The number of friendships that did not exist before.
         """
-        self.graph[people1, people2] = 1
-        self.graph[people2, people1] = 1
+        keys = self._to_edge_keys(people1, people2)
+
+        if self.storage == "dense":
+            idxs, jdxs = np.divmod(keys, self.num_people)
+            new_keys = keys[self.graph[idxs, jdxs] == 0]
+            self.graph[idxs, jdxs] = 1
+            self.graph[jdxs, idxs] = 1
+            if len(new_keys):
+                self._dense_edges = None
+        elif self.storage == "packed":
+            rows, columns, masks = self._bit_positions(keys)
+            new_keys = keys[(self._bits[rows, columns] & masks) == 0]
+            # Several keys can share a byte, so the bits are set unbuffered
+            np.bitwise_or.at(self._bits, (rows, columns), masks)
+        else:
+            new_keys = keys[~np.isin(keys, self._edge_keys, assume_unique=True)]
+            self._edge_keys = np.insert(self._edge_keys, np.searchsorted(self._edge_keys, new_keys), new_keys)
+
+        if self.statistics is not None:
+            self.statistics.add_edges(*np.divmod(new_keys, self.num_people))
+
+        return len(new_keys)
 
     def remove_friendship(self, person1: int, person2: int):
         """
@@ -159,76 +409,210 @@ class FriendshipGraph:
             person1 (int): Index of the first person.
             person2 (int): Index of the second person.
         """
-        self.graph[person1, person2] = 0
-        self.graph[person2, person1] = 0
+        self.remove_friendships(np.array([person1]), np.array([person2]))
 
-    def remove_friendships(self, people1: np.ndarray, people2: np.ndarray):
+    def remove_friendships(self, people1: np.ndarray, people2: np.ndarray) -> int:
         """
         Remove friendships between two sets of people.
 
         Args:
             people1 (np.ndarray): Indices of the first set of people.
             people2 (np.ndarray): Indices of the second set of people.
+
+        Returns:
+            int: The number of friendships that existed and were removed.
         """
-        self.graph[people1, people2] = 0
-        self.graph[people2, people1] = 0
+        keys = self._to_edge_keys(people1, people2)
+
+        if self.storage == "dense":
+            idxs, jdxs = np.divmod(keys, self.num_people)
+            removed_keys = keys[self.graph[idxs, jdxs] != 0]
+            self.graph[idxs, jdxs] = 0
+            self.graph[jdxs, idxs] = 0
+            if len(removed_keys):
+                self._dense_edges = None
+        elif self.storage == "packed":
+            rows, columns, masks = self._bit_positions(keys)
+            removed_keys = keys[(self._bits[rows, columns] & masks) != 0]
+            np.bitwise_and.at(self._bits, (rows, columns), ~masks)
+        else:
+            removed = np.isin(self._edge_keys, keys, assume_unique=True)
+            removed_keys = self._edge_keys[removed]
+            self._edge_keys = self._edge_keys[~removed]
+
+        if self.statistics is not None:
+            self.statistics.remove_edges(*np.divmod(removed_keys, self.num_people))
+
+        return len(removed_keys)
 
     def get_friendships(self) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Get the adjacency matrix of the friendship graph.
+        Get the friendships as an edge list.
+
+        With dense storage, the edge list is cached until the next add or remove call that changes
+        the graph, so reading it several times per step scans the matrix only once.
 
         Returns:
-            np.ndarray: The adjacency matrix of the friendship graph.
+            Tuple[np.ndarray, np.ndarray]: Indices ``(i, j)`` of every friendship, with ``i < j``.
         """
-
-        idxs, jdxs = np.where(np.triu(self.graph, k=1) == 1)
-
-        return idxs, jdxs
-
-    def add_random_friendships(self, people: People):
+        if self.storage == "dense":
+            if self._dense_edges is None:
+                # The matrix is symmetric, the upper triangle is picked from its nonzeros without an N x N copy
+                idxs, jdxs = np.nonzero(self.graph)
+                upper = idxs < jdxs
+                self._dense_edges = idxs[upper], jdxs[upper]
+            idxs, jdxs = self._dense_edges
+            return idxs.copy(), jdxs.copy()
+
+        if self.storage == "packed":
+            # Only the upper triangle is stored, unpack it in blocks of rows to bound the memory
+            block_rows = max(1, MAX_UNPACKED_ELEMENTS // max(self.num_people, 1))
+            idxs, jdxs = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+            for start in range(0, self.num_people, block_rows):
+                rows = np.unpackbits(self._bits[start:start + block_rows], axis=1, count=self.num_people)
+                block_idxs, block_jdxs = np.nonzero(rows)
+                idxs.append(block_idxs + start)
+                jdxs.append(block_jdxs)
+            return np.concatenate(idxs), np.concatenate(jdxs)
+
+        return np.divmod(self._edge_keys, self.num_people)
+
+    @property
+    def num_friendships(self) -> int:
+        """The number of friendships in the graph."""
+        if self.statistics is not None:
+            return self.statistics.num_edges
+
+        if self.storage == "dense":
+            if self._dense_edges is not None:
+                return len(self._dense_edges[0])
+            # Symmetric with an empty diagonal, so every friendship is counted twice
+            return int(np.count_nonzero(self.graph)) // 2
+
+        if self.storage == "packed":
+            # Counted in blocks, so that the per-byte counts never take much memory
+            block_rows = max(1, MAX_COUNTED_BYTES // max(self._bits.shape[1], 1))
+            return sum(count_set_bits(self._bits[start:start + block_rows]) for start in range(0, self.num_people, block_rows))
+
+        return len(self._edge_keys)
+
+    def add_random_friendships(self, people: People, geometry: Optional[PairGeometry] = None) -> int:
         """
         Add random friendships based on the distance between people.
 
+        Without a cutoff radius every pair is considered. With ``tile_elements`` set, this is done in
+        blocks of rows (see `_tiled_establishment`), which selects the same pairs from the same
+        random stream without any N x N temporaries.
+
         Args:
             people (People): Instance of the People class.
+            geometry (Optional[PairGeometry]): Distances of the current step, shared with the breaking pass.
+
+        Returns:
+            int: The number of friendships added.
         """
+        if geometry is None:
+            geometry = PairGeometry(people.x, people.y)
+
+        if self.cutoff_radius is not None:
+            # Only pairs inside the cutoff radius have a non-negligible chance of becoming friends
+            idxs, jdxs, distance = geometry.neighbour_pairs(self.cutoff_radius)
+
+            p = self.establishment_prob(distance)
+            rand = self.rng.rand(len(distance))
+
+            selected = rand < p
+            return self.add_friendships(idxs[selected], jdxs[selected])
 
-        x_diff = people.x.reshape(-1, 1) - people.x.reshape(1, -1)
-        y_diff = people.y.reshape(-1, 1) - people.y.reshape(1, -1)
+        if self.tile_elements is not None:
+            return self.add_friendships(*self._tiled_establishment(people))
 
-        distance_matrix = np.sqrt(x_diff ** 2 + y_diff ** 2)
+        distance_matrix = geometry.distance_matrix()
 
         p = self.establishment_prob(distance_matrix)
-        rand = np.random.rand(people.num_people, people.num_people)
+        rand = self.rng.rand(people.num_people, people.num_people)
 
         xs, ys = np.where(np.triu(rand < p, k=1))
 
-        self.add_friendships(xs, ys)
-                                
+        return self.add_friendships(xs, ys)
 
-    def remove_random_friendships(self, people: People):
+    def _tiled_establishment(self, people: People) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Remove random friendships based on the distance between people.
+        Draw the all-pairs establishment pass block of rows by block of rows.
+
+        The random numbers of a block are its rows of the ``rand(N, N)`` matrix of the untiled pass,
+        drawn in the same order, and the distances are computed with the same operations, so both
+        select the same pairs. Distances are computed in place in contiguous scratch buffers that are
+        reused for every block, and only the columns right of the diagonal are evaluated. Apart from the
+        selected pairs, the memory used does not depend on the number of people.
 
         Args:
             people (People): Instance of the People class.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Indices ``(i, j)`` with ``i < j`` of the selected pairs.
         """
+        num_people = people.num_people
+        x, y = people.x, people.y
+        block_rows = max(1, self.tile_elements // max(num_people, 1))
+
+        x_buffer = np.empty(block_rows * num_people, dtype=x.dtype)
+        y_buffer = np.empty(block_rows * num_people, dtype=y.dtype)
+
+        idxs, jdxs = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+        for start in range(0, num_people, block_rows):
+            stop = min(start + block_rows, num_people)
+            rand = self.rng.rand(stop - start, num_people)
+
+            # Only pairs with j > i are used, so the columns start right of the diagonal of the first row
+            rows, columns = slice(start, stop), slice(start + 1, num_people)
+            shape = (stop - start, num_people - start - 1)
+            dx = x_buffer[:shape[0] * shape[1]].reshape(shape)
+            dy = y_buffer[:shape[0] * shape[1]].reshape(shape)
+
+            np.subtract(x[rows, None], x[None, columns], out=dx)
+            np.subtract(y[rows, None], y[None, columns], out=dy)
+            np.multiply(dx, dx, out=dx)
+            np.multiply(dy, dy, out=dy)
+            np.add(dx, dy, out=dx)
+            np.sqrt(dx, out=dx)
+
+            block_idxs, block_jdxs = np.nonzero(rand[:, columns] < self.establishment_prob(dx))
+            block_idxs += start
+            block_jdxs += start + 1
+
+            above_diagonal = block_jdxs > block_idxs
+            idxs.append(block_idxs[above_diagonal])
+            jdxs.append(block_jdxs[above_diagonal])
+
+        return np.concatenate(idxs), np.concatenate(jdxs)
+
+    def remove_random_friendships(self, people: People, geometry: Optional[PairGeometry] = None) -> int:
+        """
+        Remove random friendships based on the distance between friends.
 
-        x_diff = people.x.reshape(-1, 1) - people.x.reshape(1, -1)
-        y_diff = people.y.reshape(-1, 1) - people.y.reshape(1, -1)
+        Only existing friendships are evaluated, with one random draw per friendship.
 
-        distance_matrix = np.sqrt(x_diff ** 2 + y_diff ** 2)
+        Args:
+            people (People): Instance of the People class.
+            geometry (Optional[PairGeometry]): Distances of the current step, shared with the establishment pass.
 
-        p = self.breaking_prob(distance_matrix)
-        rand = np.random.rand(people.num_people, people.num_people)
+        Returns:
+            int: The number of friendships removed.
+        """
+        if geometry is None:
+            geometry = PairGeometry(people.x, people.y)
 
-        xs, ys = np.where(np.triu(rand < p, k=1))
+        idxs, jdxs = self.get_friendships()
 
-        self.remove_friendships(xs, ys)
+        p = self.breaking_prob(geometry.pair_distances(idxs, jdxs))
+        rand = self.rng.rand(len(idxs))
 
+        selected = rand < p
+        return self.remove_friendships(idxs[selected], jdxs[selected])
 
     def draw_friendships(
-        self, people: People, screen: pygame.Surface, color: tuple, width: int, height: int, linewidth: int = 1
+        self, people: People, screen: "pygame.Surface", color: tuple, width: int, height: int, linewidth: int = 1
     ):
         """
         Draw the friendships on a Pygame screen.
@@ -241,9 +625,9 @@ class FriendshipGraph:
             height (int): Height of the screen.
             linewidth (int): Width of the lines. Default is 1.
         """
-        for i in range(people.num_people):
-            for j in range(i):
-                if self.graph[i, j] == 1:
-                    point1 = int(people.x[i] * width), int(people.y[i] * height)
-                    point2 = int(people.x[j] * width), int(people.y[j] * height)
-                    pygame.draw.line(screen, color, point1, point2, linewidth)
+        from src.rendering import draw_segments, screen_coordinates
+
+        px, py = screen_coordinates(people.x, people.y, width, height)
+
+        idxs, jdxs = self.get_friendships()
+        draw_segments(screen, px[idxs], py[idxs], px[jdxs], py[jdxs], color, linewidth)
@@ -0,0 +1,137 @@
+import csv
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.simulation import Simulation, create_simulation
+
+SUMMARY_COLUMNS = ("step", "num_friendships", "mean_degree", "wellbeing_mean", "wellbeing_var")
+
+
+def parameter_grid(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """
+    Expand a parameter grid into the list of all its configurations.
+
+    Args:
+        grid (Dict[str, Sequence[Any]]): Values to try for each `create_simulation` argument.
+
+    Returns:
+        List[Dict[str, Any]]: One configuration per combination of values.
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def summarize(simulation: Simulation) -> Dict[str, float]:
+    """
+    Compute the summary statistics of the current state of a simulation.
+
+    Args:
+        simulation (Simulation): The simulation to summarize.
+
+    Returns:
+        Dict[str, float]: The value of every column of `SUMMARY_COLUMNS`.
+    """
+    num_friendships = simulation.friendship_graph.num_friendships
+    wellbeing = simulation.people.wellbeing
+
+    return {
+        "step": simulation.steps,
+        "num_friendships": num_friendships,
+        "mean_degree": 2 * num_friendships / simulation.people.num_people,
+        "wellbeing_mean": float(np.mean(wellbeing)),
+        "wellbeing_var": float(np.var(wellbeing)),
+    }
+
+
+def run_configuration(config: Dict[str, Any], seed: int, num_steps: int, record_every: int = 1) -> List[Dict[str, float]]:
+    """
+    Run a single configuration headlessly and record its summary time series.
+
+    Args:
+        config (Dict[str, Any]): Arguments for `create_simulation`.
+        seed (int): Seed of the run.
+        num_steps (int): The number of steps to simulate.
+        record_every (int): Record the summary every this many steps. Default is 1.
+
+    Returns:
+        List[Dict[str, float]]: The summary of every recorded step.
+    """
+    simulation = create_simulation(seed=seed, **config)
+
+    series = []
+    for _ in range(num_steps):
+        simulation.step()
+        if simulation.steps % record_every == 0:
+            series.append(summarize(simulation))
+
+    return series
+
+
+def _run_task(task: tuple) -> List[Dict[str, float]]:
+    config, seed, num_steps, record_every = task
+    return run_configuration(config, seed, num_steps, record_every)
+
+
+def run_sweep(
+    grid: Dict[str, Sequence[Any]],
+    num_replicas: int,
+    num_steps: int,
+    max_workers: Optional[int] = None,
+    base_seed: int = 0,
+    record_every: int = 1,
+) -> List[Dict[str, Any]]:
+    """
+    Run every configuration of a parameter grid several times on a pool of worker processes.
+
+    Every run gets its own seed spawned from ``base_seed``, so runs are independent of each other
+    and the whole sweep is reproducible regardless of how runs are scheduled on the workers.
+
+    Args:
+        grid (Dict[str, Sequence[Any]]): Values to try for each `create_simulation` argument.
+        num_replicas (int): The number of runs per configuration.
+        num_steps (int): The number of steps per run.
+        max_workers (Optional[int]): The number of worker processes. Defaults to the number of cores.
+        base_seed (int): Seed from which the seeds of all runs are derived. Default is 0.
+        record_every (int): Record the summary every this many steps. Default is 1.
+
+    Returns:
+        List[Dict[str, Any]]: One row per run and recorded step, holding the configuration,
+            the replica index, the seed of the run and the columns of `SUMMARY_COLUMNS`.
+    """
+    configs = parameter_grid(grid)
+    runs = [(config, replica) for config in configs for replica in range(num_replicas)]
+
+    seed_sequences = np.random.SeedSequence(base_seed).spawn(len(runs))
+    seeds = [int(sequence.generate_state(1)[0]) for sequence in seed_sequences]
+
+    tasks = [(config, seed, num_steps, record_every) for (config, _), seed in zip(runs, seeds)]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(_run_task, tasks))
+
+    rows = []
+    for (config, replica), seed, series in zip(runs, seeds, results):
+        for summary in series:
+            rows.append({**config, "replica": replica, "seed": seed, **summary})
+
+    return rows
+
+
+def write_table(rows: List[Dict[str, Any]], path: str):
+    """
+    Write sweep results to a CSV file.
+
+    Args:
+        rows (List[Dict[str, Any]]): Rows as returned by `run_sweep`.
+        path (str): Path of the CSV file.
+    """
+    if not rows:
+        return
+
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
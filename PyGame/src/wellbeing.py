@@ -0,0 +1,159 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+from src.spatial import PairGeometry
+from src.structures import FriendshipGraph, People
+
+
+def _spread(sources: np.ndarray, targets: np.ndarray, amount: np.ndarray, num_people: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split the amount of every source equally between its outgoing edges.
+
+    This is the sparse matrix-vector product of the row-normalized adjacency (in COO form) with
+    ``amount``, computed with `np.bincount`.
+
+    Args:
+        sources (np.ndarray): Source of every directed edge.
+        targets (np.ndarray): Target of every directed edge.
+        amount (np.ndarray): The amount every person spreads.
+        num_people (int): The number of people.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The amount every person receives, and the part of ``amount``
+            that could not be spread because its source has no outgoing edges.
+    """
+    out_degree = np.bincount(sources, minlength=num_people)
+    per_edge = amount / np.maximum(out_degree, 1)
+
+    received = np.bincount(targets, weights=per_edge[sources], minlength=num_people)
+    unspent = np.where(out_degree == 0, amount, 0.0)
+
+    return received, unspent
+
+
+def reach_edges(idxs: np.ndarray, jdxs: np.ndarray, distance: np.ndarray, reach: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get who reaches whom among pairs of people.
+
+    Args:
+        idxs (np.ndarray): First person of every pair.
+        jdxs (np.ndarray): Second person of every pair.
+        distance (np.ndarray): Distance of every pair.
+        reach (np.ndarray): Influence reach of every person.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Source and target of every directed influence edge.
+    """
+    forward = distance <= reach[idxs]
+    backward = distance <= reach[jdxs]
+
+    return np.concatenate((idxs[forward], jdxs[backward])), np.concatenate((jdxs[forward], idxs[backward]))
+
+
+class WellbeingDynamics:
+    """The wellbeing stage of a simulation step.
+
+    Every step, each person produces ``production_rate * wpc * time_step`` wellbeing. They keep the
+    share ``sfc`` of it and give the rest away: ``friend_share`` of it is split equally between
+    their friends, the remainder equally between the people within their influence reach
+    ``irc * influence_radius``. Whatever cannot be given away (no friends, nobody in reach) is
+    kept. Existing wellbeing decays at ``decay`` per unit of time.
+
+    Everything is computed from edge lists with `np.bincount`, so a step costs O(N + E) in the
+    number of friendships and of people within reach, and never touches an N x N matrix.
+
+    Attributes:
+        production_rate (float): Wellbeing produced per unit of time by a person with ``wpc = 1``.
+        friend_share (float): Share of the given away wellbeing that goes to friends.
+        influence_radius (float): Influence reach of a person with ``irc = 1``.
+        decay (float): Decay rate of wellbeing per unit of time.
+    """
+
+    def __init__(self, production_rate: float = 1.0, friend_share: float = 0.5, influence_radius: float = 0.05, decay: float = 0.1):
+        """
+        Initialize the wellbeing dynamics.
+
+        Args:
+            production_rate (float): Wellbeing produced per unit of time by a person with ``wpc = 1``. Default is 1.
+            friend_share (float): Share of the given away wellbeing that goes to friends. Default is 0.5.
+            influence_radius (float): Influence reach of a person with ``irc = 1``. Default is 0.05.
+            decay (float): Decay rate of wellbeing per unit of time. Default is 0.1.
+        """
+        self.production_rate = production_rate
+        self.friend_share = friend_share
+        self.influence_radius = influence_radius
+        self.decay = decay
+
+    def influence_edges(self, people: People, geometry: Optional[PairGeometry] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get who reaches whom with their influence.
+
+        Args:
+            people (People): The people.
+            geometry (Optional[PairGeometry]): Pair geometry of the current positions, if already built.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Source and target of every directed influence edge.
+        """
+        if geometry is None:
+            geometry = PairGeometry(people.x, people.y)
+
+        idxs, jdxs, distance = geometry.neighbour_pairs(self.influence_radius)
+        return reach_edges(idxs, jdxs, distance, people.irc * self.influence_radius)
+
+    def advance(
+        self,
+        wellbeing: np.ndarray,
+        wpc: np.ndarray,
+        sfc: np.ndarray,
+        friend_idxs: np.ndarray,
+        friend_jdxs: np.ndarray,
+        sources: np.ndarray,
+        targets: np.ndarray,
+        time_step: float,
+    ) -> np.ndarray:
+        """
+        Compute the wellbeing after one step from the friendships and influence edges as edge lists.
+
+        Args:
+            wellbeing (np.ndarray): The current wellbeing of every person.
+            wpc (np.ndarray): The wellbeing production coefficient of every person.
+            sfc (np.ndarray): The selfishness coefficient of every person.
+            friend_idxs (np.ndarray): First person of every friendship.
+            friend_jdxs (np.ndarray): Second person of every friendship.
+            sources (np.ndarray): Source of every directed influence edge.
+            targets (np.ndarray): Target of every directed influence edge.
+            time_step (float): Simulation time advanced by the step.
+
+        Returns:
+            np.ndarray: The new wellbeing of every person.
+        """
+        num_people = len(wellbeing)
+
+        produced = self.production_rate * wpc * time_step
+        given = (1 - sfc) * produced
+        kept = produced - given
+
+        from_friends, unspent_friends = _spread(
+            np.concatenate((friend_idxs, friend_jdxs)), np.concatenate((friend_jdxs, friend_idxs)), self.friend_share * given, num_people
+        )
+        from_reach, unspent_reach = _spread(sources, targets, (1 - self.friend_share) * given, num_people)
+
+        return wellbeing * (1 - self.decay * time_step) + kept + unspent_friends + unspent_reach + from_friends + from_reach
+
+    def update(self, people: People, friendship_graph: FriendshipGraph, time_step: float, geometry: Optional[PairGeometry] = None):
+        """
+        Advance the wellbeing of the people by one step.
+
+        Args:
+            people (People): The people.
+            friendship_graph (FriendshipGraph): The friendships between the people.
+            time_step (float): Simulation time advanced by the step.
+            geometry (Optional[PairGeometry]): Pair geometry of the current positions, if already built.
+        """
+        idxs, jdxs = friendship_graph.get_friendships()
+        sources, targets = self.influence_edges(people, geometry)
+
+        wellbeing = self.advance(people.wellbeing, people.wpc, people.sfc, idxs, jdxs, sources, targets, time_step)
+        people.wellbeing = wellbeing.astype(people.wellbeing.dtype, copy=False)
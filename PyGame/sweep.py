@@ -0,0 +1,47 @@
+import argparse
+import time
+
+from src.sweep import parameter_grid, run_sweep, write_table
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run a headless parameter sweep of the wellbeing simulation.")
+    parser.add_argument("--num-people", type=int, nargs="+", default=[200])
+    parser.add_argument("--friend-attractiveness", type=float, nargs="+", default=[1.0e-3])
+    parser.add_argument("--establishment-equ-prob-dist", type=float, nargs="+", default=[0.01])
+    parser.add_argument("--break-equ-prob-dist", type=float, nargs="+", default=[1.414 * 0.75])
+    parser.add_argument("--replicas", type=int, default=4, help="Number of runs per configuration.")
+    parser.add_argument("--steps", type=int, default=500, help="Number of steps per run.")
+    parser.add_argument("--record-every", type=int, default=10, help="Record the summary every this many steps.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes.")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed of the sweep.")
+    parser.add_argument("--output", default="sweep.csv", help="Path of the CSV table to write.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+
+    args = parse_args()
+
+    grid = {
+        "num_people": args.num_people,
+        "friend_attractiveness": args.friend_attractiveness,
+        "establishment_equ_prob_dist": args.establishment_equ_prob_dist,
+        "break_equ_prob_dist": args.break_equ_prob_dist,
+    }
+
+    start = time.perf_counter()
+    rows = run_sweep(
+        grid,
+        num_replicas=args.replicas,
+        num_steps=args.steps,
+        max_workers=args.workers,
+        base_seed=args.seed,
+        record_every=args.record_every,
+    )
+    elapsed = time.perf_counter() - start
+
+    write_table(rows, args.output)
+
+    num_runs = len(parameter_grid(grid)) * args.replicas
+    print(f"Ran {num_runs} runs of {args.steps} steps in {elapsed:.2f}s, wrote {len(rows)} rows to {args.output}")
@@ -0,0 +1,78 @@
+import unittest
+
+import numpy as np
+
+from src.batched import BatchedSimulation
+from src.simulation import create_simulation
+
+
+class TestBatchedSimulation(unittest.TestCase):
+    def test_replicas_do_not_depend_on_the_batch(self):
+        batched = BatchedSimulation([11, 12, 13], num_people=30, establishment_equ_prob_dist=0.05)
+        alone = BatchedSimulation([12], num_people=30, establishment_equ_prob_dist=0.05)
+        batched.run(15)
+        alone.run(15)
+
+        np.testing.assert_array_equal(batched.people.x[1], alone.people.x[0])
+        np.testing.assert_array_equal(batched.people.y[1], alone.people.y[0])
+        np.testing.assert_array_equal(batched.people.wellbeing[1], alone.people.wellbeing[0])
+        for batched_edges, alone_edges in zip(batched.replica_friendships(1), alone.replica_friendships(0)):
+            np.testing.assert_array_equal(batched_edges, alone_edges)
+
+        self.assertGreater(batched.friendship_graph.num_friendships.sum(), 0)
+        self.assertTrue(np.all(batched.people.wellbeing > 0))
+
+    def test_replicas_follow_the_single_engine(self):
+        # Without attraction, friendships do not move anybody, so the positions stay identical
+        seeds = list(range(10))
+        batched = BatchedSimulation(seeds, num_people=30, friend_attractiveness=0.0, establishment_equ_prob_dist=0.1)
+        singles = [
+            create_simulation(num_people=30, friend_attractiveness=0.0, establishment_equ_prob_dist=0.1, seed=seed)
+            for seed in seeds
+        ]
+
+        batched_counts, single_counts = [], []
+        for _ in range(150):
+            batched.step()
+            batched_counts.append(batched.friendship_graph.num_friendships)
+            for single in singles:
+                single.step()
+            single_counts.append([single.friendship_graph.num_friendships for single in singles])
+
+        for replica, single in enumerate(singles):
+            np.testing.assert_array_equal(batched.people.x[replica], single.people.x)
+            np.testing.assert_array_equal(batched.people.y[replica], single.people.y)
+            np.testing.assert_array_equal(batched.people.colors[replica], single.people.colors)
+
+        # The random streams differ, the expected number of friendships does not
+        self.assertAlmostEqual(np.mean(batched_counts) / np.mean(single_counts), 1.0, delta=0.05)
+
+    def test_wellbeing_matches_the_single_engine(self):
+        seeds = [11, 12, 13]
+        batched = BatchedSimulation(seeds, num_people=30, friend_attractiveness=0.0, establishment_equ_prob_dist=0.05)
+        batched.run(15)
+
+        graph = batched.friendship_graph
+        replicas, idxs, jdxs = graph.get_friendships()
+        x, y = batched.people.x, batched.people.y
+        distance = np.hypot(x[:, graph.pair_idxs] - x[:, graph.pair_jdxs], y[:, graph.pair_idxs] - y[:, graph.pair_jdxs])
+
+        singles = []
+        for replica, seed in enumerate(seeds):
+            single = create_simulation(num_people=30, friend_attractiveness=0.0, establishment_equ_prob_dist=0.05, seed=seed)
+            single.run(15)
+            # Continue from the state of the replica
+            single.people.wellbeing = batched.people.wellbeing[replica].copy()
+            single.friendship_graph.remove_friendships(*single.friendship_graph.get_friendships())
+            single.friendship_graph.add_friendships(idxs[replicas == replica], jdxs[replicas == replica])
+            single.wellbeing_dynamics.update(single.people, single.friendship_graph, single.time_step)
+            singles.append(single)
+
+        batched.people.update_wellbeing(graph, distance, batched.wellbeing_dynamics, batched.time_step)
+
+        for replica, single in enumerate(singles):
+            np.testing.assert_allclose(batched.people.wellbeing[replica], single.people.wellbeing, rtol=1.0e-12, atol=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+import numpy as np
+
+from src.benchmark import benchmark_cases, benchmark_simulation, find_regressions, run_benchmarks, scaling_exponents
+
+
+class TestBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.rows = run_benchmarks(sizes=(50, 100), storages=("sparse",), cases=("random_move", "draw_people"), repeat=2)
+
+    def test_rows_cover_every_case_and_size(self):
+        self.assertEqual({(row["case"], row["num_people"]) for row in self.rows}, {
+            ("random_move", 50), ("random_move", 100), ("draw_people", 50), ("draw_people", 100)
+        })
+        for row in self.rows:
+            self.assertIsNone(row["error"])
+            self.assertGreater(row["seconds"], 0)
+            self.assertGreaterEqual(row["median_seconds"], row["seconds"])
+
+        self.assertEqual(set(scaling_exponents(self.rows)), {("random_move", "sparse"), ("draw_people", "sparse")})
+
+    def test_regressions_against_baseline(self):
+        row = self.rows[0]
+        key = f"{row['case']}/{row['storage']}/{row['num_people']}"
+
+        fast = {key: {"seconds": row["seconds"] / 10, "peak_bytes": row["peak_bytes"]}}
+        slow = {key: {"seconds": row["seconds"] * 10, "peak_bytes": row["peak_bytes"]}}
+
+        self.assertEqual(len(find_regressions(self.rows, fast, min_seconds=0)), 1)
+        self.assertEqual(find_regressions(self.rows, slow, min_seconds=0), [])
+        self.assertEqual(find_regressions(self.rows, {}), [])
+
+        failed = [dict(row, seconds=None, peak_bytes=None, error="ValueError: broken")]
+        self.assertEqual(len(find_regressions(failed, slow)), 1)
+
+    def test_cases_start_from_the_same_state(self):
+        simulation = benchmark_simulation(100, "sparse")
+        people, graph = simulation.people, simulation.friendship_graph
+        before = (people.x.copy(), people.y.copy(), people.wellbeing.copy(), *graph.get_friendships())
+        t = simulation.t
+
+        cases = benchmark_cases(simulation)
+        for name, case in cases.items():
+            for _ in range(2):
+                case.setup()
+                after = (people.x, people.y, people.wellbeing, *graph.get_friendships())
+                for array, expected in zip(after, before):
+                    np.testing.assert_array_equal(array, expected)
+                self.assertEqual(simulation.t, t)
+                case()
+
+        # Restoring the random states and the noise buffer makes a step repeatable
+        steps = []
+        for _ in range(2):
+            cases["step"].setup()
+            cases["step"]()
+            steps.append((people.x.copy(), *graph.get_friendships()))
+        for first, second in zip(*steps):
+            np.testing.assert_array_equal(first, second)
+
+    def test_parallel_step_case(self):
+        rows = run_benchmarks(sizes=(600,), storages=("sparse",), cases=("step", "parallel_step_2"), repeat=1, workers=(2,))
+        self.assertEqual([row["case"] for row in rows], ["step", "parallel_step_2"])
+        for row in rows:
+            self.assertIsNone(row["error"])
+            self.assertGreater(row["seconds"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
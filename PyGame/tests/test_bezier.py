@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+
+from src.bezier import ArcLengthTable, bezier_lengths, bezier_points
+
+
+def chord_lengths(control_points, num_samples=20001):
+    points = bezier_points(control_points, np.linspace(0, 1, num_samples))
+    return np.linalg.norm(np.diff(points, axis=1), axis=-1).sum(axis=1)
+
+
+class TestBezierLengths(unittest.TestCase):
+    def test_straight_line(self):
+        # Unevenly spaced control points on a line, so the speed is not constant
+        control_points = np.array([[[0.0, 0.0], [0.06, 0.08], [0.12, 0.16], [0.6, 0.8]]])
+        np.testing.assert_allclose(bezier_lengths(control_points), [1.0])
+        np.testing.assert_allclose(bezier_lengths(control_points, 0.0, 0.5), [np.linalg.norm(bezier_points(control_points, 0.5))])
+
+    def test_empty_batch(self):
+        control_points = np.zeros((0, 4, 2))
+        self.assertEqual(bezier_lengths(control_points).shape, (0,))
+        self.assertEqual(ArcLengthTable(control_points).total.shape, (0,))
+
+    def test_matches_fine_chord_sums(self):
+        control_points = np.random.RandomState(0).rand(200, 4, 2)
+        lengths = bezier_lengths(control_points)
+        reference = chord_lengths(control_points)
+
+        self.assertEqual(lengths.shape, (200,))
+        self.assertLess(np.median(np.abs(lengths - reference) / reference), 1e-6)
+        np.testing.assert_allclose(lengths, reference, rtol=1e-2)
+
+
+class TestArcLengthTable(unittest.TestCase):
+    def test_total_and_ends(self):
+        control_points = np.random.RandomState(1).rand(50, 4, 2)
+        table = ArcLengthTable(control_points)
+
+        np.testing.assert_allclose(table.total, chord_lengths(control_points), rtol=1e-3)
+        np.testing.assert_allclose(table.points_at(np.zeros(50)), control_points[:, 0])
+        np.testing.assert_allclose(table.points_at(2 * table.total), control_points[:, 3])
+
+    def test_parameters_at_inverts_the_arc_length(self):
+        rng = np.random.RandomState(2)
+        control_points = rng.rand(100, 4, 2)
+        table = ArcLengthTable(control_points)
+
+        distance = rng.rand(100, 3) * table.total[:, None]
+        t = table.parameters_at(distance)
+        self.assertEqual(t.shape, (100, 3))
+
+        lengths = bezier_lengths(np.repeat(control_points, 3, axis=0), 0.0, t.ravel(), segments=16)
+        self.assertLess(np.median(np.abs(lengths - distance.ravel())), 1e-6)
+
+    def test_constant_speed_on_a_line(self):
+        control_points = np.array([[[0.0, 0.0], [0.06, 0.08], [0.12, 0.16], [0.6, 0.8]], [[0.5, 0.5]] * 4])
+        table = ArcLengthTable(control_points)
+
+        points = table.points_at(np.array([[0.25, 0.5], [0.0, 0.0]]))
+        np.testing.assert_allclose(points[0], [[0.15, 0.2], [0.3, 0.4]], atol=1e-9)
+        np.testing.assert_allclose(points[1], [[0.5, 0.5], [0.5, 0.5]])
+
+
+if __name__ == "__main__":
+    unittest.main()
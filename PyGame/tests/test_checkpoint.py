@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.checkpoint import fork_checkpoint, load_checkpoint, save_checkpoint
+from src.simulation import create_simulation
+
+
+def _state(simulation):
+    idxs, jdxs = simulation.friendship_graph.get_friendships()
+    people = simulation.people
+    return people.x, people.y, people.wellbeing, idxs, jdxs
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "checkpoint.npz")
+
+    def assert_same_state(self, simulation1, simulation2):
+        for array1, array2 in zip(_state(simulation1), _state(simulation2)):
+            np.testing.assert_array_equal(array1, array2)
+        self.assertEqual(simulation1.t, simulation2.t)
+        self.assertEqual(simulation1.steps, simulation2.steps)
+
+    def test_restored_simulation_continues_identically(self):
+        for storage in ("dense", "sparse", "packed"):
+            with self.subTest(storage=storage):
+                simulation = create_simulation(num_people=60, establishment_equ_prob_dist=0.1, storage=storage, seed=3)
+                simulation.run(20)
+                save_checkpoint(simulation, self.path)
+                simulation.run(20)
+
+                restored = load_checkpoint(self.path)
+                self.assertEqual(restored.steps, 20)
+                restored.run(20)
+
+                self.assert_same_state(simulation, restored)
+
+    def test_global_random_states_are_restored(self):
+        simulation = create_simulation(num_people=40, establishment_equ_prob_dist=0.1, precision="single", track_statistics=True)
+        simulation.run(5)
+        save_checkpoint(simulation, self.path)
+        simulation.run(10)
+
+        np.random.seed(123)
+        restored = load_checkpoint(self.path)
+        restored.run(10)
+
+        self.assert_same_state(simulation, restored)
+        self.assertEqual(restored.people.x.dtype, np.float32)
+        self.assertEqual(restored.friendship_graph.num_friendships, simulation.friendship_graph.num_friendships)
+
+    def test_fork_branches_share_the_start_and_diverge(self):
+        simulation = create_simulation(num_people=60, establishment_equ_prob_dist=0.1, seed=0)
+        simulation.run(10)
+        save_checkpoint(simulation, self.path)
+
+        branches = fork_checkpoint(self.path, seeds=[1, 2], break_equ_prob_dist=0.5)
+        self.assertEqual(branches[0].friendship_graph.break_equ_prob_dist, 0.5)
+        self.assert_same_state(branches[0], branches[1])
+
+        for branch in branches:
+            branch.run(10)
+        edges = [set(zip(*branch.friendship_graph.get_friendships())) for branch in branches]
+        self.assertNotEqual(edges[0], edges[1])
+
+        with self.assertRaises(ValueError):
+            load_checkpoint(self.path, num_people=10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+
+import numpy as np
+
+from src.events import FriendshipEvents, event_rates
+from src.simulation import create_simulation
+
+
+def frozen_simulation(event_driven, seed=4):
+    simulation = create_simulation(
+        num_people=60, friend_attractiveness=0.0, establishment_equ_prob_dist=0.05, seed=seed, event_driven=event_driven
+    )
+    simulation.wellbeing_dynamics = None
+    simulation.people.speed_coefficient[:] = 0
+    return simulation
+
+
+class TestEventRates(unittest.TestCase):
+    def test_rates_match_the_per_step_chain(self):
+        establishment_prob = np.array([0.0, 0.01, 0.3, 0.5])
+        breaking_prob = np.array([0.0, 0.2, 0.1, 0.5])
+        establishment_rate, breaking_rate = event_rates(establishment_prob, breaking_prob)
+
+        stay = (1 - establishment_prob) * (1 - breaking_prob)
+        share = np.divide(establishment_prob * (1 - breaking_prob), 1 - stay, out=np.zeros(4), where=stay < 1)
+
+        np.testing.assert_allclose(establishment_rate + breaking_rate, -np.log(stay))
+        np.testing.assert_allclose(establishment_rate[1:] / (establishment_rate + breaking_rate)[1:], share[1:])
+        self.assertEqual(establishment_rate[0], 0.0)
+
+
+class TestFriendshipEvents(unittest.TestCase):
+    def test_stationary_edge_count_matches_the_per_step_model(self):
+        simulation = frozen_simulation(event_driven=True)
+        self.assertIsInstance(simulation.friendship_events, FriendshipEvents)
+
+        people, graph = simulation.people, simulation.friendship_graph
+        idxs, jdxs = np.triu_indices(people.num_people, k=1)
+        distance = np.hypot(people.x[idxs] - people.x[jdxs], people.y[idxs] - people.y[jdxs])
+        establishment_prob, breaking_prob = graph.establishment_prob(distance), graph.breaking_prob(distance)
+        share = establishment_prob * (1 - breaking_prob) / (1 - (1 - establishment_prob) * (1 - breaking_prob))
+
+        simulation.run(100)
+        counts = []
+        for _ in range(1500):
+            simulation.step()
+            counts.append(graph.num_friendships)
+
+        # Every pair flips independently, so the edge count has variance sum(share * (1 - share))
+        standard_error = np.sqrt(np.sum(share * (1 - share)) / 100)
+        self.assertLess(abs(np.mean(counts) - np.sum(share)), 5 * standard_error)
+        self.assertAlmostEqual(np.var(counts) / np.sum(share * (1 - share)), 1.0, delta=0.3)
+
+    def test_incremental_rates_match_a_rebuild(self):
+        # Everybody moving, and only a few people moving
+        for num_moving in (40, 2):
+            simulation = create_simulation(
+                num_people=40, friend_attractiveness=0.0, establishment_equ_prob_dist=0.05, seed=5, event_driven=True
+            )
+            simulation.people.speed_coefficient[num_moving:] = 0
+            events = simulation.friendship_events
+            events.refresh_distance = 0.0
+            simulation.run(30)
+            self.assertGreater(events.num_events, 0)
+
+            rebuilt = FriendshipEvents(simulation.friendship_graph)
+            rebuilt._refresh(simulation.people)
+            np.testing.assert_array_equal(events._is_friend, rebuilt._is_friend)
+            np.testing.assert_allclose(events._rates, rebuilt._rates, rtol=1e-12)
+            np.testing.assert_allclose(events._block_totals, rebuilt._block_totals, rtol=1e-9)
+
+    def test_quiet_periods_cost_no_draws(self):
+        simulation = create_simulation(num_people=30, establishment_equ_prob_dist=1.0e-6, seed=0, event_driven=True)
+        simulation.run(50)
+        self.assertEqual(simulation.friendship_events.num_events, simulation.friendship_graph.num_friendships)
+
+        state = simulation.friendship_graph.rng.get_state()[1].copy()
+        simulation.people.speed_coefficient[:] = 0
+        simulation.run(50)
+        self.assertEqual(simulation.friendship_events.num_events, simulation.friendship_graph.num_friendships)
+        np.testing.assert_array_equal(simulation.friendship_graph.rng.get_state()[1], state)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,13 @@
 import math
 import unittest
 
+import numpy as np
+
 from src.functions import (
     MAXIMUM_DISTANCE,
     alternative_friendship_breaking_probability,
+    breaking_curve_constants,
+    establishment_cutoff_distance,
     friendship_breaking_probability,
     friendship_establishment_probability,
 )
@@ -38,6 +42,56 @@ class TestFriendshipProbabilities(unittest.TestCase):
             float(prob_func(MAXIMUM_DISTANCE - self.equ_prob_dist)), 0.5, places=6
         )
 
+    def test_establishment_cutoff_distance(self):
+        num_people, tolerance = 1000, 1.0e-3
+        cutoff = establishment_cutoff_distance(0.01, num_people, tolerance)
+
+        lam = -math.log(0.5) / 0.01
+        missed = num_people * 2 * math.pi * math.exp(-lam * cutoff) * (cutoff / lam + 1 / lam**2)
+        self.assertAlmostEqual(missed, tolerance, places=9)
+        self.assertLess(cutoff, self.max_distance)
+
+        self.assertEqual(establishment_cutoff_distance(1.0, num_people, tolerance), self.max_distance)
+
+    def test_tabulated_probabilities_match_analytic_forms(self):
+        distances = np.linspace(0, self.max_distance, 10007)
+        for factory, equ_prob_dist in [
+            (friendship_establishment_probability, 0.01),
+            (friendship_establishment_probability, self.equ_prob_dist),
+            (friendship_breaking_probability, MAXIMUM_DISTANCE - self.equ_prob_dist),
+            (friendship_breaking_probability, 1.414 * 0.75),
+        ]:
+            analytic = factory(equ_prob_dist)
+            for table_size in (256, 4096):
+                tabulated = factory(equ_prob_dist, table_size=table_size)
+                error = np.max(np.abs(tabulated(distances) - analytic(distances)))
+                self.assertLessEqual(error, tabulated.error_bound)
+
+            self.assertLess(factory(equ_prob_dist, table_size=4096).error_bound, 1.0e-3)
+            self.assertAlmostEqual(float(tabulated(equ_prob_dist)), 0.5, places=3)
+
+    def test_tabulated_probabilities_keep_double_precision(self):
+        analytic = friendship_breaking_probability(1.414 * 0.75)
+        tabulated = friendship_breaking_probability(1.414 * 0.75, table_size=4096)
+
+        distances = np.linspace(0, self.max_distance, 10007)
+        self.assertEqual(tabulated(distances).dtype, np.float64)
+        self.assertLess(np.max(np.abs(tabulated(distances) - analytic(distances))), 1.0e-6)
+
+        # Scalars and integer distances are not narrowed either; at a sample distance the table is exact
+        self.assertEqual(np.asarray(tabulated(0.0)).dtype, np.float64)
+        self.assertEqual(tabulated(np.array([0, 1])).dtype, np.float64)
+        self.assertAlmostEqual(float(tabulated(self.max_distance)), float(analytic(self.max_distance)), places=12)
+
+        self.assertEqual(tabulated(distances.astype(np.float32)).dtype, np.float32)
+
+    def test_breaking_curve_constants_are_memoized(self):
+        breaking_curve_constants.cache_clear()
+        for _ in range(5):
+            friendship_breaking_probability(0.9)
+        info = breaking_curve_constants.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 4))
+
 
 if __name__ == "__main__":
     unittest.main()
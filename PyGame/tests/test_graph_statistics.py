@@ -0,0 +1,49 @@
+import unittest
+
+import numpy as np
+from scipy.sparse.csgraph import connected_components
+
+from src.structures import FriendshipGraph
+
+
+class TestGraphStatistics(unittest.TestCase):
+    def assertMatchesRecount(self, graph: FriendshipGraph):
+        statistics = graph.statistics
+        adjacency = np.zeros((graph.num_people, graph.num_people), dtype=np.int64)
+        idxs, jdxs = graph.get_friendships()
+        adjacency[idxs, jdxs] = adjacency[jdxs, idxs] = 1
+
+        degree = adjacency.sum(axis=1)
+        triangles = np.diag(adjacency @ adjacency @ adjacency) // 2
+
+        np.testing.assert_array_equal(statistics.degree, degree)
+        np.testing.assert_array_equal(statistics.degree_histogram, np.bincount(degree, minlength=graph.num_people))
+        np.testing.assert_array_equal(statistics.triangles, triangles)
+        self.assertEqual(statistics.num_edges, len(idxs))
+        self.assertEqual(statistics.num_triangles, triangles.sum() // 3)
+
+        num_components, labels = statistics.connected_components()
+        expected_components, expected_labels = connected_components(adjacency, directed=False)
+        self.assertEqual(num_components, expected_components)
+        # Same partition, possibly with different labels
+        self.assertEqual(len(set(zip(labels, expected_labels))), expected_components)
+
+    def test_incremental_updates_match_a_recount(self):
+        rng = np.random.RandomState(0)
+        for storage in FriendshipGraph.STORAGE_MODES:
+            graph = FriendshipGraph(25, 0.01, 1.0, storage=storage, track_statistics=True)
+            for _ in range(30):
+                graph.add_friendships(rng.randint(0, 25, 15), rng.randint(0, 25, 15))
+                graph.remove_friendships(rng.randint(0, 25, 10), rng.randint(0, 25, 10))
+                self.assertMatchesRecount(graph)
+
+    def test_clustering_of_a_triangle_with_a_tail(self):
+        graph = FriendshipGraph(4, 0.01, 1.0, track_statistics=True)
+        graph.add_friendships(np.array([0, 1, 0, 2]), np.array([1, 2, 2, 3]))
+
+        np.testing.assert_allclose(graph.statistics.clustering_coefficients(), [1, 1, 1 / 3, 0])
+        self.assertAlmostEqual(graph.statistics.transitivity(), 3 / 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+import opensimplex
+
+from src.noise import NoiseProvider, SimplexNoise
+from src.simulation import create_simulation
+
+
+class TestNoise(unittest.TestCase):
+    def test_simplex_noise_is_bit_identical_to_opensimplex(self):
+        rng = np.random.RandomState(0)
+        for seed in (3, 0, 12345, -7):
+            reference = opensimplex.OpenSimplex(seed)
+            noise = SimplexNoise(seed)
+
+            ids = np.arange(300)
+            ts = np.array([0.0, 0.01, 3.7, -5.3])
+            np.testing.assert_array_equal(noise.noise2array(2 * ids, ts), reference.noise2array(2 * ids, ts))
+
+            x, y = rng.randn(200) * 50, rng.randn(30) * 50
+            np.testing.assert_array_equal(noise.noise2array(x, y), reference.noise2array(x, y))
+
+    def test_provider_serves_per_step_noise(self):
+        noise = SimplexNoise(5)
+        provider = NoiseProvider(20, 0.01, noise=noise, chunk_size=4)
+        ids = np.arange(20)
+
+        t = 0.0
+        for step in range(10):
+            if step == 6:
+                t = 1.5  # an unexpected time refills the buffer
+            dx, dy = provider.displacements(t)
+            np.testing.assert_array_equal(dx, noise.noise2array(2 * ids, np.array([t]))[0])
+            np.testing.assert_array_equal(dy, noise.noise2array(2 * ids + 1, np.array([t]))[0])
+            t += 0.01
+
+    def test_trajectories_do_not_depend_on_the_noise_setup(self):
+        trajectories = []
+        for noise_backend, noise_chunk_size in (("opensimplex", None), ("vectorized", None), ("vectorized", 7)):
+            simulation = create_simulation(
+                num_people=25, seed=4, noise_backend=noise_backend, noise_chunk_size=noise_chunk_size
+            )
+            simulation.run(20)
+            trajectories.append((simulation.people.x, simulation.people.y))
+
+        for x, y in trajectories[1:]:
+            np.testing.assert_array_equal(x, trajectories[0][0])
+            np.testing.assert_array_equal(y, trajectories[0][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
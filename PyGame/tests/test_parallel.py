@@ -0,0 +1,126 @@
+import unittest
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.parallel import ParallelSimulation
+from src.simulation import create_simulation
+
+
+def make_simulation(seed: int, **kwargs):
+    return create_simulation(num_people=600, storage="sparse", cutoff_tolerance=1e-3, seed=seed, **kwargs)
+
+
+class TestParallelSimulation(unittest.TestCase):
+    def test_requires_a_cutoff(self):
+        with self.assertRaises(ValueError):
+            ParallelSimulation(create_simulation(num_people=10, storage="sparse"))
+
+    def test_rejects_event_driven_friendships(self):
+        with self.assertRaises(ValueError):
+            ParallelSimulation(make_simulation(0, event_driven=True))
+
+    def test_movement_matches_single_process(self):
+        single = make_simulation(0, friend_attractiveness=0.0)
+        parallel = make_simulation(0, friend_attractiveness=0.0)
+
+        single.run(20)
+        with ParallelSimulation(parallel, num_workers=3, seed=0) as engine:
+            engine.run(20)
+
+        np.testing.assert_array_equal(parallel.people.x, single.people.x)
+        np.testing.assert_array_equal(parallel.people.y, single.people.y)
+        self.assertEqual(parallel.steps, 20)
+
+    def test_statistics_match_single_process(self):
+        single_counts, parallel_counts = [], []
+        for seed in range(4):
+            single = make_simulation(seed)
+            parallel = make_simulation(seed)
+
+            single.run(40)
+            with ParallelSimulation(parallel, num_workers=2, seed=seed) as engine:
+                engine.run(40)
+
+            single_counts.append(single.friendship_graph.num_friendships)
+            parallel_counts.append(parallel.friendship_graph.num_friendships)
+            np.testing.assert_allclose(np.mean(parallel.people.wellbeing), np.mean(single.people.wellbeing), rtol=1e-6)
+
+        self.assertAlmostEqual(np.mean(parallel_counts) / np.mean(single_counts), 1, delta=0.1)
+
+    def assertWorkersHoldTheGraph(self, engine):
+        # Every friendship is kept by exactly one worker
+        keys = np.sort(np.concatenate(engine._broadcast("friendships")))
+        idxs, jdxs = engine.simulation.friendship_graph.get_friendships()
+        np.testing.assert_array_equal(keys, idxs * engine.simulation.people.num_people + jdxs)
+
+    def test_workers_own_the_friendships_of_their_tiles(self):
+        simulation = make_simulation(1)
+        simulation.run(5)
+        with ParallelSimulation(simulation, num_workers=3, seed=1) as engine:
+            self.assertWorkersHoldTheGraph(engine)
+            for _ in range(10):
+                engine.step()
+                self.assertWorkersHoldTheGraph(engine)
+            self.assertGreater(simulation.friendship_graph.num_friendships, 0)
+
+            # Changes made outside of the engine are handed over on request
+            graph = simulation.friendship_graph
+            graph.remove_friendships(*graph.get_friendships())
+            graph.add_friendships(np.arange(0, 10), np.arange(10, 20))
+            engine.load_friendships()
+            self.assertWorkersHoldTheGraph(engine)
+
+    def test_workers_use_the_probability_table(self):
+        # A table of two samples interpolates linearly, which makes nearby friendships far more likely
+        counts = {}
+        for table_size in (None, 2):
+            single = make_simulation(2, probability_table_size=table_size)
+            parallel = make_simulation(2, probability_table_size=table_size)
+            single.run(10)
+            with ParallelSimulation(parallel, num_workers=2, seed=2) as engine:
+                engine.run(10)
+            counts[table_size] = (single.friendship_graph.num_friendships, parallel.friendship_graph.num_friendships)
+
+        self.assertGreater(counts[2][0], 2 * counts[None][0])
+        for single_count, parallel_count in counts.values():
+            self.assertAlmostEqual(parallel_count / single_count, 1, delta=0.15)
+
+    def assertFreed(self, names):
+        for name in names:
+            with self.assertRaises(FileNotFoundError):
+                shared_memory.SharedMemory(name=name)
+
+    def test_worker_exception_is_reported(self):
+        simulation = make_simulation(0)
+        engine = ParallelSimulation(simulation, num_workers=2, seed=0)
+        names = [array.name for array in engine._arrays.values()]
+
+        with self.assertRaisesRegex(RuntimeError, "Unknown command"):
+            engine._broadcast("unknown")
+        engine.close()
+
+        self.assertFreed(names)
+        self.assertEqual(len(simulation.people.x), 600)
+
+    def test_crashed_worker_closes_the_engine(self):
+        simulation = make_simulation(0)
+        engine = ParallelSimulation(simulation, num_workers=2, seed=0)
+        engine.run(2)
+        names = [array.name for array in engine._arrays.values()]
+
+        engine._processes[1].kill()
+        engine._processes[1].join()
+        with self.assertRaisesRegex(RuntimeError, "worker 1"):
+            engine.step()
+
+        self.assertFreed(names)
+        x = simulation.people.x.copy()
+        engine.close()
+        np.testing.assert_array_equal(simulation.people.x, x)
+        with self.assertRaises(RuntimeError):
+            engine.step()
+
+
+if __name__ == "__main__":
+    unittest.main()
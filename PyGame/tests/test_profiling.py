@@ -0,0 +1,124 @@
+import io
+import json
+import threading
+import time
+import unittest
+
+import numpy as np
+import pygame
+
+from src.profiling import Profiler, RollingSeries
+from src.rendering import PerformanceOverlay, PygameRenderer
+from src.simulation import create_simulation
+
+
+class TestRollingSeries(unittest.TestCase):
+    def test_window_keeps_the_most_recent_samples(self):
+        series = RollingSeries(4)
+        for value in range(6):
+            series.add(value)
+
+        np.testing.assert_array_equal(series.samples, [2, 3, 4, 5])
+        self.assertEqual(series.last, 5)
+        self.assertEqual(series.summary()["max"], 5)
+        self.assertEqual(series.summary()["mean"], 3.5)
+
+
+class TestProfiler(unittest.TestCase):
+    def test_simulation_records_phases_and_counters(self):
+        simulation = create_simulation(num_people=50, seed=0)
+        simulation.run(5)
+
+        summary = simulation.profiler.summary()
+        for phase in ("random_move", "add_random_friendships", "remove_random_friendships"):
+            self.assertEqual(simulation.profiler.timings[phase].total, 5)
+            self.assertGreater(summary["timings"][phase]["max"], 0)
+
+        added = simulation.profiler.counters["friendships_added"].samples
+        removed = simulation.profiler.counters["friendships_removed"].samples
+        self.assertEqual(added.sum() - removed.sum(), simulation.friendship_graph.num_friendships)
+
+        output = io.StringIO()
+        simulation.profiler.dump(output)
+        self.assertEqual(json.loads(output.getvalue()), json.loads(json.dumps(summary)))
+
+    def test_disabled_profiler_records_nothing(self):
+        simulation = create_simulation(num_people=50, seed=0)
+        simulation.profiler = Profiler(enabled=False)
+        simulation.run(3)
+
+        self.assertEqual(simulation.profiler.timings, {})
+        self.assertEqual(simulation.profiler.counters, {})
+
+    def test_nested_and_concurrent_phases_keep_their_own_start(self):
+        profiler = Profiler()
+        with profiler.phase("draw"):
+            time.sleep(0.02)
+            with profiler.phase("draw"):
+                pass
+
+        inner, outer = profiler.timings["draw"].samples
+        self.assertLess(inner, 0.02)
+        self.assertGreaterEqual(outer, 0.02)
+
+        def record():
+            for _ in range(500):
+                with profiler.phase("threaded"):
+                    pass
+                profiler.count("threaded", 1)
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(profiler.timings["threaded"].total, 2000)
+        self.assertEqual(profiler.counters["threaded"].total, 2000)
+
+    def test_renderer_records_drawing_and_draws_overlay(self):
+        simulation = create_simulation(num_people=50, seed=0)
+        overlay = PerformanceOverlay()
+        simulation.add_observer(PygameRenderer(pygame.Surface((200, 150)), flip=False, overlay=overlay))
+        simulation.run(3)
+
+        self.assertEqual(simulation.profiler.timings["draw_people"].total, 3)
+        self.assertEqual(simulation.profiler.counters["frame_time"].total, 2)
+        self.assertTrue(any(line.startswith("draw_friendships") for line in overlay.lines(simulation.profiler)))
+
+    def test_overlay_reads_while_another_thread_records(self):
+        profiler = Profiler(window=8)
+        overlay = PerformanceOverlay()
+        stop = threading.Event()
+
+        def record():
+            # New phases keep appearing, like the first steps of a simulation thread
+            phase = 0
+            while not stop.is_set():
+                profiler.record(f"phase_{phase % 50}", 1.0e-3, 1)
+                profiler.count("friendships_added", phase)
+                phase += 1
+
+        thread = threading.Thread(target=record)
+        thread.start()
+        try:
+            for _ in range(50):
+                overlay.lines(profiler)
+        finally:
+            stop.set()
+            thread.join()
+
+        self.assertEqual(len(overlay.lines(profiler)), len(profiler.timings) + 1)
+
+        # A recording in progress holds the lock, the overlay waits for it to finish
+        lines = []
+        with profiler._lock:
+            reader = threading.Thread(target=lambda: lines.append(overlay.lines(profiler)))
+            reader.start()
+            reader.join(timeout=0.1)
+            self.assertTrue(reader.is_alive())
+        reader.join()
+        self.assertEqual(len(lines[0]), len(profiler.timings) + 1)
+
+if __name__ == "__main__":
+    unittest.main()
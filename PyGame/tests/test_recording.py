@@ -0,0 +1,85 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.recording import TrajectoryReader, TrajectoryRecorder, record_run
+from src.simulation import create_simulation
+
+PACKAGE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+class TestTrajectoryRecording(unittest.TestCase):
+    def test_reader_seeks_to_any_recorded_step(self):
+        num_steps = 23
+        reference = create_simulation(num_people=30, establishment_equ_prob_dist=0.05, seed=2)
+        states = []
+        reference.add_observer(
+            lambda sim: states.append((sim.people.x.copy(), sim.people.y.copy(), sim.friendship_graph.get_friendships()))
+        )
+        reference.run(num_steps)
+
+        with tempfile.TemporaryDirectory() as path:
+            simulation = create_simulation(num_people=30, establishment_equ_prob_dist=0.05, seed=2)
+            reader = record_run(path, simulation, num_steps, chunk_size=5)
+
+            self.assertEqual(len(reader), num_steps + 1)
+            np.testing.assert_array_equal(reader.colors, simulation.people.colors)
+
+            # Seek backwards across chunk boundaries
+            for frame in range(num_steps, 0, -3):
+                x, y, (idxs, jdxs) = states[frame - 1]
+                state = reader.frame(frame)
+                np.testing.assert_array_equal(state["x"], x)
+                np.testing.assert_array_equal(state["y"], y)
+                np.testing.assert_array_equal(state["idxs"], idxs)
+                np.testing.assert_array_equal(state["jdxs"], jdxs)
+
+            # Step forwards through the whole recording, continuing from the previous frame
+            for frame in range(1, num_steps + 1):
+                idxs, jdxs = reader.friendships(frame)
+                np.testing.assert_array_equal(idxs, states[frame - 1][2][0])
+                np.testing.assert_array_equal(jdxs, states[frame - 1][2][1])
+
+            with self.assertRaises(IndexError):
+                reader.positions(num_steps + 1)
+
+            del reader
+            self.assertEqual(len(TrajectoryReader(path)), num_steps + 1)
+
+    def test_single_precision_state_is_stored_as_single(self):
+        with tempfile.TemporaryDirectory() as path:
+            simulation = create_simulation(num_people=20, seed=3, precision="single")
+            reader = record_run(path, simulation, 4, chunk_size=3)
+
+            x, y = reader.positions(4)
+            self.assertEqual(x.dtype, np.float32)
+            self.assertEqual(reader.wellbeing(4).dtype, np.float32)
+            np.testing.assert_array_equal(x, simulation.people.x)
+            np.testing.assert_array_equal(reader.wellbeing(4), simulation.people.wellbeing)
+            del reader
+
+    def test_replay_rejects_an_empty_recording(self):
+        with tempfile.TemporaryDirectory() as path:
+            # Never closed, so the metadata on disk still counts no frames
+            recorder = TrajectoryRecorder(path, create_simulation(num_people=10, seed=0))
+            self.assertEqual(len(TrajectoryReader(path)), 0)
+
+            result = subprocess.run(
+                [sys.executable, "replay.py", path],
+                cwd=PACKAGE_ROOT,
+                capture_output=True,
+                text=True,
+                env={**os.environ, "SDL_VIDEODRIVER": "dummy"},
+            )
+            recorder.close()
+
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("has no frames", result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
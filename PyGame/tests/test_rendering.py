@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+import pygame
+
+from src.rendering import PygameRenderer, cell_flows, density_heatmap, draw_discs, draw_segments
+from src.simulation import create_simulation
+from src.snapshots import take_snapshot
+
+
+class TestBatchedDrawing(unittest.TestCase):
+    def setUp(self):
+        self.screen = pygame.Surface((40, 30))
+        self.screen.fill((255, 255, 255))
+
+    def test_segments_cover_the_same_pixels_as_pygame(self):
+        x1, y1 = np.array([0, 5, 39, 10]), np.array([0, 25, 0, 10])
+        x2, y2 = np.array([39, 30, 0, 10]), np.array([29, 3, 29, 10])
+        draw_segments(self.screen, x1, y1, x2, y2, (0, 0, 0))
+
+        reference = pygame.Surface((40, 30))
+        reference.fill((255, 255, 255))
+        for start_x, start_y, end_x, end_y in zip(x1, y1, x2, y2):
+            pygame.draw.line(reference, (0, 0, 0), (int(start_x), int(start_y)), (int(end_x), int(end_y)))
+
+        drawn = pygame.surfarray.array3d(self.screen)[..., 0] == 0
+        expected = pygame.surfarray.array3d(reference)[..., 0] == 0
+        # Both rasterizations hit the endpoints and agree on nearly every pixel in between
+        self.assertTrue(drawn[x1, y1].all() and drawn[x2, y2].all())
+        self.assertLessEqual(np.count_nonzero(drawn != expected), 0.1 * np.count_nonzero(expected))
+
+    def test_discs_are_colored_and_clipped(self):
+        px, py = np.array([10, 0, 39]), np.array([10, 0, 35])
+        colors = np.array([[255, 0, 0], [0, 255, 0], [0, 0, 255]])
+        draw_discs(self.screen, px, py, colors, 3)
+
+        self.assertEqual(tuple(self.screen.get_at((10, 10)))[:3], (255, 0, 0))
+        self.assertEqual(tuple(self.screen.get_at((13, 10)))[:3], (255, 0, 0))
+        self.assertEqual(tuple(self.screen.get_at((14, 10)))[:3], (255, 255, 255))
+        self.assertEqual(tuple(self.screen.get_at((0, 0)))[:3], (0, 255, 0))
+        self.assertEqual(tuple(self.screen.get_at((39, 29)))[:3], (255, 255, 255))
+
+
+class TestLevelOfDetail(unittest.TestCase):
+    def test_heatmap_blends_mean_colors_by_density(self):
+        px, py = np.array([1, 2, 5, 5, 6, 7, 5]), np.array([1, 2, 1, 2, 3, 0, 1])
+        colors = np.array([[200, 0, 0], [0, 0, 200], [0, 100, 0], [0, 100, 0], [0, 100, 0], [0, 100, 0], [0, 100, 0]])
+        heatmap = density_heatmap(px, py, colors, 10, 4, 4, (100, 100, 100), saturation=4)
+
+        self.assertEqual(heatmap.shape, (3, 1, 3))
+        # Two people of mean color (100, 0, 100) at half saturation, five green ones saturated, one empty cell
+        np.testing.assert_array_equal(heatmap[:, 0], [[100, 50, 100], [0, 100, 0], [100, 100, 100]])
+
+    def test_flows_aggregate_friendships_between_cells(self):
+        px, py = np.array([0, 1, 15, 16, 30]), np.array([0, 0, 0, 0, 0])
+        idxs, jdxs = np.array([0, 0, 1, 2, 3]), np.array([1, 2, 3, 4, 0])
+        cells1, cells2, counts = cell_flows(px, py, idxs, jdxs, 40, 10, 10)
+
+        np.testing.assert_array_equal(cells1, [0, 1])
+        np.testing.assert_array_equal(cells2, [1, 3])
+        np.testing.assert_array_equal(counts, [3, 1])
+
+    def test_renderer_switches_above_the_threshold(self):
+        simulation = create_simulation(num_people=50, establishment_equ_prob_dist=1.0e-6, seed=0)
+        simulation.run(5)
+        screen = pygame.Surface((80, 60))
+        renderer = PygameRenderer(screen, background_color=(200, 200, 200), flip=False, lod_threshold=49, lod_cell_size=4)
+
+        for draw in (lambda: renderer(simulation), lambda: renderer.draw_snapshot(take_snapshot(simulation), simulation.profiler)):
+            screen.fill((0, 0, 0))
+            draw()
+
+            # Without friendships the screen is exactly the heatmap, scaled up to the cells
+            px, py = (simulation.people.x * 80).astype(np.int64), (simulation.people.y * 60).astype(np.int64)
+            heatmap = density_heatmap(px, py, simulation.people.colors, 80, 60, 4, (200, 200, 200))
+            np.testing.assert_array_equal(pygame.surfarray.array3d(screen), heatmap.repeat(4, axis=0).repeat(4, axis=1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import subprocess
+import sys
+import unittest
+
+import numpy as np
+
+from src.simulation import create_simulation
+
+PACKAGE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Seconds a cold import of the model core may take on top of NumPy
+CORE_IMPORT_BUDGET = 0.25
+
+
+class TestSimulation(unittest.TestCase):
+    def test_seeded_runs_are_reproducible(self):
+        simulations = [create_simulation(num_people=50, seed=3) for _ in range(2)]
+        for simulation in simulations:
+            simulation.run(20)
+
+        first, second = simulations
+        np.testing.assert_array_equal(first.people.x, second.people.x)
+        np.testing.assert_array_equal(first.people.y, second.people.y)
+        for first_edges, second_edges in zip(first.friendship_graph.get_friendships(), second.friendship_graph.get_friendships()):
+            np.testing.assert_array_equal(first_edges, second_edges)
+
+    def test_step_shares_one_geometry_between_the_friendship_passes(self):
+        for storage, cutoff_tolerance in (("dense", None), ("sparse", None), ("sparse", 1.0e-3), ("packed", None)):
+            simulations = [
+                create_simulation(
+                    num_people=60, establishment_equ_prob_dist=0.05, storage=storage, cutoff_tolerance=cutoff_tolerance, seed=2
+                )
+                for _ in range(2)
+            ]
+            for simulation in simulations:
+                simulation.wellbeing_dynamics = None
+
+            stepped, separate = simulations
+            stepped.run(10)
+
+            # The same passes, each computing its own distances
+            people, graph = separate.people, separate.friendship_graph
+            for _ in range(10):
+                people.random_move(separate.t)
+                people.attract_to_friends(graph)
+                graph.add_random_friendships(people)
+                graph.remove_random_friendships(people)
+                separate.t += separate.time_step
+
+            self.assertGreater(stepped.friendship_graph.num_friendships, 0)
+            for first, second in zip(stepped.friendship_graph.get_friendships(), graph.get_friendships()):
+                np.testing.assert_array_equal(first, second)
+
+    def test_observers_are_called_every_step(self):
+        simulation = create_simulation(num_people=10, seed=0)
+        seen = []
+        simulation.add_observer(lambda sim: seen.append(sim.steps))
+        simulation.run(5)
+        self.assertEqual(seen, [1, 2, 3, 4, 5])
+        self.assertAlmostEqual(simulation.t, 5 * simulation.time_step)
+
+    def test_engine_does_not_import_pygame(self):
+        code = "import sys; import src.simulation; assert 'pygame' not in sys.modules"
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=PACKAGE_ROOT)
+
+    def test_core_import_is_lightweight(self):
+        # NumPy is imported first, the budget is for what the model core adds on top of it. Building and
+        # stepping a simulation must not pull in the heavy modules either.
+        code = (
+            "import sys, time; import numpy; start = time.perf_counter(); "
+            "import src.functions, src.structures, src.simulation; seconds = time.perf_counter() - start; "
+            "src.simulation.create_simulation(num_people=10).step(); "
+            "print(seconds, *sorted({'scipy', 'pygame', 'matplotlib'} & set(sys.modules)))"
+        )
+        output = subprocess.run([sys.executable, "-c", code], check=True, cwd=PACKAGE_ROOT, capture_output=True, text=True).stdout
+        seconds, *heavy_modules = output.split()
+
+        self.assertEqual(heavy_modules, [])
+        self.assertLess(float(seconds), CORE_IMPORT_BUDGET)
+
+
+class TestSinglePrecision(unittest.TestCase):
+    def test_state_stays_compact(self):
+        simulation = create_simulation(num_people=50, seed=0, precision="single")
+        simulation.run(5)
+
+        people = simulation.people
+        for array in (people.x, people.y, people.speed_coefficient, people.sfc, people.wpc, people.irc, people.wellbeing):
+            self.assertEqual(array.dtype, np.float32)
+        self.assertEqual(people.colors.dtype, np.uint8)
+        self.assertEqual(simulation.friendship_graph.graph.dtype, bool)
+
+    def test_summary_statistics_match_double_precision(self):
+        for seed in range(2):
+            double = create_simulation(seed=seed)
+            single = create_simulation(seed=seed, precision="single")
+            double.run(100)
+            single.run(100)
+
+            self.assertLessEqual(
+                abs(single.friendship_graph.num_friendships - double.friendship_graph.num_friendships),
+                0.05 * double.friendship_graph.num_friendships,
+            )
+            np.testing.assert_allclose(np.mean(single.people.wellbeing), np.mean(double.people.wellbeing), rtol=1e-4)
+            np.testing.assert_allclose(np.var(single.people.wellbeing), np.var(double.people.wellbeing), rtol=1e-2)
+            np.testing.assert_allclose(np.mean(single.people.x), np.mean(double.people.x), atol=1e-3)
+
+
+if __name__ == "__main__":
+    unittest.main()
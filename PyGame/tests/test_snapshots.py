@@ -0,0 +1,60 @@
+import time
+import unittest
+
+import numpy as np
+import pygame
+
+from src.rendering import PygameRenderer
+from src.simulation import create_simulation
+from src.snapshots import SimulationThread, SnapshotBuffer, take_snapshot
+
+
+class TestSnapshots(unittest.TestCase):
+    def test_snapshots_are_immutable_copies(self):
+        simulation = create_simulation(num_people=30, seed=0)
+        simulation.run(5)
+        snapshot = take_snapshot(simulation)
+
+        with self.assertRaises(ValueError):
+            snapshot.x[0] = 0.5
+
+        simulation.run(5)
+        self.assertFalse(np.array_equal(snapshot.x, simulation.people.x))
+        self.assertEqual(snapshot.step, 5)
+
+    def test_blend_interpolates_between_the_newest_snapshots(self):
+        simulation = create_simulation(num_people=30, seed=0)
+        buffer = SnapshotBuffer()
+        self.assertIsNone(buffer.blend())
+
+        previous = take_snapshot(simulation)._replace(wall_time=0.0)
+        simulation.run(3)
+        current = take_snapshot(simulation)._replace(wall_time=1.0)
+        buffer.publish(previous)
+        buffer.publish(current)
+
+        snapshot, x, y = buffer.blend(now=1.25)
+        self.assertIs(snapshot, current)
+        np.testing.assert_allclose(x, 0.75 * previous.x + 0.25 * current.x)
+        np.testing.assert_allclose(buffer.blend(now=5.0)[1], current.x)
+
+    def test_thread_steps_independently_of_drawing(self):
+        simulation = create_simulation(num_people=30, seed=0)
+        buffer = SnapshotBuffer()
+        thread = SimulationThread(simulation, buffer, publish_every=2)
+        thread.start()
+        time.sleep(0.2)
+        thread.stop()
+
+        _, current = buffer.latest()
+        self.assertGreater(simulation.steps, 2)
+        self.assertEqual(current.step % 2, 0)
+        self.assertLessEqual(simulation.steps - current.step, 1)
+
+        renderer = PygameRenderer(pygame.Surface((60, 40)), flip=False)
+        renderer.draw_snapshot(current, simulation.profiler)
+        self.assertEqual(simulation.profiler.timings["draw_people"].total, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+import numpy as np
+
+from src.spatial import PairGeometry, neighbour_pairs
+
+
+class TestNeighbourPairs(unittest.TestCase):
+    def brute_force_pairs(self, x, y, radius):
+        distance = np.sqrt((x[:, None] - x[None, :]) ** 2 + (y[:, None] - y[None, :]) ** 2)
+        idxs, jdxs = np.where(np.triu(distance <= radius, k=1))
+        return set(zip(idxs.tolist(), jdxs.tolist()))
+
+    def test_matches_brute_force(self):
+        rng = np.random.RandomState(0)
+        for num_points, radius in [(1, 0.1), (300, 0.05), (300, 0.3), (500, 2.0), (1000, 0.001)]:
+            x = rng.rand(num_points)
+            y = rng.rand(num_points)
+            idxs, jdxs, distance = neighbour_pairs(x, y, radius)
+
+            pairs = list(zip(idxs.tolist(), jdxs.tolist()))
+            self.assertEqual(len(pairs), len(set(pairs)))
+            self.assertEqual(set(pairs), self.brute_force_pairs(x, y, radius))
+            np.testing.assert_allclose(distance, np.hypot(x[idxs] - x[jdxs], y[idxs] - y[jdxs]))
+
+    def test_points_on_the_border(self):
+        x = np.array([0.0, 1.0, 1.0, 0.0, 0.5])
+        y = np.array([0.0, 1.0, 0.0, 1.0, 0.5])
+        idxs, jdxs, _ = neighbour_pairs(x, y, 1.0)
+        self.assertEqual(set(zip(idxs.tolist(), jdxs.tolist())), self.brute_force_pairs(x, y, 1.0))
+
+
+class TestPairGeometry(unittest.TestCase):
+    def test_neighbour_pairs_reuse_the_distance_matrix(self):
+        rng = np.random.RandomState(1)
+        x, y = rng.rand(400), rng.rand(400)
+
+        geometry = PairGeometry(x, y)
+        matrix = geometry.distance_matrix()
+        idxs, jdxs, distance = geometry.neighbour_pairs(0.05)
+
+        expected_idxs, expected_jdxs, _ = neighbour_pairs(x, y, 0.05)
+        np.testing.assert_array_equal(idxs, expected_idxs)
+        np.testing.assert_array_equal(jdxs, expected_jdxs)
+        np.testing.assert_array_equal(distance, matrix[idxs, jdxs])
+        self.assertIs(geometry.neighbour_pairs(0.05)[0], idxs)
+
+
+if __name__ == "__main__":
+    unittest.main()
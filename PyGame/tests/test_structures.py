@@ -0,0 +1,158 @@
+import unittest
+
+import numpy as np
+
+from src.structures import POPCOUNT, FriendshipGraph, People, count_set_bits
+
+
+class TestFriendshipGraphStorage(unittest.TestCase):
+    def setUp(self):
+        self.num_people = 50
+        self.dense = FriendshipGraph(self.num_people, 0.01, 1.414 * 0.75, storage="dense")
+        self.sparse = FriendshipGraph(self.num_people, 0.01, 1.414 * 0.75, storage="sparse")
+        self.packed = FriendshipGraph(self.num_people, 0.01, 1.414 * 0.75, storage="packed")
+
+    def assertSameFriendships(self):
+        dense_idxs, dense_jdxs = self.dense.get_friendships()
+        sparse_idxs, sparse_jdxs = self.sparse.get_friendships()
+        np.testing.assert_array_equal(dense_idxs, sparse_idxs)
+        np.testing.assert_array_equal(dense_jdxs, sparse_jdxs)
+        self.assertEqual(self.dense.num_friendships, self.sparse.num_friendships)
+
+        packed_idxs, packed_jdxs = self.packed.get_friendships()
+        np.testing.assert_array_equal(dense_idxs, packed_idxs)
+        np.testing.assert_array_equal(dense_jdxs, packed_jdxs)
+        self.assertEqual(self.dense.num_friendships, self.packed.num_friendships)
+
+    def test_invalid_storage(self):
+        with self.assertRaises(ValueError):
+            FriendshipGraph(self.num_people, 0.01, 1.0, storage="csv")
+
+    def test_symmetric_insert_and_delete(self):
+        rng = np.random.RandomState(0)
+        for _ in range(20):
+            people1 = rng.randint(0, self.num_people, 30)
+            people2 = rng.randint(0, self.num_people, 30)
+            self.dense.add_friendships(people1, people2)
+            self.sparse.add_friendships(people1, people2)
+            self.packed.add_friendships(people1, people2)
+
+            people1 = rng.randint(0, self.num_people, 10)
+            people2 = rng.randint(0, self.num_people, 10)
+            self.dense.remove_friendships(people2, people1)
+            self.sparse.remove_friendships(people2, people1)
+            self.packed.remove_friendships(people2, people1)
+
+            self.assertSameFriendships()
+
+    def test_single_friendship(self):
+        self.sparse.add_friendship(7, 3)
+        self.sparse.add_friendship(3, 7)
+        idxs, jdxs = self.sparse.get_friendships()
+        self.assertEqual(list(idxs), [3])
+        self.assertEqual(list(jdxs), [7])
+
+        self.sparse.remove_friendship(7, 3)
+        self.assertEqual(self.sparse.num_friendships, 0)
+
+    def test_dense_edge_list_follows_changes(self):
+        self.dense.add_friendships(np.array([4, 9]), np.array([2, 1]))
+        idxs, jdxs = self.dense.get_friendships()
+        idxs[:] = 0
+
+        # Adding an existing friendship keeps the cached list, which callers cannot change
+        self.dense.add_friendship(2, 4)
+        np.testing.assert_array_equal(self.dense.get_friendships()[0], [1, 2])
+
+        self.dense.remove_friendship(1, 9)
+        self.dense.add_friendship(7, 8)
+        np.testing.assert_array_equal(self.dense.get_friendships()[0], [2, 7])
+        np.testing.assert_array_equal(self.dense.get_friendships()[1], [4, 8])
+        self.assertEqual(self.dense.num_friendships, 2)
+
+    def test_count_set_bits(self):
+        bits = np.random.RandomState(0).randint(0, 256, (70, 9)).astype(np.uint8)
+        expected = int(np.unpackbits(bits).sum())
+        self.assertEqual(count_set_bits(bits), expected)
+        self.assertEqual(POPCOUNT.dtype, np.uint8)
+        self.assertEqual(int(POPCOUNT[bits].sum(dtype=np.int64)), expected)
+
+
+class TestRandomFriendships(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(0)
+        self.people = People(40)
+
+    def test_breaking_only_touches_existing_friendships(self):
+        # Half of the people sit on top of each other, the other half in opposite corners
+        self.people.x[:20], self.people.y[:20] = 0.5, 0.5
+        self.people.x[20:30], self.people.y[20:30] = 0.0, 0.0
+        self.people.x[30:], self.people.y[30:] = 1.0, 1.0
+
+        for storage in FriendshipGraph.STORAGE_MODES:
+            graph = FriendshipGraph(40, 0.01, 1.414 * 0.75, storage=storage)
+            graph.add_friendships(np.arange(0, 10), np.arange(10, 20))
+            graph.add_friendships(np.arange(20, 30), np.arange(30, 40))
+
+            graph.remove_random_friendships(self.people)
+
+            # Breaking is certain at the maximum distance and impossible at distance zero
+            idxs, jdxs = graph.get_friendships()
+            np.testing.assert_array_equal(idxs, np.arange(0, 10))
+            np.testing.assert_array_equal(jdxs, np.arange(10, 20))
+
+    def test_tiled_establishment_selects_the_same_pairs(self):
+        for precision in ("double", "single"):
+            people = People(40, rng=np.random.RandomState(2), precision=precision)
+            graphs = [
+                FriendshipGraph(40, 0.1, 1.414 * 0.75, rng=np.random.RandomState(3), precision=precision, tile_elements=tile_elements)
+                for tile_elements in (None, 1, 100, 10000)
+            ]
+
+            for graph in graphs:
+                graph.add_random_friendships(people)
+                graph.add_random_friendships(people)
+
+            reference = graphs[0].get_friendships()
+            self.assertGreater(len(reference[0]), 0)
+            for graph in graphs[1:]:
+                for first, second in zip(reference, graph.get_friendships()):
+                    np.testing.assert_array_equal(first, second)
+
+
+class TestFriendAttraction(unittest.TestCase):
+    def test_matches_per_edge_loop(self):
+        rng = np.random.RandomState(0)
+        people = People(30, friend_attractiveness=1e-3, rng=rng)
+        graph = FriendshipGraph(30, 0.01, 1.0, storage="sparse", rng=rng)
+        graph.add_friendships(rng.randint(0, 30, 60), rng.randint(0, 30, 60))
+
+        expected_x, expected_y = people.x.copy(), people.y.copy()
+        for i, j in zip(*graph.get_friendships()):
+            x_diff, y_diff = people.x[j] - people.x[i], people.y[j] - people.y[i]
+            distance = np.hypot(x_diff, y_diff)
+            expected_x[i] += 1e-3 * x_diff / distance
+            expected_y[i] += 1e-3 * y_diff / distance
+            expected_x[j] -= 1e-3 * x_diff / distance
+            expected_y[j] -= 1e-3 * y_diff / distance
+
+        people.attract_to_friends(graph)
+
+        np.testing.assert_allclose(people.x, np.clip(expected_x, 0, 1))
+        np.testing.assert_allclose(people.y, np.clip(expected_y, 0, 1))
+
+    def test_coincident_friends_stay_put(self):
+        people = People(3, friend_attractiveness=1e-2)
+        people.x = np.array([0.5, 0.5, 0.7])
+        people.y = np.array([0.5, 0.5, 0.5])
+        graph = FriendshipGraph(3, 0.01, 1.0)
+        graph.add_friendships(np.array([0, 1]), np.array([1, 2]))
+
+        people.attract_to_friends(graph)
+
+        np.testing.assert_allclose(people.x, [0.5, 0.51, 0.69])
+        np.testing.assert_allclose(people.y, [0.5, 0.5, 0.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
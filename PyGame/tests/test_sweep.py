@@ -0,0 +1,28 @@
+import unittest
+
+from src.sweep import SUMMARY_COLUMNS, parameter_grid, run_configuration, run_sweep
+
+
+class TestSweep(unittest.TestCase):
+    def test_parameter_grid(self):
+        configs = parameter_grid({"num_people": [10, 20], "establishment_equ_prob_dist": [0.01, 0.02, 0.03]})
+        self.assertEqual(len(configs), 6)
+        self.assertIn({"num_people": 20, "establishment_equ_prob_dist": 0.03}, configs)
+
+    def test_sweep_is_reproducible_and_matches_single_runs(self):
+        grid = {"num_people": [10, 20]}
+        rows = run_sweep(grid, num_replicas=2, num_steps=6, max_workers=2, base_seed=5, record_every=3)
+        self.assertEqual(len(rows), 2 * 2 * 2)
+        for column in SUMMARY_COLUMNS + ("num_people", "replica", "seed"):
+            self.assertIn(column, rows[0])
+
+        self.assertEqual(rows, run_sweep(grid, num_replicas=2, num_steps=6, max_workers=1, base_seed=5, record_every=3))
+        self.assertEqual(len({row["seed"] for row in rows}), 4)
+
+        first_run = [row for row in rows if row["num_people"] == 10 and row["replica"] == 0]
+        series = run_configuration({"num_people": 10}, first_run[0]["seed"], num_steps=6, record_every=3)
+        self.assertEqual([row["num_friendships"] for row in first_run], [summary["num_friendships"] for summary in series])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+import numpy as np
+
+from src.structures import FriendshipGraph, People
+from src.wellbeing import WellbeingDynamics
+
+
+class TestWellbeingDynamics(unittest.TestCase):
+    def setUp(self):
+        self.people = People(4, rng=np.random.RandomState(0))
+        self.people.x = np.array([0.1, 0.9, 0.9, 0.12])
+        self.people.y = np.array([0.1, 0.1, 0.9, 0.1])
+        self.people.wpc = np.ones(4)
+        self.people.sfc = np.zeros(4)
+        self.people.irc = np.array([1.0, 1.0, 1.0, 0.1])
+
+        self.graph = FriendshipGraph(4, 0.01, 1.0, storage="sparse")
+        self.graph.add_friendships(np.array([0, 0]), np.array([1, 2]))
+
+    def test_production_is_conserved(self):
+        rng = np.random.RandomState(1)
+        people = People(300, rng=rng)
+        graph = FriendshipGraph(300, 0.01, 1.0, rng=rng)
+        graph.add_random_friendships(people)
+
+        WellbeingDynamics(decay=0.5).update(people, graph, time_step=0.1)
+
+        self.assertAlmostEqual(people.wellbeing.sum(), 0.1 * people.wpc.sum())
+
+    def test_sharing_between_friends_and_within_reach(self):
+        WellbeingDynamics(friend_share=0.5, influence_radius=0.05).update(self.people, self.graph, time_step=1.0)
+
+        # Person 0 splits half between friends 1 and 2 and gives half to person 3 in reach. Persons 1
+        # and 2 give half to person 0 and keep the half meant for people in reach, person 3 keeps everything.
+        np.testing.assert_allclose(self.people.wellbeing, [0.5 + 0.5, 0.5 + 0.25, 0.5 + 0.25, 1.0 + 0.5])
+
+    def test_selfish_people_keep_their_production(self):
+        self.people.sfc = np.ones(4)
+        self.people.wellbeing = np.full(4, 2.0)
+
+        WellbeingDynamics(decay=0.5).update(self.people, self.graph, time_step=1.0)
+
+        np.testing.assert_allclose(self.people.wellbeing, np.full(4, 2.0))
+
+
+if __name__ == "__main__":
+    unittest.main()